@@ -0,0 +1,114 @@
+"""
+Benchmark cold-start import time with `python -X importtime`.
+
+Imports a module in fresh interpreters and reports the best cumulative import
+time along with the slowest top-level imports. Exits with a non-zero status
+if the import time exceeds the budget, or if a module that must be imported
+lazily (such as the MCP or web tool stacks) is imported at startup.
+
+The default budget is for `mini_opencode.agents`, which took 3100-3700 ms
+when every tool was imported eagerly, and 2200 ms (best of 5 runs) once
+tools were loaded lazily, on the same machine.
+
+Usage:
+    python benchmarks/startup_import.py [--module mini_opencode.agents] [--runs 5] [--budget-ms 2800]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Modules that are only imported when their tool is enabled or first called
+LAZY_MODULES = [
+    # MCP clients, imported when servers are configured
+    "langchain_mcp_adapters",
+    "mcp",
+    "mini_opencode.tools.mcp",
+    # Web tools and their HTML extraction
+    "mini_opencode.tools.web",
+    "mini_opencode.tools.web.local_fetch",
+    "html.parser",
+    # Code navigation tools over the symbol index
+    "mini_opencode.tools.code",
+]
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        The module name, nesting level and cumulative import time in
+        microseconds of every import, in `-X importtime` order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        timings.append((name.strip(), level, int(cumulative)))
+    return timings
+
+
+def direct_imports(timings: list[tuple[str, int, int]], module: str) -> list:
+    """Get the imports made directly by a module, slowest first."""
+    # Imports are listed after the imports they trigger
+    index = next(i for i, (name, _, _) in enumerate(timings) if name == module)
+    level = timings[index][1]
+    children = []
+    for name, child_level, cumulative in reversed(timings[:index]):
+        if child_level <= level:
+            break
+        if child_level == level + 1:
+            children.append((cumulative, name))
+    return sorted(children, reverse=True)
+
+
+def total_time(timings: list[tuple[str, int, int]], module: str) -> int:
+    return next(cumulative for name, _, cumulative in timings if name == module)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="mini_opencode.agents")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms", type=float, default=2800.0, help="maximum import time"
+    )
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: total_time(timings, args.module))
+    total_ms = total_time(best, args.module) / 1000
+
+    print(f"Importing {args.module} (best of {args.runs} runs)")
+    print(f"{'direct import':<48}{'cumulative (ms)':>18}")
+    for cumulative, name in direct_imports(best, args.module)[: args.top]:
+        print(f"{name:<48}{cumulative / 1000:>18.1f}")
+    print(f"{'total':<48}{total_ms:>18.1f}")
+
+    failures = []
+    imported = {name for name, _, _ in best}
+    eager = [name for name in LAZY_MODULES if name in imported]
+    if eager:
+        failures.append(
+            f"lazily loaded modules imported at startup: {', '.join(eager)}"
+        )
+    if total_ms > args.budget_ms:
+        failures.append(
+            f"import time {total_ms:.1f} ms exceeds the budget of {args.budget_ms:g} ms"
+        )
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark CPU time per streamed token in the chat view.
+
+Compares the legacy path, which re-renders the whole message for every chunk,
+against the frame-coalesced `StreamRenderer` path that appends only new text.
+CPU time of an idle run that streams without rendering is subtracted.
+
+Usage:
+    python benchmarks/streaming_render.py [--tokens 2000] [--tps 200] [--fps 30]
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain.messages import AIMessage, AIMessageChunk
+from textual.app import App, ComposeResult
+from textual.widgets import Markdown
+
+from mini_opencode.cli.components import ChatView
+from mini_opencode.cli.streaming import StreamRenderer
+
+PARAGRAPH = (
+    "Streaming **markdown** with `inline code`, a [link](https://example.com) "
+    "and enough words to wrap across several lines of the chat panel. "
+)
+
+
+def make_tokens(count: int) -> list[str]:
+    """Split a synthetic markdown answer into roughly word-sized tokens."""
+    tokens: list[str] = []
+    i = 0
+    while len(tokens) < count:
+        if i % 40 == 39:
+            tokens.append("\n\n```python\nprint('hello')\n```\n\n")
+        elif i % 20 == 19:
+            tokens.append("\n\n- list item\n")
+        else:
+            tokens.extend(word + " " for word in PARAGRAPH.split())
+        i += 1
+    return tokens[:count]
+
+
+class BenchApp(App):
+    def compose(self) -> ComposeResult:
+        yield ChatView(id="chat-view")
+
+
+async def run(mode: str, tokens: list[str], tps: float, fps: float) -> float:
+    """Stream tokens into the chat view and return CPU seconds used."""
+    app = BenchApp()
+    async with app.run_test(size=(100, 40)) as pilot:
+        chat_view = app.query_one("#chat-view", ChatView)
+        renderer = StreamRenderer(app, chat_view.append_to_message, max_fps=fps)
+        message = AIMessageChunk(content="")
+        chat_view.add_message(message)
+        await pilot.pause()
+
+        start = time.process_time()
+        for token in tokens:
+            message += AIMessageChunk(content=token)
+            if mode == "legacy":
+                chat_view.update_message(message, update_tools=False)
+            elif mode == "coalesced":
+                renderer.feed(message, token)
+            await asyncio.sleep(1 / tps)
+        renderer.flush()
+        chat_view.update_message(AIMessage(content=message.content))
+        # Wait until every queued Markdown update has been applied
+        for markdown in app.query(Markdown):
+            async with markdown.lock:
+                pass
+        await pilot.pause()
+        elapsed = time.process_time() - start
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--tps", type=float, default=200.0, help="tokens per second")
+    parser.add_argument("--fps", type=float, default=30.0, help="renderer max fps")
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.tokens)
+    print(f"Streaming {len(tokens)} tokens at {args.tps:g} tokens/s")
+    print(f"{'mode':<10}{'cpu total (s)':>16}{'cpu/token (ms)':>18}")
+    # "idle" streams without rendering to measure the harness overhead
+    overhead = asyncio.run(run("idle", tokens, args.tps, args.fps))
+    print(f"{'idle':<10}{overhead:>16.3f}{overhead / len(tokens) * 1000:>18.3f}")
+    for mode in ("legacy", "coalesced"):
+        cpu = asyncio.run(run(mode, tokens, args.tps, args.fps)) - overhead
+        print(f"{mode:<10}{cpu:>16.3f}{cpu / len(tokens) * 1000:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark web tool latency with and without the pooled HTTP client.
+
+Serves a stub Bocha search API locally and calls it through the
+`bocha_web_search` tool, once opening a new connection per call as the tools
+used to do, and once through the shared keep-alive client. Every new
+connection to the stub pays a simulated DNS and TLS handshake delay.
+
+Usage:
+    python benchmarks/web_clients.py [--calls 200] [--handshake-ms 30]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+RESPONSE = {
+    "code": 200,
+    "data": {
+        "webPages": {
+            "value": [
+                {
+                    "name": f"Result {i}",
+                    "url": f"https://example.com/{i}",
+                    "summary": "A stub search result. " * 10,
+                    "siteName": "Example",
+                    "siteIcon": "https://example.com/favicon.ico",
+                    "dateLastCrawled": "2026-01-01T00:00:00Z",
+                }
+                for i in range(10)
+            ]
+        }
+    },
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are sent apart, which Nagle's algorithm would delay
+    # on a reused connection
+    disable_nagle_algorithm = True
+    handshake_delay = 0.0
+
+    def setup(self) -> None:
+        # Runs once per connection, like DNS resolution and a TLS handshake
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(RESPONSE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float]:
+    """Get the p50 and p95 of latencies in milliseconds."""
+    cuts = statistics.quantiles(latencies, n=20)
+    return cuts[9] * 1000, cuts[18] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument(
+        "--handshake-ms", type=float, default=30.0, help="delay per new connection"
+    )
+    args = parser.parse_args()
+
+    StubHandler.handshake_delay = args.handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/web-search"
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+        json.dump(
+            {
+                "tools": {
+                    "configs": {
+                        "bocha_web_search": {"api_key": "stub", "base_url": url}
+                    },
+                    # Only the connection cost is measured, not the throttling
+                    "rate_limits": {"bocha_web_search": {"rate": 0}},
+                }
+            },
+            f,
+        )
+    os.environ["MINI_OPENCODE_CONFIG"] = f.name
+
+    from mini_opencode.tools.web.bocha_web_search import _search
+
+    def unpooled() -> None:
+        # A new connection per call, as with the former bare `requests.post`
+        response = httpx.post(
+            url,
+            headers={"Authorization": "Bearer stub"},
+            json={"query": "stub", "count": 10},
+        )
+        response.json()
+
+    def pooled() -> None:
+        _search("stub", 10)
+
+    print(f"{args.calls} calls, {args.handshake_ms:g} ms handshake per new connection")
+    print(f"{'mode':<10}{'p50 (ms)':>12}{'p95 (ms)':>12}")
+    try:
+        for mode, call in (("before", unpooled), ("after", pooled)):
+            latencies = []
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                call()
+                latencies.append(time.perf_counter() - start)
+            p50, p95 = percentiles(latencies)
+            print(f"{mode:<10}{p50:>12.2f}{p95:>12.2f}")
+    finally:
+        server.shutdown()
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
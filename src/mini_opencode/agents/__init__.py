@@ -1,3 +1,4 @@
+from .checkpointer import create_checkpointer
 from .coding_agent import create_coding_agent
 
-__all__ = ["create_coding_agent"]
+__all__ = ["create_checkpointer", "create_coding_agent"]
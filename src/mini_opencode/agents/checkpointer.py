@@ -0,0 +1,184 @@
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    RunnableConfig,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from mini_opencode.config import get_config_section
+
+DEFAULT_KEEP_LAST = 20
+DEFAULT_SQLITE_PATH = Path.home() / ".mini-opencode" / "checkpoints.sqlite3"
+
+
+class PruningMemorySaver(MemorySaver):
+    """In-memory checkpointer that keeps only the last K checkpoints per thread.
+
+    The channel versions of each checkpoint and the blobs of each thread are
+    indexed, so pruning only looks at the thread being written.
+    """
+
+    def __init__(self, keep_last: int = DEFAULT_KEEP_LAST, **kwargs):
+        super().__init__(**kwargs)
+        self.keep_last = keep_last
+        # Channel versions of each checkpoint, by (thread_id, ns, checkpoint_id)
+        self._versions: dict[tuple[str, str, str], ChannelVersions] = {}
+        # Channels and versions of the blobs, by (thread_id, ns)
+        self._blob_keys: defaultdict[tuple[str, str], set[tuple[str, str]]] = (
+            defaultdict(set)
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = next_config["configurable"]["thread_id"]
+        checkpoint_ns = next_config["configurable"]["checkpoint_ns"]
+        self._versions[(thread_id, checkpoint_ns, checkpoint["id"])] = dict(
+            checkpoint["channel_versions"]
+        )
+        self._blob_keys[(thread_id, checkpoint_ns)].update(new_versions.items())
+        self._prune(thread_id, checkpoint_ns)
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        namespaces = self.storage.pop(thread_id, {})
+        for checkpoint_ns, checkpoints in namespaces.items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+                self._versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for channel, version in self._blob_keys.pop((thread_id, checkpoint_ns), ()):
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_last:
+            return
+
+        # Checkpoint IDs are time ordered
+        checkpoint_ids = sorted(checkpoints)
+        for checkpoint_id in checkpoint_ids[: -self.keep_last]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self._versions.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        # Drop channel values no longer referenced by a remaining checkpoint
+        referenced = set()
+        for checkpoint_id in checkpoints:
+            versions = self._versions.get((thread_id, checkpoint_ns, checkpoint_id))
+            if versions is None:
+                saved_checkpoint = checkpoints[checkpoint_id][0]
+                versions = self.serde.loads_typed(saved_checkpoint)["channel_versions"]
+            referenced.update(versions.items())
+        blob_keys = self._blob_keys[(thread_id, checkpoint_ns)]
+        for channel, version in blob_keys - referenced:
+            self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+        blob_keys &= referenced
+
+
+def _create_sqlite_saver_class():
+    """Create the SQLite checkpointer class, importing its dependency lazily."""
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    class PruningSqliteSaver(AsyncSqliteSaver):
+        """SQLite checkpointer (WAL mode) that keeps only the last K checkpoints per thread."""
+
+        keep_last: int = DEFAULT_KEEP_LAST
+
+        async def aput(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+        ) -> RunnableConfig:
+            next_config = await super().aput(config, checkpoint, metadata, new_versions)
+            await self._prune(
+                next_config["configurable"]["thread_id"],
+                next_config["configurable"]["checkpoint_ns"],
+            )
+            return next_config
+
+        async def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+            async with self.lock, self.conn.cursor() as cur:
+                # Checkpoint IDs are time ordered
+                await cur.execute(
+                    """
+                    DELETE FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                        SELECT checkpoint_id FROM checkpoints
+                        WHERE thread_id = ? AND checkpoint_ns = ?
+                        ORDER BY checkpoint_id DESC LIMIT ?
+                    )
+                    """,
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        thread_id,
+                        checkpoint_ns,
+                        self.keep_last,
+                    ),
+                )
+                if cur.rowcount:
+                    await cur.execute(
+                        """
+                        DELETE FROM writes
+                        WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN (
+                            SELECT checkpoint_id FROM checkpoints
+                            WHERE thread_id = ? AND checkpoint_ns = ?
+                        )
+                        """,
+                        (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+                    )
+                await self.conn.commit()
+
+    return PruningSqliteSaver
+
+
+async def create_checkpointer(stack: AsyncExitStack) -> BaseCheckpointSaver:
+    """
+    Create the checkpointer configured in the `checkpointer` section of `config.yaml`.
+
+    Supported types are `memory` (default) and `sqlite`, a durable checkpointer
+    backed by a local SQLite file in WAL mode. Both keep only the last
+    `keep_last` checkpoints per thread.
+
+    Args:
+        stack: Exit stack that owns the checkpointer's resources, such as
+            the SQLite connection.
+
+    Returns:
+        The checkpointer.
+
+    Raises:
+        ValueError: If the checkpointer type is not supported.
+    """
+    settings = get_config_section("checkpointer") or {}
+    checkpointer_type = settings.get("type", "memory")
+    keep_last = int(settings.get("keep_last", DEFAULT_KEEP_LAST))
+
+    if checkpointer_type == "memory":
+        return PruningMemorySaver(keep_last=keep_last)
+
+    if checkpointer_type == "sqlite":
+        path = Path(settings.get("path") or DEFAULT_SQLITE_PATH).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        saver_class = _create_sqlite_saver_class()
+        saver = await stack.enter_async_context(saver_class.from_conn_string(str(path)))
+        saver.keep_last = keep_last
+        await saver.setup()
+        return saver
+
+    raise ValueError(
+        f"Unsupported checkpointer type `{checkpointer_type}` in the `checkpointer` section."
+    )
@@ -2,43 +2,38 @@ import os
 from pathlib import Path
 
 from deepagents import create_deep_agent
-from deepagents.backends.local_shell import LocalShellBackend
 from langchain.tools import BaseTool
-from langgraph.checkpoint.base import RunnableConfig
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver, RunnableConfig
 
 from mini_opencode import project
 from mini_opencode.config import get_config_section
+from mini_opencode.index import get_project_index, get_repo_map, get_symbol_index
 from mini_opencode.models import init_chat_model
 from mini_opencode.prompts import apply_prompt_template
-from mini_opencode.tools import (
-    bocha_websearch_tool,
-    get_current_date_tool,
-    web_fetch_tool,
-    web_search_tool,
-)
-
-TOOL_MAP = {
-    "get_current_date": get_current_date_tool,
-    "web_fetch": web_fetch_tool,
-    "web_search": web_search_tool,
-    "bocha_web_search": bocha_websearch_tool,
-}
+from mini_opencode.shell import create_shell_backend_factory
+from mini_opencode.tools import load_enabled_tools
 
 
 def create_coding_agent(
-    plugin_tools: list[BaseTool] = [], checkpointer: MemorySaver | None = None, **kwargs
+    plugin_tools: list[BaseTool] = [],
+    checkpointer: BaseCheckpointSaver | None = None,
+    root_dir: str | Path | None = None,
+    **kwargs,
 ):
     """Create a coding agent.
 
     Args:
         plugin_tools: Additional tools to add to the agent.
         checkpointer: Checkpointer to use for the agent.
+        root_dir: Root directory of the project the agent works on.
+            Defaults to the current project root.
         **kwargs: Additional keyword arguments to pass to the agent.
 
     Returns:
         The coding agent.
     """
+    root_dir = Path(root_dir) if root_dir is not None else project.root_dir
+
     # Initialize model
     model = init_chat_model()
 
@@ -49,25 +44,29 @@ def create_coding_agent(
     # - `execute`: run shell commands
     # - `task`: call subagents
     # The `execute` tool allows running shell commands if the backend implements SandboxBackendProtocol. For non-sandbox backends, the execute tool will return an error message.
+    # Only the modules of enabled tools are imported
     enabled_tools_config = get_config_section(["tools", "enabled"])
-    if enabled_tools_config is not None and isinstance(enabled_tools_config, list):
-        tools = [TOOL_MAP[name] for name in enabled_tools_config if name in TOOL_MAP]
-        # Add get_current_date_tool if not enabled
-        if "get_current_date" not in enabled_tools_config:
-            tools.append(get_current_date_tool)
-    else:
+    if not isinstance(enabled_tools_config, list):
+        enabled_tools_config = None
+    tools = load_enabled_tools(enabled_tools_config)
+    tools = [*tools, *plugin_tools]
+    # Start indexing symbols before the code navigation tools are first called
+    symbol_tools = {"find_definition", "find_references", "file_outline"}
+    if any(t.name in symbol_tools for t in tools):
+        from mini_opencode.tools.code import bind_root_dir
+
+        get_symbol_index(root_dir)
+        # Answer for the root of this agent, not the current project
         tools = [
-            get_current_date_tool,
-            web_fetch_tool,
-            web_search_tool,
-            bocha_websearch_tool,
+            bind_root_dir(t, root_dir) if t.name in symbol_tools else t for t in tools
         ]
-    tools = [*tools, *plugin_tools]
 
     # Initialize system prompt
+    # The repository map saves the agent from exploring the layout first
     system_prompt = apply_prompt_template(
         "coding_agent",
-        PROJECT_ROOT=project.root_dir,
+        PROJECT_ROOT=root_dir,
+        REPO_MAP=get_repo_map(root_dir),
     )
 
     # Initialize middleware
@@ -85,19 +84,22 @@ def create_coding_agent(
 
     # Initialize skills
     skills = None
-    skills_dir = Path(project.root_dir) / "skills"
+    skills_dir = Path(root_dir) / "skills"
     if skills_dir.exists():
         skills = [str(skills_dir.absolute())]
 
     # Initialize memory
     memory = None
-    agents_md_path = Path(project.root_dir) / "AGENTS.md"
+    agents_md_path = Path(root_dir) / "AGENTS.md"
     if agents_md_path.exists():
         memory = [str(agents_md_path.absolute())]
 
     # Initialize backend
     # LocalShellBackend implements SandboxBackendProtocol, which allows `execute` tool to run shell commands in local environment.
-    backend = LocalShellBackend(root_dir=project.root_dir)
+    # With the project index enabled, `grep` and `glob` are answered from the index instead of walking the tree.
+    # The backend is resolved for each tool call, so `execute` streams its output to the run, and with persistent shells, each session runs its commands in its own shell, which keeps `cd` and variables between commands.
+    project_index = get_project_index(root_dir)
+    backend = create_shell_backend_factory(root_dir, project_index)
 
     return create_deep_agent(
         model=model,
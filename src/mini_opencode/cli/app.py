@@ -22,6 +22,7 @@ from mini_opencode.cli.controllers import (
     SuggestionController,
 )
 from mini_opencode.cli.theme import DARK_THEME, LIGHT_THEME, is_dark_mode
+from mini_opencode.index import get_project_watcher
 
 
 class ConsoleApp(App):
@@ -123,6 +124,11 @@ class ConsoleApp(App):
         editor_tabs = self.query_one("#editor-tabs", EditorTabs)
         editor_tabs.open_welcome()
 
+        # Keeps the project index fresh as the agent, its commands or the
+        # user change files
+        watcher = get_project_watcher(project.root_dir)
+        if watcher is not None:
+            watcher.start()
         asyncio.create_task(self.agent_controller.init_agent())
         self.set_interval(2.0, self._check_system_theme)
 
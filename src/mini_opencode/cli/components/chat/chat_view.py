@@ -46,12 +46,29 @@ class ChatView(Vertical):
         if not isinstance(message, ToolMessage):
             message_list.add_message(message)
 
+    def set_messages(self, messages: list[AnyMessage]) -> None:
+        """Replace all messages in the chat, e.g. when resuming a session"""
+        message_list = self.query_one("#message-list", MessageListView)
+        message_list.set_messages(
+            [m for m in messages if not isinstance(m, ToolMessage)]
+        )
+
     def update_message(self, message: AnyMessage, update_tools: bool = True) -> None:
         """Update the last message in the chat"""
         message_list = self.query_one("#message-list", MessageListView)
         if not isinstance(message, ToolMessage):
             message_list.update_last_message(message, update_tools=update_tools)
 
+    def append_to_message(self, message: AnyMessage, delta: str) -> bool:
+        """Append streamed text to the last message in the chat"""
+        message_list = self.query_one("#message-list", MessageListView)
+        return message_list.append_to_last_message(message, delta)
+
+    def annotate_tool_call(self, tool_call_id: str, note: str) -> None:
+        """Show a note after a tool call in the chat"""
+        message_list = self.query_one("#message-list", MessageListView)
+        message_list.annotate_tool_call(tool_call_id, note)
+
     def focus_input(self) -> None:
         """Focus the input field"""
         chat_input = self.query_one("#chat-input", ChatInput)
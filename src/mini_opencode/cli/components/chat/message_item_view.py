@@ -8,6 +8,7 @@ from langchain.messages import (
     ToolMessage,
 )
 from textual.app import ComposeResult
+from textual.await_complete import AwaitComplete
 from textual.widgets import Markdown, Static
 
 
@@ -48,11 +49,21 @@ class MessageItemView(Static):
     }
     """
 
-    def __init__(self, message: AnyMessage, display_header: bool = True, **kwargs):
+    def __init__(
+        self,
+        message: AnyMessage,
+        display_header: bool = True,
+        tool_call_notes: dict[str, str] | None = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.message = message
+        # Notes shown after tool calls by id, e.g. when a result was cached
+        self.tool_call_notes = tool_call_notes if tool_call_notes is not None else {}
         self.add_class(message.type)
         self.display_header = display_header
+        self._rendered_text = ""
+        self._pending_render: AwaitComplete | None = None
 
     def compose(self) -> ComposeResult:
         """Compose the message item"""
@@ -75,6 +86,7 @@ class MessageItemView(Static):
         # For AIMessage, always yield a Markdown widget if it's not a ToolMessage
         # to support streaming content updates.
         if not isinstance(self.message, ToolMessage):
+            self._rendered_text = text_content
             yield Markdown(
                 text_content,
                 id="markdown",
@@ -98,7 +110,7 @@ class MessageItemView(Static):
             if text_content and tool_call == self.message.tool_calls[0]:
                 margin_top = 1
             yield Static(
-                self.render_tool_call(tool_call),
+                self._render_tool_call_line(tool_call),
                 classes=f"tool_call margin_top_{margin_top}",
             )
 
@@ -109,7 +121,15 @@ class MessageItemView(Static):
 
         try:
             markdown = self.query_one("#markdown", Markdown)
-            markdown.update(text_content)
+            if not self.is_rendering and text_content.startswith(self._rendered_text):
+                # Streamed content is already rendered, only append what is missing
+                tail = text_content[len(self._rendered_text) :]
+                if tail:
+                    self._pending_render = markdown.append(tail)
+                self._rendered_text = text_content
+            elif text_content != self._rendered_text.rstrip():
+                self._pending_render = markdown.update(text_content)
+                self._rendered_text = text_content
         except Exception:
             # If markdown wasn't created yet (e.g. for ToolMessage), skip
             pass
@@ -131,7 +151,7 @@ class MessageItemView(Static):
                     margin_top = 1
                 self.mount(
                     Static(
-                        self.render_tool_call(tool_call),
+                        self._render_tool_call_line(tool_call),
                         classes=f"tool_call margin_top_{margin_top}",
                     )
                 )
@@ -141,6 +161,42 @@ class MessageItemView(Static):
             else:
                 self.remove_class("tool_calls_only")
 
+    @property
+    def is_rendering(self) -> bool:
+        """Whether the previous Markdown update is still being applied."""
+        return self._pending_render is not None and not self._pending_render.is_done
+
+    def append_content(self, message: AnyMessage, delta: str) -> bool:
+        """Append streamed text to the message without re-rendering it.
+
+        Args:
+            message: The accumulated message so far.
+            delta: The text to append to the rendered Markdown.
+
+        Returns:
+            False if the previous append is still in progress and the delta
+            was not consumed, True otherwise.
+        """
+        if self.is_rendering:
+            return False
+        self.message = message
+        if not self._rendered_text:
+            delta = delta.lstrip()
+        if not delta:
+            return True
+        try:
+            markdown = self.query_one("#markdown", Markdown)
+        except Exception:
+            return True
+        self._pending_render = markdown.append(delta)
+        self._rendered_text += delta
+        return True
+
+    def _render_tool_call_line(self, tool_call: ToolCall) -> str:
+        line = self.render_tool_call(tool_call)
+        note = self.tool_call_notes.get(tool_call.get("id") or "")
+        return f"{line} ({note})" if note else line
+
     def render_tool_call(self, tool_call: ToolCall) -> str:
         name = tool_call["name"]
         args = tool_call["args"]
@@ -170,12 +226,15 @@ class MessageItemView(Static):
                 pattern = args.get("pattern") or "*"
                 path = args.get("path") or "."
                 return f"🔍 Grep files: {pattern} in {path}"
-            case "web_search":
+            case "web_search" | "bocha_web_search" | "meta_web_search":
                 query = args.get("query") or "unknown"
                 return f"🔍 Web search: {query}"
             case "web_fetch":
                 url = args.get("url") or "unknown"
                 return f"🔍 Web fetch: {url}"
+            case "web_fetch_batch":
+                urls = args.get("urls") or []
+                return f"🔍 Web fetch: {', '.join(urls) or 'unknown'}"
             case "task":
                 subagent_type = args.get("subagent_type") or "unknown"
                 return f"🤖 Call subagent: {subagent_type}"
@@ -2,12 +2,22 @@ from langchain.messages import AnyMessage
 from textual.app import ComposeResult
 from textual.containers import Vertical, VerticalScroll
 
+from mini_opencode.config import get_config_section
+
 from .loading_indicator import LoadingIndicator
 from .message_item_view import MessageItemView
 
+DEFAULT_MAX_MOUNTED = 60
+DEFAULT_PAGE_SIZE = 20
+
 
 class MessageListView(VerticalScroll):
-    """Scrollable message list container"""
+    """Scrollable message list container
+
+    Only a contiguous window of messages near the viewport is mounted as
+    `MessageItemView` widgets. All other messages are kept as plain records
+    and are mounted page by page when scrolled into view.
+    """
 
     DEFAULT_CSS = """
     MessageListView {
@@ -34,6 +44,15 @@ class MessageListView(VerticalScroll):
         super().__init__(**kwargs)
         self.can_focus = True
         self.messages: list[AnyMessage] = []
+        settings = get_config_section(["ui", "message_list"]) or {}
+        self.max_mounted: int = settings.get("max_mounted", DEFAULT_MAX_MOUNTED)
+        self.page_size: int = settings.get("page_size", DEFAULT_PAGE_SIZE)
+        # Views of the mounted window, messages[_window_start:_window_end]
+        self._views: list[MessageItemView] = []
+        self._window_start = 0
+        self._paging = False
+        # Notes shown after tool calls by id, kept for views mounted later
+        self.tool_call_notes: dict[str, str] = {}
 
     _is_generating = False
 
@@ -50,46 +69,188 @@ class MessageListView(VerticalScroll):
             self.remove_class("generating")
         self.set_timer(0.1, self._scroll_to_bottom)
 
+    @property
+    def _window_end(self) -> int:
+        return self._window_start + len(self._views)
+
+    @property
+    def is_at_tail(self) -> bool:
+        """Whether the last message is mounted."""
+        return self._window_end == len(self.messages)
+
     def _scroll_to_bottom(self) -> None:
+        if not self.is_at_tail:
+            self._mount_window(max(0, len(self.messages) - self.page_size))
+        else:
+            self._trim(from_top=True)
         self.scroll_end(animate=True)
 
     def compose(self) -> ComposeResult:
         yield Vertical(id="message-list")
         yield LoadingIndicator(id="loading")
 
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self._paging:
+            return
+        threshold = self.size.height
+        if new_value < old_value and new_value <= threshold:
+            if self._window_start > 0:
+                self._paging = True
+                self.call_after_refresh(self._load_previous_page)
+        elif new_value > old_value and new_value >= self.max_scroll_y - threshold:
+            if not self.is_at_tail:
+                self._paging = True
+                self.call_after_refresh(self._load_next_page)
+
     def add_message(self, message: AnyMessage) -> None:
         """Add a new message to the list"""
-        display_header = True
-        if len(self.messages) == 0:
-            display_header = True
-        else:
-            last_message = self.messages[-1]
-            if last_message:
-                if last_message.type == message.type:
-                    display_header = False
         self.messages.append(message)
-        message_item_view = MessageItemView(message, display_header=display_header)
-        message_list = self.query_one("#message-list", Vertical)
-        message_list.mount(message_item_view)
+        if self._window_end == len(self.messages) - 1:
+            view = self._make_view(len(self.messages) - 1)
+            self._views.append(view)
+            message_list = self.query_one("#message-list", Vertical)
+            message_list.mount(view)
         self.set_timer(0.1, self._scroll_to_bottom)
 
-    def update_last_message(self, message: AnyMessage, update_tools: bool = True) -> None:
+    def set_messages(self, messages: list[AnyMessage]) -> None:
+        """Replace all messages, mounting only the last page"""
+        self.messages = list(messages)
+        self._mount_window(max(0, len(self.messages) - self.page_size))
+        self.set_timer(0.1, self._scroll_to_bottom)
+
+    def update_last_message(
+        self, message: AnyMessage, update_tools: bool = True
+    ) -> None:
         """Update the last message in the list"""
         if not self.messages:
             self.add_message(message)
             return
 
         self.messages[-1] = message
-        message_list = self.query_one("#message-list", Vertical)
-        if message_list.children:
-            last_view = message_list.children[-1]
-            if isinstance(last_view, MessageItemView):
-                last_view.update_message(message, update_tools=update_tools)
+        last_view = self._last_view()
+        if last_view is not None:
+            last_view.update_message(message, update_tools=update_tools)
+        self.set_timer(0.1, self._scroll_to_bottom)
+
+    def append_to_last_message(self, message: AnyMessage, delta: str) -> bool:
+        """Append streamed text to the last message in the list
+
+        Returns:
+            False if the last message is still rendering the previous delta.
+        """
+        if not self.messages:
+            self.add_message(message)
+            return True
+
+        last_view = self._last_view()
+        if last_view is not None:
+            if not last_view.append_content(message, delta):
+                return False
+        self.messages[-1] = message
         self.set_timer(0.1, self._scroll_to_bottom)
+        return True
+
+    def annotate_tool_call(self, tool_call_id: str, note: str) -> None:
+        """Show a note after a tool call, e.g. that its result was cached"""
+        self.tool_call_notes[tool_call_id] = note
+        for view in reversed(self._views):
+            tool_calls = getattr(view.message, "tool_calls", None) or []
+            if any(tool_call.get("id") == tool_call_id for tool_call in tool_calls):
+                view.update_message(view.message, update_tools=True)
+                break
 
     def clear(self) -> None:
         """Clear all messages from the list"""
         self.messages = []
+        self.tool_call_notes = {}
+        self._views = []
+        self._window_start = 0
         message_list = self.query_one("#message-list", Vertical)
-        for child in list(message_list.children):
-            child.remove()
+        message_list.remove_children()
+
+    def _last_view(self) -> MessageItemView | None:
+        """Get the view of the last message if it is mounted"""
+        if not self.is_at_tail or not self._views:
+            return None
+        return self._views[-1]
+
+    def _make_view(self, index: int) -> MessageItemView:
+        """Create the view for the message at the given index"""
+        message = self.messages[index]
+        display_header = index == 0 or self.messages[index - 1].type != message.type
+        return MessageItemView(
+            message,
+            display_header=display_header,
+            tool_call_notes=self.tool_call_notes,
+        )
+
+    def _mount_window(self, start: int) -> None:
+        """Replace the mounted views with a page starting at the given index"""
+        message_list = self.query_one("#message-list", Vertical)
+        message_list.remove_children()
+        end = min(len(self.messages), start + self.page_size)
+        self._window_start = start
+        self._views = [self._make_view(i) for i in range(start, end)]
+        if self._views:
+            message_list.mount(*self._views)
+
+    def _trim(self, from_top: bool) -> int:
+        """Unmount views beyond `max_mounted` from one end of the window
+
+        Returns:
+            The height of the removed views.
+        """
+        excess = len(self._views) - self.max_mounted
+        if excess <= 0:
+            return 0
+        if from_top:
+            removed = self._views[:excess]
+            self._views = self._views[excess:]
+            self._window_start += excess
+        else:
+            removed = self._views[-excess:]
+            self._views = self._views[:-excess]
+        height = sum(view.outer_size.height for view in removed)
+        for view in removed:
+            view.remove()
+        return height
+
+    async def _load_previous_page(self) -> None:
+        """Mount the page above the window, keeping the viewport in place"""
+        try:
+            start = max(0, self._window_start - self.page_size)
+            views = [self._make_view(i) for i in range(start, self._window_start)]
+            if not views or not self._views:
+                return
+            message_list = self.query_one("#message-list", Vertical)
+            old_height = self.virtual_size.height
+            await message_list.mount(*views, before=self._views[0])
+            self._views = views + self._views
+            self._window_start = start
+            removed_height = self._trim(from_top=False)
+            self.call_after_refresh(self._restore_offset, old_height - removed_height)
+        finally:
+            self._paging = False
+
+    async def _load_next_page(self) -> None:
+        """Mount the page below the window, keeping the viewport in place"""
+        try:
+            end = min(len(self.messages), self._window_end + self.page_size)
+            views = [self._make_view(i) for i in range(self._window_end, end)]
+            if not views or not self._views:
+                return
+            message_list = self.query_one("#message-list", Vertical)
+            await message_list.mount(*views, after=self._views[-1])
+            self._views = self._views + views
+            removed_height = self._trim(from_top=True)
+            if removed_height:
+                self.scroll_to(y=self.scroll_y - removed_height, animate=False)
+        finally:
+            self._paging = False
+
+    def _restore_offset(self, old_height: int) -> None:
+        """Shift the scroll offset by the height added above the viewport"""
+        added = self.virtual_size.height - old_height
+        if added > 0:
+            self.scroll_to(y=self.scroll_y + added, animate=False)
@@ -0,0 +1,78 @@
+from collections.abc import Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LineRingBuffer(Generic[T]):
+    """Fixed-capacity buffer of lines, evicting the oldest line when full.
+
+    Lines are addressed by index from the oldest line kept, or by absolute
+    line number, which counts the evicted lines too and so does not change
+    when older lines are evicted.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of lines kept.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1.")
+        self.capacity = capacity
+        # Number of lines evicted, the absolute number of the oldest line kept
+        self.dropped = 0
+        self._slots: list[T | None] = [None] * capacity
+        self._start = 0
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._length):
+            yield self._slots[(self._start + i) % self.capacity]
+
+    def __getitem__(self, index: int) -> T:
+        return self._slots[self._slot(index)]
+
+    def __setitem__(self, index: int, line: T) -> None:
+        self._slots[self._slot(index)] = line
+
+    def append(self, line: T) -> T | None:
+        """
+        Add a line after the newest one.
+
+        Returns:
+            The evicted oldest line if the buffer was full, else None.
+        """
+        if self._length < self.capacity:
+            self._slots[(self._start + self._length) % self.capacity] = line
+            self._length += 1
+            return None
+        evicted = self._slots[self._start]
+        self._slots[self._start] = line
+        self._start = (self._start + 1) % self.capacity
+        self.dropped += 1
+        return evicted
+
+    def index_of(self, number: int) -> int | None:
+        """Get the index of a line by absolute number, or None if it is gone."""
+        index = number - self.dropped
+        return index if 0 <= index < self._length else None
+
+    def clear(self) -> None:
+        """Remove all lines, and start numbering them again."""
+        self._slots = [None] * self.capacity
+        self._start = 0
+        self._length = 0
+        self.dropped = 0
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("line index out of range")
+        return (self._start + index) % self.capacity
@@ -1,33 +1,275 @@
-from textual.containers import VerticalScroll
-from textual.widgets import Static
+import asyncio
+import os
+import re
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
 
+from rich.cells import cell_len
+from rich.text import Text
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 
-class TerminalView(VerticalScroll):
-    """Terminal view component"""
+from mini_opencode.config import get_config_section
+
+from .line_buffer import LineRingBuffer
+
+# Lines kept in memory, older lines are spilled to a file
+DEFAULT_MAX_LINES = 5000
+# Longer lines are cut, so that the memory used stays bounded
+MAX_LINE_CHARS = 10_000
+# Spilled lines written to the file at a time
+SPILL_BATCH = 256
+MAX_SEARCH_RESULTS = 50
+
+# Escape sequences and control characters, which would break the layout
+_sub_control = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|[\x00-\x08\x0b-\x1f\x7f]").sub
+
+
+class TerminalLine(NamedTuple):
+    text: str
+    muted: bool
+
+
+class TerminalView(ScrollView, can_focus=True):
+    """Terminal view component
+
+    A log of lines in a fixed-capacity ring buffer, of which only the
+    visible lines are rendered. Lines evicted from the buffer are spilled
+    to a temporary file, where `search` still finds them.
+    """
+
+    COMPONENT_CLASSES = {"terminal-view--muted"}
 
     DEFAULT_CSS = """
     TerminalView {
         padding: 1 2;
     }
 
-    TerminalView Static {
-    }
-
-    TerminalView Static.muted {
+    TerminalView > .terminal-view--muted {
         color: $text-muted;
     }
     """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        settings = get_config_section(["ui", "terminal"]) or {}
+        self.max_lines: int = settings.get("max_lines", DEFAULT_MAX_LINES)
+        self.spill: bool = settings.get("spill", True)
+        self._lines: LineRingBuffer[TerminalLine] = LineRingBuffer(self.max_lines)
+        self._width = 0
+        # Rendered lines by absolute line number, which eviction does not change
+        self._render_cache: LRUCache[int, Strip] = LRUCache(1024)
+        # Absolute number of the unfinished line of each streaming command
+        self._streams: dict[str, int] = {}
+        self._spill_pending: list[str] = []
+        self._spill_path: Path | None = None
+        # Whether the view follows new output, until scrolled up
+        self._follow = True
+
+    @property
+    def spill_path(self) -> Path | None:
+        """The file holding the lines evicted from the buffer, once there are any."""
+        return self._spill_path
 
     def write(self, text: str, muted: bool = False) -> None:
         """Add output to terminal"""
-        item = Static(text, classes=f"{'muted' if muted else ''}")
-        self.mount(item)
-        self.scroll_end(animate=True)
+        evicted = 0
+        for line in text.split("\n"):
+            evicted += self._append(TerminalLine(_clip(line), muted))
+        self._update(evicted)
+
+    def append(self, stream_id: str, text: str) -> None:
+        """Add output of a running command, continuing its unfinished line."""
+        first, *rest = text.split("\n")
+        evicted = 0
+        number = self._streams.get(stream_id)
+        index = self._lines.index_of(number) if number is not None else None
+        if index is not None:
+            line = self._lines[index]
+            self._lines[index] = TerminalLine(_clip(line.text + first), True)
+            self._render_cache.discard(number)
+            self._update_width(self._lines[index].text)
+        else:
+            evicted += self._append(TerminalLine(_clip(first), True))
+        for part in rest:
+            evicted += self._append(TerminalLine(_clip(part), True))
+        if rest or index is None:
+            self._streams[stream_id] = self._lines.dropped + len(self._lines) - 1
+        self._update(evicted)
+
+    def end_stream(self, stream_id: str) -> bool:
+        """
+        Stop continuing the unfinished line of a command.
+
+        Returns:
+            Whether the command streamed any output.
+        """
+        return self._streams.pop(stream_id, None) is not None
 
     def clear(self) -> None:
         """Clear all output from terminal"""
-        for child in list(self.children):
-            child.remove()
+        self._lines.clear()
+        self._streams.clear()
+        self._render_cache.clear()
+        self._width = 0
+        self._follow = True
+        self._remove_spill()
+        self.virtual_size = Size(0, 0)
+        self.refresh()
+
+    async def search(
+        self, query: str, limit: int = MAX_SEARCH_RESULTS
+    ) -> list[tuple[int, str]]:
+        """
+        Find the lines containing a text, ignoring case.
+
+        Both the spilled lines and the lines in the buffer are searched.
+
+        Returns:
+            The last matching lines, with their line numbers from 1.
+        """
+        needle = query.lower()
+        self._flush_spill()
+        matches: deque[tuple[int, str]] = deque(maxlen=limit)
+        if self._spill_path is not None:
+            matches.extend(
+                await asyncio.to_thread(_search_file, self._spill_path, needle, limit)
+            )
+        first = self._lines.dropped + 1
+        for number, line in enumerate(self._lines, first):
+            if needle in line.text.lower():
+                matches.append((number, _process(line.text)))
+        return list(matches)
+
+    def notify_style_update(self) -> None:
+        super().notify_style_update()
+        self._render_cache.clear()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        self._follow = new_value >= self._end_y()
+
+    def on_resize(self) -> None:
+        if self._follow:
+            self._scroll_to_end()
+
+    def on_unmount(self) -> None:
+        self._remove_spill()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        rich_style = self.rich_style
+        if index >= len(self._lines):
+            return Strip.blank(width, rich_style)
+        strip = self._render_strip(index)
+        return strip.crop_extend(scroll_x, scroll_x + width, rich_style)
+
+    def _render_strip(self, index: int) -> Strip:
+        number = self._lines.dropped + index
+        strip = self._render_cache.get(number)
+        if strip is not None:
+            return strip
+        line = self._lines[index]
+        text = _process(line.text)
+        style = self.rich_style
+        if line.muted:
+            style += self.get_component_rich_style("terminal-view--muted")
+        rendered = Text(text, style=style, no_wrap=True, end="")
+        strip = Strip(rendered.render(self.app.console), cell_len(text))
+        self._render_cache[number] = strip
+        return strip
+
+    def _append(self, line: TerminalLine) -> bool:
+        """Add a line, spilling the oldest one if the buffer is full."""
+        evicted = self._lines.append(line)
+        self._update_width(line.text)
+        if evicted is None:
+            return False
+        if self.spill:
+            self._spill_pending.append(_process(evicted.text))
+            if len(self._spill_pending) >= SPILL_BATCH:
+                self._flush_spill()
+        return True
+
+    def _update_width(self, text: str) -> None:
+        self._width = max(self._width, cell_len(_process(text)))
+
+    def _end_y(self) -> int:
+        """Get the scroll offset showing the last line."""
+        return max(0, len(self._lines) - self.scrollable_content_region.height)
+
+    def _scroll_to_end(self) -> None:
+        # The scrollbars only update with the next layout, so the scroll is
+        # forced to the offset worked out from the lines
+        self.scroll_to(y=self._end_y(), animate=False, immediate=True, force=True)
+
+    def _update(self, evicted: int) -> None:
+        self.virtual_size = Size(self._width, len(self._lines))
+        if self._follow:
+            self._scroll_to_end()
+        elif evicted:
+            # Keep the same lines in view as older lines are evicted
+            self.scroll_to(
+                y=max(0, self.scroll_y - evicted),
+                animate=False,
+                immediate=True,
+                force=True,
+            )
+        self.refresh()
+
+    def _flush_spill(self) -> None:
+        if not self._spill_pending:
+            return
+        try:
+            if self._spill_path is None:
+                fd, path = tempfile.mkstemp(
+                    prefix="mini-opencode-terminal-", suffix=".log"
+                )
+                os.close(fd)
+                self._spill_path = Path(path)
+            with self._spill_path.open("a", encoding="utf-8", errors="replace") as f:
+                f.writelines(f"{text}\n" for text in self._spill_pending)
+        except OSError:
+            # Older output is dropped if it cannot be written
+            self.spill = False
+        self._spill_pending.clear()
+
+    def _remove_spill(self) -> None:
+        self._spill_pending.clear()
+        if self._spill_path is not None:
+            self._spill_path.unlink(missing_ok=True)
+            self._spill_path = None
+
+
+def _clip(text: str) -> str:
+    # Only what follows the last carriage return shows, as in a terminal
+    cut = text.rfind("\r", 0, len(text) - 1)
+    if cut > 0:
+        text = text[cut:]
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + "…"
+    return text
+
+
+def _process(text: str) -> str:
+    """Get the text of a line as it is shown."""
+    text = text.rstrip("\r").rpartition("\r")[2]
+    return _sub_control("", text.expandtabs())
+
+
+def _search_file(path: Path, needle: str, limit: int) -> list[tuple[int, str]]:
+    matches: deque[tuple[int, str]] = deque(maxlen=limit)
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            for number, line in enumerate(f, 1):
+                if needle in line.lower():
+                    matches.append((number, line.rstrip("\n")))
+    except OSError:
+        pass
+    return list(matches)
@@ -1,6 +1,8 @@
 import asyncio
 import datetime
 import re
+import sys
+from contextlib import AsyncExitStack
 
 from langchain.messages import (
     AIMessage,
@@ -10,13 +12,14 @@ from langchain.messages import (
     ToolMessage,
 )
 from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Overwrite
 from textual.app import App
 from textual.widgets import TabbedContent
 
 from mini_opencode import project
-from mini_opencode.agents import create_coding_agent
+from mini_opencode.agents import create_checkpointer, create_coding_agent
 from mini_opencode.cli.components import (
     ChatView,
     EditorTabs,
@@ -24,7 +27,25 @@ from mini_opencode.cli.components import (
     TodoListView,
 )
 from mini_opencode.cli.history import HistoryManager
-from mini_opencode.tools import load_mcp_tools
+from mini_opencode.cli.streaming import OutputStreamBuffer, StreamRenderer
+from mini_opencode.config import get_config_section, reload_config_if_changed
+from mini_opencode.index import get_repo_map_version, stop_project_watchers
+from mini_opencode.shell import EXECUTE_OUTPUT_EVENT, close_shell_sessions
+from mini_opencode.tools.mcp import (
+    McpSchemaCache,
+    McpSessionPool,
+    get_mcp_server_configs,
+    iter_mcp_server_tools,
+)
+
+# Characters of a tool result shown in the terminal, when it was not streamed
+MAX_TERMINAL_RESULT_CHARS = 20_000
+# Status lines the shell appends to a command's output, which is not streamed
+COMMAND_STATUS_PATTERN = re.compile(
+    r"^(?:Exit code: -?\d+|Error: Command timed out .*|\.\.\. Output truncated .*)$"
+)
+# Last lines of a tool result searched for status lines
+COMMAND_STATUS_LINES = 4
 
 
 class AgentController:
@@ -33,12 +54,35 @@ class AgentController:
     def __init__(self, app: "App"):
         self.app = app
         self._coding_agent = None
-        self._mcp_tools: list = []
+        # Agent built in the background after config, MCP tools or the
+        # repository map change, swapped in between turns
+        self._spare_agent_task: asyncio.Task | None = None
+        # Repository maps the latest agent was built with, see `get_repo_map`
+        self._repo_map_version = 0
+        # MCP tools by server, updated as servers load
+        self._mcp_server_tools: dict[str, list] = {}
+        self._mcp_tools_version = 0
+        self._mcp_task: asyncio.Task | None = None
+        self.mcp_schema_cache = (
+            McpSchemaCache()
+            if get_config_section(["tools", "mcp_schema_cache"]) is not False
+            else None
+        )
+        # Long-lived sessions shared by the MCP tool calls of all agents
+        self.mcp_session_pool = McpSessionPool()
         self._terminal_tool_calls: list[str] = []
         self._file_modification_tool_calls: dict[str, str] = {}
-        self._checkpointer = MemorySaver()
+        self._checkpointer: BaseCheckpointSaver | None = None
+        self._exit_stack = AsyncExitStack()
         self._session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.history_manager = HistoryManager()
+        self._stream_renderer = StreamRenderer(app, self.append_incoming_message)
+        # Output of running commands, rendered once per frame
+        self._output_buffer = OutputStreamBuffer(app, self.append_terminal_output)
+
+    @property
+    def _mcp_tools(self) -> list:
+        return [tool for tools in self._mcp_server_tools.values() for tool in tools]
 
     @property
     def is_generating(self) -> bool:
@@ -54,28 +98,28 @@ class AgentController:
             self.app.is_generating = value
 
     async def init_agent(self) -> None:
-        """Initialize the agent and load tools."""
+        """Initialize the agent, then load MCP tools in the background."""
         terminal_view = self.app.query_one("#terminal-view", TerminalView)
-        terminal_view.write("$ Loading MCP tools...")
-        try:
-            self._mcp_tools = await load_mcp_tools()
-            tool_count = len(self._mcp_tools)
-            if tool_count > 0:
-                terminal_view.write(
-                    f"- {tool_count} tool{' is' if tool_count == 1 else 's are'} loaded.\n",
-                    True,
-                )
-            else:
-                terminal_view.write("- No tools found.\n", True)
-        except Exception:
-            terminal_view.write("- Error loading tools.\n", True)
+        # Servers connect concurrently while the agent is built, and their
+        # tools are added to the agent as soon as each one is ready
+        self._mcp_task = asyncio.create_task(self._load_mcp_tools())
+        # Let servers with cached schemas register their tools before the build
+        await asyncio.sleep(0)
 
         terminal_view.write("$ Loading agent...")
         try:
-            self._coding_agent = create_coding_agent(
-                plugin_tools=self._mcp_tools, checkpointer=self._checkpointer
+            self._checkpointer = await create_checkpointer(self._exit_stack)
+            mcp_tools_version = self._mcp_tools_version
+            self._repo_map_version = get_repo_map_version()
+            self._coding_agent = await asyncio.to_thread(
+                create_coding_agent,
+                plugin_tools=self._mcp_tools,
+                checkpointer=self._checkpointer,
             )
             terminal_view.write("- Agent loaded successfully.\n", True)
+            if self._mcp_tools_version != mcp_tools_version:
+                # Servers finished loading while the agent was being built
+                self.refresh_agent(force=True)
             self.is_generating = False
             if hasattr(self.app, "focus_input"):
                 self.app.focus_input()
@@ -85,16 +129,105 @@ class AgentController:
             await asyncio.sleep(3)
             self.app.exit(1)
 
+    async def _load_mcp_tools(self) -> None:
+        """Connect to MCP servers concurrently and add their tools as they load.
+
+        Servers with cached tool schemas are available immediately and are
+        revalidated in the background.
+        """
+        servers = get_mcp_server_configs()
+        if not servers:
+            return
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        terminal_view.write(
+            f"$ Connecting to {len(servers)} MCP server{'' if len(servers) == 1 else 's'}..."
+        )
+        async for server in iter_mcp_server_tools(
+            servers, self.mcp_schema_cache, self.mcp_session_pool
+        ):
+            if server.error is not None:
+                fallback = " Using cached tools." if server.tools else ""
+                terminal_view.write(
+                    f"- MCP server `{server.name}` failed: {server.error}.{fallback}\n",
+                    True,
+                )
+            else:
+                tool_count = len(server.tools)
+                source = "from cache" if server.cached else f"in {server.elapsed:.1f}s"
+                terminal_view.write(
+                    f"- MCP server `{server.name}`: {tool_count} "
+                    f"tool{' is' if tool_count == 1 else 's are'} loaded {source}.\n",
+                    True,
+                )
+            if server.tools is self._mcp_server_tools.get(server.name):
+                continue
+            self._mcp_server_tools[server.name] = server.tools
+            self._mcp_tools_version += 1
+            if self._coding_agent is not None:
+                # Hot-add the tools, the agent is swapped before the next turn
+                self.refresh_agent(force=True)
+
+        if self.mcp_schema_cache is not None:
+            stats = self.mcp_schema_cache.stats
+            terminal_view.write(
+                f"- MCP schema cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['updates']} updated.\n",
+                True,
+            )
+
+    async def reload_mcp_tools(self) -> None:
+        """Clear the MCP schema cache and reload the tools of all servers."""
+        if self._mcp_task is not None:
+            self._mcp_task.cancel()
+        if self.mcp_schema_cache is not None:
+            await asyncio.to_thread(self.mcp_schema_cache.clear)
+        servers = get_mcp_server_configs()
+        removed = [name for name in self._mcp_server_tools if name not in servers]
+        for name in removed:
+            del self._mcp_server_tools[name]
+            await self.mcp_session_pool.remove(name)
+        if removed:
+            self._mcp_tools_version += 1
+            self.refresh_agent(force=True)
+        self._mcp_task = asyncio.create_task(self._load_mcp_tools())
+        await self._mcp_task
+
+    def get_mcp_status(self) -> list[str]:
+        """Describe the loaded MCP servers, their sessions and the schema cache."""
+        session_stats = self.mcp_session_pool.stats
+        lines = []
+        for name, tools in self._mcp_server_tools.items():
+            line = f"- `{name}`: {len(tools)} tool{'' if len(tools) == 1 else 's'}"
+            stats = session_stats.get(name)
+            if stats is not None and stats["calls"]:
+                state = "connected" if stats["connected"] else "disconnected"
+                line += (
+                    f", {state}, {stats['calls']} calls ({stats['errors']} failed), "
+                    f"p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms, "
+                    f"{stats['reconnects']} reconnects"
+                )
+            lines.append(line)
+        if not lines:
+            lines.append("- No MCP tools loaded.")
+        if self.mcp_schema_cache is not None:
+            stats = self.mcp_schema_cache.stats
+            lines.append(
+                f"- Schema cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['updates']} updated."
+            )
+        return lines
+
     async def handle_user_input(self, user_message: HumanMessage) -> None:
         """Handle user input and stream the response."""
+        self._swap_spare_agent()
         self.process_outgoing_message(user_message)
         self.is_generating = True
         try:
             current_ai_message: AIMessageChunk | None = None
             async for event_type, chunk in self._coding_agent.astream(
                 {"messages": [user_message]},
-                stream_mode=["messages", "updates"],
-                config={"recursion_limit": 100, "thread_id": "thread_1"},
+                stream_mode=["messages", "updates", "custom"],
+                config={"recursion_limit": 100, **self._thread_config()},
             ):
                 if event_type == "messages":
                     if isinstance(chunk, Overwrite):
@@ -112,11 +245,17 @@ class AgentController:
                             self.process_incoming_message(current_ai_message)
                         else:
                             current_ai_message += message_chunk
-                            # During streaming, don't update tool call widgets to avoid partial parsing errors
-                            self.update_incoming_message(
-                                current_ai_message, update_tools=False
+                            # During streaming, only the text delta is buffered and appended
+                            # once per frame; tool call widgets are updated with the final message.
+                            delta = message_chunk.content
+                            self._stream_renderer.feed(
+                                current_ai_message,
+                                delta if isinstance(delta, str) else "",
                             )
 
+                elif event_type == "custom":
+                    self.process_tool_output(chunk)
+
                 elif event_type == "updates":
                     if isinstance(chunk, Overwrite):
                         chunk = chunk.value
@@ -150,6 +289,10 @@ class AgentController:
                                 user_idx = i
                         new_messages = messages[user_idx + 1 :]
 
+                        # Render any buffered text before the final message replaces it
+                        self._stream_renderer.flush()
+                        self._stream_renderer.stop()
+
                         # Use a flag to track if we've handled the first AI message in this update
                         # by updating the currently streaming message.
                         first_ai_in_node = True
@@ -180,7 +323,11 @@ class AgentController:
             )
             self.process_incoming_message(error_message)
         finally:
+            self._stream_renderer.stop()
+            self._output_buffer.flush()
+            self._output_buffer.stop()
             await self.save_current_history()
+            self.refresh_agent()
             self.is_generating = False
             if hasattr(self.app, "focus_input"):
                 self.app.focus_input()
@@ -202,6 +349,11 @@ class AgentController:
         chat_view = self.app.query_one("#chat-view", ChatView)
         chat_view.update_message(message, update_tools=update_tools)
 
+    def append_incoming_message(self, message: AnyMessage, delta: str) -> bool:
+        """Append streamed text to the last message in chat view."""
+        chat_view = self.app.query_one("#chat-view", ChatView)
+        return chat_view.append_to_message(message, delta)
+
     def process_tool_call_message(self, message: AIMessage) -> None:
         """Handle tool calls from the agent."""
         terminal_view = self.app.query_one("#terminal-view", TerminalView)
@@ -233,15 +385,44 @@ class AgentController:
                     "file_path"
                 ]
 
+    def process_tool_output(self, event: object) -> None:
+        """Buffer output streamed by a running command for the terminal view."""
+        if not isinstance(event, dict) or event.get("type") != EXECUTE_OUTPUT_EVENT:
+            return
+        tool_call_id = event.get("tool_call_id")
+        if tool_call_id in self._terminal_tool_calls:
+            self._output_buffer.feed(tool_call_id, event.get("text") or "")
+
+    def append_terminal_output(self, tool_call_id: str, text: str) -> None:
+        """Append output of a running command to the terminal view."""
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        terminal_view.append(tool_call_id, text)
+
     def process_tool_message(self, message: ToolMessage) -> None:
         """Handle tool results."""
         terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        if isinstance(message.artifact, dict) and message.artifact.get("cached"):
+            chat_view = self.app.query_one("#chat-view", ChatView)
+            chat_view.annotate_tool_call(message.tool_call_id, "cached")
         if message.tool_call_id in self._terminal_tool_calls:
-            output = self._extract_code(message.content)
-            terminal_view.write(
-                output if output.strip() != "" else "\n(empty)\n",
-                muted=True,
-            )
+            self._output_buffer.flush(message.tool_call_id)
+            # Streamed output is already shown, as the command ran
+            if terminal_view.end_stream(message.tool_call_id):
+                status = self._extract_command_status(message.content)
+                if status:
+                    terminal_view.write(status, muted=True)
+            else:
+                output = self._extract_code(message.content)
+                if len(output) > MAX_TERMINAL_RESULT_CHARS:
+                    more = len(output) - MAX_TERMINAL_RESULT_CHARS
+                    output = (
+                        f"{output[:MAX_TERMINAL_RESULT_CHARS]}\n"
+                        f"... {more} more characters\n"
+                    )
+                terminal_view.write(
+                    output if output.strip() != "" else "\n(empty)\n",
+                    muted=True,
+                )
             self._terminal_tool_calls.remove(message.tool_call_id)
         elif self._file_modification_tool_calls.get(message.tool_call_id):
             path = self._file_modification_tool_calls[message.tool_call_id]
@@ -254,13 +435,16 @@ class AgentController:
         if not self._coding_agent:
             return
 
-        config = {"configurable": {"thread_id": "thread_1"}}
         try:
-            state = await self._coding_agent.aget_state(config)
+            state = await self._coding_agent.aget_state(self._thread_config())
             messages = state.values.get("messages", [])
             if messages:
-                self.history_manager.save_session(
-                    messages, self._session_id, project_root=project.root_dir
+                # Only new messages are appended, but keep file IO off the event loop
+                await asyncio.to_thread(
+                    self.history_manager.save_session,
+                    messages,
+                    self._session_id,
+                    project_root=project.root_dir,
                 )
         except Exception:
             pass
@@ -285,31 +469,123 @@ class AgentController:
 
     def _extract_code(self, text: str) -> str:
         """Extract code from a markdown block."""
-        match = re.search(r"```(.*)```", text, re.DOTALL)
-        if match:
-            return match.group(1)
+        # From the first fence to the last one, without backtracking
+        start = text.find("```")
+        end = text.rfind("```")
+        if start != -1 and end > start + 2:
+            return text[start + 3 : end]
         return text
 
-    def clear_session(self) -> None:
-        """Reset the agent session."""
-        self._checkpointer = MemorySaver()
-        self._coding_agent = create_coding_agent(
-            plugin_tools=self._mcp_tools, checkpointer=self._checkpointer
+    def _extract_command_status(self, content: object) -> str:
+        """Extract the exit code and timeout or truncation notes of a command."""
+        if not isinstance(content, str):
+            return ""
+        lines = content.rstrip().split("\n")[-COMMAND_STATUS_LINES:]
+        return "\n".join(
+            line for line in lines if COMMAND_STATUS_PATTERN.match(line.strip())
         )
+
+    def _thread_config(self) -> dict:
+        """Get the config selecting the thread of the current session."""
+        return {"configurable": {"thread_id": self._session_id}}
+
+    def refresh_agent(self, force: bool = False) -> None:
+        """Prebuild a spare agent in the background if the config has changed.
+
+        The compiled agent is otherwise reused for every session, since
+        sessions only differ by thread. The spare agent replaces it at the
+        first turn, `/clear` or `/resume` after it has been built, so a
+        rebuild never delays any of them.
+
+        Args:
+            force: Rebuild even if the config has not changed, e.g. after the
+                MCP tools have changed.
+        """
+        if not reload_config_if_changed() and not force:
+            return
+        if self._spare_agent_task is not None:
+            self._spare_agent_task.cancel()
+        self._repo_map_version = get_repo_map_version()
+        self._spare_agent_task = asyncio.create_task(
+            asyncio.to_thread(
+                create_coding_agent,
+                plugin_tools=list(self._mcp_tools),
+                checkpointer=self._checkpointer,
+            )
+        )
+
+    def _swap_spare_agent(self) -> None:
+        """Replace the agent with the spare agent once it has been built."""
+        task = self._spare_agent_task
+        if task is None or not task.done():
+            # Keep using the current agent until the spare is ready
+            return
+        self._spare_agent_task = None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            terminal_view = self.app.query_one("#terminal-view", TerminalView)
+            terminal_view.write(f"- Error reloading agent: {task.exception()}\n", True)
+            return
+        self._coding_agent = task.result()
+
+    async def clear_session(self) -> None:
+        """Start a new session in a fresh thread of the same agent."""
+        if isinstance(self._checkpointer, MemorySaver):
+            # The session is saved to history, free its in-memory checkpoints
+            await self._checkpointer.adelete_thread(self._session_id)
+        self._swap_spare_agent()
+        # A repository map brought up to date since the agent was built is
+        # used from the next session on
+        self.refresh_agent(force=get_repo_map_version() != self._repo_map_version)
         self._terminal_tool_calls = []
         self._file_modification_tool_calls = {}
         self._session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    async def load_session(self, session_id: str, messages: list[AnyMessage]) -> None:
-        """Load a previous session."""
-        self._checkpointer = MemorySaver()
-        self._coding_agent = create_coding_agent(
-            plugin_tools=self._mcp_tools, checkpointer=self._checkpointer
-        )
+    async def resume_thread(self, session_id: str) -> list[AnyMessage] | None:
+        """Switch to a session whose state is still held by the checkpointer.
 
-        config = {"configurable": {"thread_id": "thread_1"}}
+        Returns:
+            The messages of the session, or None if the checkpointer has no
+            state for it and the session has to be loaded from history.
+        """
+        if not self._coding_agent:
+            return None
+        self._swap_spare_agent()
+        config = {"configurable": {"thread_id": session_id}}
+        state = await self._coding_agent.aget_state(config)
+        messages = state.values.get("messages") if state.values else None
+        if not messages:
+            return None
+
+        self._terminal_tool_calls = []
+        self._file_modification_tool_calls = {}
+        self._session_id = session_id
+        return messages
+
+    async def load_session(self, session_id: str, messages: list[AnyMessage]) -> None:
+        """Load a previous session by replaying its messages into a thread."""
+        self._swap_spare_agent()
+        config = {"configurable": {"thread_id": session_id}}
         await self._coding_agent.aupdate_state(config, {"messages": messages})
 
         self._terminal_tool_calls = []
         self._file_modification_tool_calls = {}
         self._session_id = session_id
+
+    async def shutdown(self) -> None:
+        """Release resources held by the agent, such as the checkpointer."""
+        for task in (self._spare_agent_task, self._mcp_task):
+            if task is not None:
+                task.cancel()
+        await self.mcp_session_pool.close()
+        await asyncio.to_thread(stop_project_watchers)
+        await asyncio.to_thread(close_shell_sessions)
+        clients = sys.modules.get("mini_opencode.tools.web.clients")
+        if clients is not None:
+            # Only close the web tool connections if a web tool was called
+            await clients.aclose_http_clients()
+        local_fetch = sys.modules.get("mini_opencode.tools.web.local_fetch")
+        if local_fetch is not None:
+            local_fetch.shutdown_extractors()
+        await self._exit_stack.aclose()
@@ -1,3 +1,5 @@
+import asyncio
+
 from langchain.messages import AIMessage
 from textual.app import App
 
@@ -9,6 +11,7 @@ from mini_opencode.cli.components import (
     TerminalView,
     TodoListView,
 )
+from mini_opencode.tools.rate_limit import get_rate_limit_stats
 
 from .agent_controller import AgentController
 
@@ -16,7 +19,16 @@ from .agent_controller import AgentController
 class CommandController:
     """Controller for handling slash commands."""
 
-    SLASH_COMMANDS = ["/clear", "/resume", "/exit", "/quit"]
+    SLASH_COMMANDS = [
+        "/clear",
+        "/resume",
+        "/reindex",
+        "/mcp",
+        "/limits",
+        "/search",
+        "/exit",
+        "/quit",
+    ]
 
     def __init__(self, app: "App", agent_controller: AgentController):
         self.app = app
@@ -33,6 +45,14 @@ class CommandController:
             self.app.run_worker(self.handle_clear_command())
         elif cmd == "/resume":
             self.handle_resume_command(args)
+        elif cmd == "/reindex":
+            self.app.run_worker(self.handle_reindex_command())
+        elif cmd == "/mcp":
+            self.app.run_worker(self.handle_mcp_command(args))
+        elif cmd == "/limits":
+            self.handle_limits_command()
+        elif cmd == "/search":
+            self.app.run_worker(self.handle_search_command(args))
         elif cmd == "/exit" or cmd == "/quit":
             self.app.run_worker(self.action_quit())
         else:
@@ -43,7 +63,7 @@ class CommandController:
         """Clear the current session and reset the agent."""
         await self.agent_controller.save_current_history()
 
-        self.agent_controller.clear_session()
+        await self.agent_controller.clear_session()
         self.clear_ui()
 
         chat_view = self.app.query_one("#chat-view", ChatView)
@@ -56,6 +76,70 @@ class CommandController:
         if hasattr(self.app, "focus_input"):
             self.app.focus_input()
 
+    async def handle_reindex_command(self) -> None:
+        """Rebuild the session catalog from the history directory."""
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        terminal_view.write("$ Rebuilding session catalog...")
+        try:
+            count = await asyncio.to_thread(self.history_manager.rebuild_catalog)
+            terminal_view.write(
+                f"- {count} session{' is' if count == 1 else 's are'} indexed.\n",
+                True,
+            )
+        except Exception as e:
+            terminal_view.write(f"- Error rebuilding session catalog: {e}\n", True)
+
+    async def handle_mcp_command(self, args: list[str]) -> None:
+        """Show the MCP status, or reload MCP tools with `/mcp refresh`."""
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        if args and args[0].lower() == "refresh":
+            await self.agent_controller.reload_mcp_tools()
+            return
+        if args:
+            terminal_view.write(f"Unknown /mcp argument: {args[0]}\n")
+            return
+
+        terminal_view.write("MCP servers:\n")
+        for line in self.agent_controller.get_mcp_status():
+            terminal_view.write(line + "\n", True)
+        terminal_view.write("Use /mcp refresh to reload MCP tools from the servers.\n")
+
+    def handle_limits_command(self) -> None:
+        """Show the calls, retries and waits of each rate-limited provider."""
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        stats = get_rate_limit_stats()
+        terminal_view.write("Rate limits:\n")
+        if not stats:
+            terminal_view.write("- No provider called yet.\n", True)
+            return
+        for name, s in sorted(stats.items()):
+            terminal_view.write(
+                f"- {name}: {s['calls']} calls, {s['retries']} retries, "
+                f"{s['throttled']} throttled, queue wait p50 {s['p50_wait_ms']:.0f} ms "
+                f"/ p95 {s['p95_wait_ms']:.0f} ms / max {s['max_wait_ms']:.0f} ms, "
+                f"slot wait p50 {s['p50_slot_wait_ms']:.0f} ms "
+                f"/ p95 {s['p95_slot_wait_ms']:.0f} ms "
+                f"/ max {s['max_slot_wait_ms']:.0f} ms\n",
+                True,
+            )
+
+    async def handle_search_command(self, args: list[str]) -> None:
+        """Search the terminal output, including lines scrolled out of memory."""
+        terminal_view = self.app.query_one("#terminal-view", TerminalView)
+        if not args:
+            terminal_view.write("Use /search <text> to search the terminal output.\n")
+            return
+        query = " ".join(args)
+        matches = await terminal_view.search(query)
+        terminal_view.write(f"Terminal lines matching {query!r}:")
+        if not matches:
+            terminal_view.write("- No matches.\n", True)
+            return
+        lines = [f"{number}: {text}" for number, text in matches]
+        if terminal_view.spill_path is not None:
+            lines.append(f"Older output is kept in {terminal_view.spill_path}")
+        terminal_view.write("\n".join(lines) + "\n", True)
+
     def handle_resume_command(self, args: list[str]) -> None:
         """List sessions or resume a specific session."""
         sessions = self.history_manager.list_sessions(project_root=project.root_dir)
@@ -91,14 +175,18 @@ class CommandController:
         try:
             await self.agent_controller.save_current_history()
 
-            messages = self.history_manager.load_session(session_id)
-            await self.agent_controller.load_session(session_id, messages)
+            # A durable checkpointer still holds the session, no replay needed
+            messages = await self.agent_controller.resume_thread(session_id)
+            if messages is None:
+                messages = await asyncio.to_thread(
+                    self.history_manager.load_session, session_id
+                )
+                await self.agent_controller.load_session(session_id, messages)
 
             self.clear_ui()
             chat_view = self.app.query_one("#chat-view", ChatView)
-            # MessageListView.clear already handles messages, we just need to add them back
-            for msg in messages:
-                chat_view.add_message(msg)
+            # Only the last page of messages is mounted, the rest are rendered on scroll
+            chat_view.set_messages(messages)
 
             terminal_view = self.app.query_one("#terminal-view", TerminalView)
             terminal_view.write(f"Resumed session: {session_id}\n")
@@ -113,6 +201,7 @@ class CommandController:
     async def action_quit(self) -> None:
         """Save history and exit the application."""
         await self.agent_controller.save_current_history()
+        await self.agent_controller.shutdown()
         self.app.exit()
 
     def clear_ui(self) -> None:
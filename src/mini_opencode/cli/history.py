@@ -1,6 +1,9 @@
 import datetime
+import hashlib
 import json
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 
 from langchain_core.messages import (
@@ -9,8 +12,38 @@ from langchain_core.messages import (
     messages_from_dict,
 )
 
+from .session_catalog import SessionCatalog
+
+# Rewrite a journal into its compact form after this many incremental saves
+COMPACT_EVERY = 50
+
+
+@dataclass
+class _JournalState:
+    """What has already been persisted to a session journal."""
+
+    count: int
+    # Rolling digest of the persisted messages, see `HistoryManager._digest`
+    digest: str
+    commits: int
+
 
 class HistoryManager:
+    """
+    Persist chat sessions as append-only JSONL journals.
+
+    Each `<session>.jsonl` file starts with a `session` record followed by
+    `message` records. Every save appends only the messages added since the
+    previous save plus a `commit` record, as a single append. Records after
+    the last commit (e.g. a torn write) are ignored when loading. Journals
+    are periodically rewritten atomically into their compact form.
+
+    Legacy `<session>.json` files are still readable.
+
+    Sessions are listed from a `SessionCatalog` that is updated on every
+    save, so listing never parses history files.
+    """
+
     def __init__(self, history_dir: str | Path | None = None):
         if history_dir is None:
             # Default to ~/.mini-opencode/history
@@ -25,6 +58,14 @@ class HistoryManager:
             self.history_dir = Path(".history")
             self.history_dir.mkdir(parents=True, exist_ok=True)
 
+        self._journals: dict[str, _JournalState] = {}
+        self._lock = threading.Lock()
+
+        self.catalog = SessionCatalog(self.history_dir / "catalog.sqlite3")
+        if self.catalog.created:
+            # Index history files saved before the catalog existed
+            self.rebuild_catalog()
+
     def save_session(
         self,
         messages: list[BaseMessage],
@@ -34,74 +75,267 @@ class HistoryManager:
         if not session_id:
             session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        filepath = self.history_dir / f"{session_id}.json"
-        data = [message_to_dict(m) for m in messages]
+        filepath = self.history_dir / f"{session_id}.jsonl"
+        with self._lock:
+            state = self._journals.get(session_id)
+            if (
+                state is not None
+                and filepath.exists()
+                and state.commits < COMPACT_EVERY
+                and len(messages) >= state.count
+                and self._digest(messages[: state.count]) == state.digest
+            ):
+                self._append(filepath, messages, state)
+            else:
+                # Unknown journal, rewritten history or too many commits
+                self._compact(filepath, messages, session_id, project_root)
 
-        # Add metadata if needed
-        full_data = {
-            "session_id": session_id,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "project_root": str(project_root) if project_root else None,
-            "messages": data,
-        }
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(full_data, f, ensure_ascii=False, indent=2)
+        now = datetime.datetime.now()
+        self.catalog.upsert(
+            session_id,
+            filepath,
+            project_root,
+            timestamp=now.isoformat(),
+            mtime=now.timestamp(),
+            preview=self._get_message_preview(messages),
+        )
         return str(filepath)
 
     def list_sessions(self, project_root: str | Path | None = None) -> list[dict]:
-        sessions = []
-        if not self.history_dir.exists():
-            return []
+        return self.catalog.query(project_root)
 
-        target_root = str(Path(project_root).resolve()) if project_root else None
+    def rebuild_catalog(self) -> int:
+        """
+        Rebuild the session catalog by scanning the history directory.
 
-        for p in self.history_dir.glob("*.json"):
+        Returns:
+            The number of indexed sessions.
+        """
+        entries = []
+        for p in self._session_files():
             try:
-                with open(p, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                    if target_root:
-                        session_root = data.get("project_root")
-                        if not session_root:
-                            continue
-                        if str(Path(session_root).resolve()) != target_root:
-                            continue
-
-                    sessions.append(
-                        {
-                            "id": p.stem,
-                            "path": str(p),
-                            "timestamp": data.get("timestamp", ""),
-                            "mtime": os.path.getmtime(p),
-                            "preview": self._get_preview(data.get("messages", [])),
-                        }
-                    )
+                if p.suffix == ".jsonl":
+                    data = self._read_journal_summary(p)
+                else:
+                    with open(p, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+
+                entries.append(
+                    {
+                        "id": p.stem,
+                        "path": str(p),
+                        "project_root": data.get("project_root"),
+                        "timestamp": data.get("timestamp", ""),
+                        "mtime": os.path.getmtime(p),
+                        "preview": self._get_preview(data.get("messages", [])),
+                    }
+                )
             except Exception:
                 continue
 
-        return sorted(sessions, key=lambda x: x["mtime"], reverse=True)
+        self.catalog.replace_all(entries)
+        return len(entries)
 
     def load_session(self, session_id: str) -> list[BaseMessage]:
-        filepath = self.history_dir / f"{session_id}.json"
-        if not filepath.exists():
-            # Try as full path
-            filepath = Path(session_id)
-            if not filepath.exists():
-                raise FileNotFoundError(f"Session {session_id} not found")
+        filepath = self._find_session_file(session_id)
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if filepath.suffix == ".jsonl":
+            messages_data, commits = self._read_journal(filepath)
+        else:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            messages_data, commits = data.get("messages", []), None
 
-        messages_data = data.get("messages", [])
-        return messages_from_dict(messages_data)
+        messages = messages_from_dict(messages_data)
+        if commits is not None:
+            # Later saves of this session can append to the journal
+            with self._lock:
+                self._journals[filepath.stem] = _JournalState(
+                    count=len(messages),
+                    digest=self._digest(messages),
+                    commits=commits,
+                )
+        return messages
 
     def _get_preview(self, messages: list[dict]) -> str:
         for msg in messages:
             if msg.get("type") == "human":
                 content = msg.get("data", {}).get("content", "")
-                if isinstance(content, list):
-                    # Handle multimodal content if any
-                    content = str(content)
-                return (content[:50] + "...") if len(content) > 50 else content
+                return self._format_preview(content)
         return "No human message"
+
+    def _get_message_preview(self, messages: list[BaseMessage]) -> str:
+        for msg in messages:
+            if msg.type == "human":
+                return self._format_preview(msg.content)
+        return "No human message"
+
+    @staticmethod
+    def _format_preview(content: str | list) -> str:
+        if isinstance(content, list):
+            # Handle multimodal content if any
+            content = str(content)
+        return (content[:50] + "...") if len(content) > 50 else content
+
+    def _session_files(self) -> list[Path]:
+        """List session files, preferring journals over legacy files."""
+        journals = {p.stem: p for p in self.history_dir.glob("*.jsonl")}
+        legacy = [p for p in self.history_dir.glob("*.json") if p.stem not in journals]
+        return [*journals.values(), *legacy]
+
+    def _find_session_file(self, session_id: str) -> Path:
+        for suffix in (".jsonl", ".json"):
+            filepath = self.history_dir / f"{session_id}{suffix}"
+            if filepath.exists():
+                return filepath
+        # Try as full path
+        filepath = Path(session_id)
+        if not filepath.exists():
+            raise FileNotFoundError(f"Session {session_id} not found")
+        return filepath
+
+    def _append(
+        self, filepath: Path, messages: list[BaseMessage], state: _JournalState
+    ) -> None:
+        """Append messages added since the last save, as one write."""
+        new_messages = messages[state.count :]
+        if not new_messages:
+            return
+        lines = [
+            self._record({"type": "message", "data": message_to_dict(m)})
+            for m in new_messages
+        ]
+        lines.append(self._commit_record(len(messages)))
+        self._write_all(filepath, "".join(lines))
+
+        state.count = len(messages)
+        state.digest = self._digest(new_messages, state.digest)
+        state.commits += 1
+
+    def _compact(
+        self,
+        filepath: Path,
+        messages: list[BaseMessage],
+        session_id: str,
+        project_root: str | Path | None,
+    ) -> None:
+        """Atomically rewrite the journal with the full message list."""
+        lines = [
+            self._record(
+                {
+                    "type": "session",
+                    "session_id": session_id,
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "project_root": str(project_root) if project_root else None,
+                }
+            )
+        ]
+        lines.extend(
+            self._record({"type": "message", "data": message_to_dict(m)})
+            for m in messages
+        )
+        lines.append(self._commit_record(len(messages)))
+
+        tmp_path = filepath.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+        # The journal supersedes a legacy file of the same session
+        filepath.with_suffix(".json").unlink(missing_ok=True)
+
+        self._journals[session_id] = _JournalState(
+            count=len(messages),
+            digest=self._digest(messages),
+            commits=0,
+        )
+
+    def _read_journal(self, filepath: Path) -> tuple[list[dict], int | None]:
+        """Read committed messages and the number of incremental commits.
+
+        The number of commits is None if the journal has an uncommitted tail,
+        so that the next save compacts it instead of appending after it.
+        """
+        messages_data: list[dict] = []
+        committed = 0
+        commits = -1  # The commit written by the compaction is not counted
+        line = "\n"
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the end of the journal
+                    break
+                record_type = record.get("type")
+                if record_type == "message":
+                    messages_data.append(record["data"])
+                elif record_type == "commit":
+                    committed = len(messages_data)
+                    commits += 1
+        if committed != len(messages_data) or not line.endswith("\n"):
+            return messages_data[:committed], None
+        return messages_data, max(commits, 0)
+
+    def _read_journal_summary(self, filepath: Path) -> dict:
+        """Read the session record and the first human message of a journal."""
+        data: dict = {"messages": []}
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                record_type = record.get("type")
+                if record_type == "session":
+                    data.update(record)
+                    data["messages"] = []
+                elif record_type == "message" and record["data"].get("type") == "human":
+                    data["messages"].append(record["data"])
+                    break
+        data["timestamp"] = datetime.datetime.fromtimestamp(
+            os.path.getmtime(filepath)
+        ).isoformat()
+        return data
+
+    def _commit_record(self, count: int) -> str:
+        return self._record(
+            {
+                "type": "commit",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "count": count,
+            }
+        )
+
+    @staticmethod
+    def _record(record: dict) -> str:
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _write_all(filepath: Path, text: str) -> None:
+        """Append text with a single O_APPEND write so records never interleave."""
+        data = text.encode("utf-8")
+        fd = os.open(filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _digest(messages: list[BaseMessage], digest: str = "") -> str:
+        """Chain the digests of messages, so a digest covers the whole prefix.
+
+        Extending the digest of a prefix with the messages after it gives the
+        digest of the whole list.
+        """
+        for message in messages:
+            payload = json.dumps(message_to_dict(message), sort_keys=True, default=str)
+            digest = hashlib.sha1(f"{digest}{payload}".encode("utf-8")).hexdigest()
+        return digest
+
+
+if __name__ == "__main__":
+    count = HistoryManager().rebuild_catalog()
+    print(f"Indexed {count} session{'' if count == 1 else 's'}.")
@@ -0,0 +1,118 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+
+class SessionCatalog:
+    """
+    SQLite index of saved sessions.
+
+    Stores the metadata needed to list sessions (project root, timestamp,
+    modification time and preview) so that listing does not have to open
+    and parse every history file.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        project_root TEXT,
+        timestamp TEXT NOT NULL,
+        mtime REAL NOT NULL,
+        preview TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sessions_by_root ON sessions (project_root, mtime);
+    """
+
+    def __init__(self, db_path: str | Path):
+        """
+        Initialize the catalog, creating the database if needed.
+
+        Args:
+            db_path: Path to the SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self.created = not self.db_path.exists()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def upsert(
+        self,
+        session_id: str,
+        path: str | Path,
+        project_root: str | Path | None,
+        timestamp: str,
+        mtime: float,
+        preview: str,
+    ) -> None:
+        """Insert or update the entry of a session."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO sessions (id, path, project_root, timestamp, mtime, preview)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    path = excluded.path,
+                    project_root = excluded.project_root,
+                    timestamp = excluded.timestamp,
+                    mtime = excluded.mtime,
+                    preview = excluded.preview
+                """,
+                (
+                    session_id,
+                    str(path),
+                    self.normalize_root(project_root),
+                    timestamp,
+                    mtime,
+                    preview,
+                ),
+            )
+
+    def replace_all(self, entries: list[dict]) -> None:
+        """Replace all entries in a single transaction."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions")
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO sessions
+                    (id, path, project_root, timestamp, mtime, preview)
+                VALUES (:id, :path, :project_root, :timestamp, :mtime, :preview)
+                """,
+                [
+                    {
+                        **entry,
+                        "project_root": self.normalize_root(entry["project_root"]),
+                    }
+                    for entry in entries
+                ],
+            )
+
+    def query(self, project_root: str | Path | None = None) -> list[dict]:
+        """
+        List sessions, newest first.
+
+        Args:
+            project_root: Only list sessions of this project root if given.
+
+        Returns:
+            A list of session entries.
+        """
+        sql = "SELECT id, path, timestamp, mtime, preview FROM sessions"
+        params: tuple = ()
+        if project_root:
+            sql += " WHERE project_root = ?"
+            params = (self.normalize_root(project_root),)
+        sql += " ORDER BY mtime DESC"
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def normalize_root(project_root: str | Path | None) -> str | None:
+        if not project_root:
+            return None
+        return str(Path(project_root).resolve())
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
@@ -0,0 +1,186 @@
+import time
+from typing import Callable
+
+from langchain.messages import AnyMessage
+from textual.app import App
+from textual.timer import Timer
+
+from mini_opencode.config import get_config_section
+
+DEFAULT_MAX_FPS = 30
+# Textual timers cannot be scheduled with a zero delay
+MIN_TIMER_DELAY = 0.001
+
+
+class StreamRenderer:
+    """Coalesce streamed message chunks into at most one render per frame.
+
+    Chunks fed to the renderer are buffered and handed to the flush callback
+    as a single text delta, so the chat view appends only the new tail of
+    the message instead of re-rendering the whole document for every token.
+    """
+
+    def __init__(
+        self,
+        app: App,
+        flush_callback: Callable[[AnyMessage, str], bool],
+        max_fps: float | None = None,
+    ):
+        """
+        Initialize the stream renderer.
+
+        Args:
+            app: The application used to schedule frame timers.
+            flush_callback: Called with the latest message and the buffered
+                text delta. Returns False if the view is still busy rendering
+                the previous delta, in which case it is retried next frame.
+            max_fps: Maximum number of flushes per second. Defaults to the
+                `ui/streaming/max_fps` config value.
+        """
+        self.app = app
+        self.flush_callback = flush_callback
+        if max_fps is None:
+            max_fps = get_config_section(["ui", "streaming", "max_fps"])
+        self.frame_interval = 1 / float(max_fps or DEFAULT_MAX_FPS)
+        self._message: AnyMessage | None = None
+        self._pending: list[str] = []
+        self._timer: Timer | None = None
+        self._last_flush = 0.0
+
+    def feed(self, message: AnyMessage, delta: str) -> None:
+        """
+        Buffer a text delta for the message being streamed.
+
+        Args:
+            message: The accumulated message so far.
+            delta: The newly received text.
+        """
+        self._message = message
+        if delta:
+            self._pending.append(delta)
+        self._schedule()
+
+    def flush(self) -> None:
+        """Render all buffered text now."""
+        self._timer = None
+        if self._message is None:
+            return
+        delta = "".join(self._pending)
+        if not self.flush_callback(self._message, delta):
+            # The view has not finished the previous append, try again next frame
+            self._schedule()
+            return
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def stop(self) -> None:
+        """Cancel any scheduled frame and forget the buffered message.
+
+        Call `flush` first if buffered text should still be rendered.
+        """
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._message = None
+        self._pending.clear()
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            return
+        delay = self._last_flush + self.frame_interval - time.monotonic()
+        self._timer = self.app.set_timer(max(delay, MIN_TIMER_DELAY), self.flush)
+
+
+# Characters of unrendered output kept per stream, the oldest are skipped
+MAX_PENDING_OUTPUT = 64 * 1024
+
+
+class OutputStreamBuffer:
+    """Coalesce the output of running commands into one render per frame.
+
+    Output is buffered by stream, and handed to the flush callback at most
+    once per frame. A stream producing output faster than it is rendered
+    only keeps its latest `max_pending` characters, so a flood of output
+    never grows the buffer nor the next render.
+    """
+
+    def __init__(
+        self,
+        app: App,
+        flush_callback: Callable[[str, str], None],
+        max_fps: float | None = None,
+        max_pending: int = MAX_PENDING_OUTPUT,
+    ):
+        """
+        Initialize the output stream buffer.
+
+        Args:
+            app: The application used to schedule frame timers.
+            flush_callback: Called with a stream id and its buffered output.
+            max_fps: Maximum number of flushes per second. Defaults to the
+                `ui/streaming/max_fps` config value.
+            max_pending: Characters of unrendered output kept per stream.
+        """
+        self.app = app
+        self.flush_callback = flush_callback
+        if max_fps is None:
+            max_fps = get_config_section(["ui", "streaming", "max_fps"])
+        self.frame_interval = 1 / float(max_fps or DEFAULT_MAX_FPS)
+        self.max_pending = max_pending
+        self._pending: dict[str, list[str]] = {}
+        self._sizes: dict[str, int] = {}
+        self._skipped: dict[str, int] = {}
+        self._timer: Timer | None = None
+        self._last_flush = 0.0
+
+    def feed(self, stream_id: str, text: str) -> None:
+        """Buffer output of a stream."""
+        if not text:
+            return
+        pending = self._pending.setdefault(stream_id, [])
+        pending.append(text)
+        size = self._sizes.get(stream_id, 0) + len(text)
+        while size > self.max_pending and len(pending) > 1:
+            dropped = pending.pop(0)
+            size -= len(dropped)
+            self._skipped[stream_id] = self._skipped.get(stream_id, 0) + len(dropped)
+        if size > self.max_pending:
+            # A single piece larger than the buffer, keep its tail
+            excess = size - self.max_pending
+            pending[0] = pending[0][excess:]
+            size -= excess
+            self._skipped[stream_id] = self._skipped.get(stream_id, 0) + excess
+        self._sizes[stream_id] = size
+        self._schedule()
+
+    def flush(self, stream_id: str | None = None) -> None:
+        """Render the buffered output of a stream, or of all streams, now."""
+        if stream_id is None:
+            self._timer = None
+            stream_ids = list(self._pending)
+        else:
+            stream_ids = [stream_id] if stream_id in self._pending else []
+        for key in stream_ids:
+            text = "".join(self._pending.pop(key))
+            self._sizes.pop(key, None)
+            skipped = self._skipped.pop(key, 0)
+            if skipped:
+                text = f"\n... {skipped} characters skipped\n{text}"
+            self.flush_callback(key, text)
+        if stream_ids:
+            self._last_flush = time.monotonic()
+
+    def stop(self) -> None:
+        """Cancel any scheduled frame and forget the buffered output."""
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._pending.clear()
+        self._sizes.clear()
+        self._skipped.clear()
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            return
+        delay = self._last_flush + self.frame_interval - time.monotonic()
+        self._timer = self.app.set_timer(max(delay, MIN_TIMER_DELAY), self.flush)
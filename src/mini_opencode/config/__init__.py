@@ -1,3 +1,3 @@
-from .config import get_config_section
+from .config import get_config_section, get_config_version, reload_config_if_changed
 
-__all__ = ["get_config_section"]
+__all__ = ["get_config_section", "get_config_version", "reload_config_if_changed"]
@@ -8,6 +8,11 @@ from dotenv import load_dotenv
 
 # Global configuration cache
 __config: dict[str, Any] | None = None
+# Path and modification time of the loaded configuration file
+__config_path: Path | None = None
+__config_mtime: float | None = None
+# Incremented every time the configuration is (re)loaded
+__config_version = 0
 __lock = threading.Lock()
 
 load_dotenv()
@@ -28,7 +33,7 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
         FileNotFoundError: If the configuration file cannot be found.
         yaml.YAMLError: If the configuration file is not valid YAML.
     """
-    global __config
+    global __config, __config_path, __config_mtime, __config_version
 
     if __config is not None:
         return __config
@@ -54,6 +59,9 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
                 data = yaml.safe_load(f)
                 config_data = data if data is not None else {}
                 __config = _expand_env_vars(config_data)
+                __config_path = path
+                __config_mtime = path.stat().st_mtime
+                __config_version += 1
             except yaml.YAMLError as e:
                 raise yaml.YAMLError(
                     f"Error parsing configuration file {path}: {e}"
@@ -62,6 +70,44 @@ def load_config(config_path: str | Path | None = None) -> dict[str, Any]:
     return __config
 
 
+def reload_config_if_changed() -> bool:
+    """
+    Reload the configuration if its file has been modified since it was loaded.
+
+    Returns:
+        True if the configuration was reloaded.
+    """
+    global __config, __config_mtime, __config_version
+
+    if __config is None or __config_path is None:
+        return False
+
+    with __lock:
+        try:
+            mtime = __config_path.stat().st_mtime
+            if mtime == __config_mtime:
+                return False
+            with __config_path.open("r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            # Keep the previous configuration until the file is valid again
+            return False
+        __config = _expand_env_vars(data if data is not None else {})
+        __config_mtime = mtime
+        __config_version += 1
+    return True
+
+
+def get_config_version() -> int:
+    """
+    Get the version of the loaded configuration.
+
+    The version changes whenever the configuration is reloaded, so values
+    derived from it can be cached until then.
+    """
+    return __config_version
+
+
 def _expand_env_vars(data: Any) -> Any:
     """
     Recursively expand environment variables in the configuration data.
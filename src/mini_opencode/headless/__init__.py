@@ -0,0 +1,3 @@
+from .batch_runner import BatchRunner, BatchTask, load_batch_tasks, summarize_results
+
+__all__ = ["BatchRunner", "BatchTask", "load_batch_tasks", "summarize_results"]
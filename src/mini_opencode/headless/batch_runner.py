@@ -0,0 +1,259 @@
+import asyncio
+import json
+import sys
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+from langchain.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from mini_opencode.agents import create_checkpointer, create_coding_agent
+from mini_opencode.index import (
+    get_project_watcher,
+    get_repo_map_version,
+    stop_project_watchers,
+)
+from mini_opencode.project import Project
+from mini_opencode.shell import close_shell_session, set_max_shell_sessions
+from mini_opencode.tools import load_mcp_tools
+
+DEFAULT_CONCURRENCY = 4
+RECURSION_LIMIT = 100
+
+
+@dataclass
+class BatchTask:
+    """A prompt to run in its own session."""
+
+    id: str
+    prompt: str
+    root_dir: Path
+
+
+def load_batch_tasks(path: str | Path, default_root: str | Path) -> list[BatchTask]:
+    """
+    Load batch tasks from a JSONL file.
+
+    Each line is an object with a required `prompt` and optional `id` and
+    `root_dir` keys, the line number being the default id. Blank lines are
+    skipped.
+
+    Args:
+        path: Path to the JSONL file.
+        default_root: Project root of tasks without a `root_dir`.
+
+    Returns:
+        The tasks, in file order.
+
+    Raises:
+        ValueError: If a line is not a valid task, or reuses the id of an
+            earlier task, whose session and shell it would share.
+    """
+    tasks = []
+    lines_by_id: dict[str, int] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                prompt = data["prompt"]
+                root_dir = Project(data.get("root_dir") or default_root).root_dir
+            except (json.JSONDecodeError, KeyError, TypeError, OSError) as e:
+                raise ValueError(f"Invalid task on line {line_number}: {e}") from e
+            task_id = str(data.get("id", line_number))
+            if task_id in lines_by_id:
+                raise ValueError(
+                    f"Invalid task on line {line_number}: the id {task_id!r} is "
+                    f"already used on line {lines_by_id[task_id]}"
+                )
+            lines_by_id[task_id] = line_number
+            tasks.append(BatchTask(id=task_id, prompt=prompt, root_dir=root_dir))
+    return tasks
+
+
+class BatchRunner:
+    """
+    Run batch tasks headlessly, several sessions at a time on one event loop.
+
+    Each task runs in its own checkpointer thread. One agent is compiled per
+    distinct project root and shared by the tasks of that root. A result
+    record is written as soon as a task finishes, with its wall time and
+    token usage.
+    """
+
+    def __init__(
+        self,
+        output: TextIO,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float | None = None,
+        use_mcp_tools: bool = True,
+    ):
+        """
+        Initialize the batch runner.
+
+        Args:
+            output: Stream the JSONL result records are written to.
+            concurrency: Maximum number of sessions running at once.
+            timeout: Maximum seconds per task, or None for no limit.
+            use_mcp_tools: Whether to load the configured MCP tools.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        self.output = output
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.use_mcp_tools = use_mcp_tools
+        self._checkpointer: BaseCheckpointSaver | None = None
+        self._plugin_tools: list = []
+        # Agent of each root, with the version of the repository maps it has
+        self._agents: dict[Path, tuple[int, asyncio.Future]] = {}
+
+    async def run(self, tasks: list[BatchTask]) -> list[dict]:
+        """
+        Run all tasks and write their results.
+
+        Returns:
+            The result records, in task order.
+        """
+        async with AsyncExitStack() as stack:
+            # Keeps the project indexes fresh as the tasks change files
+            stack.push_async_callback(asyncio.to_thread, stop_project_watchers)
+            for root_dir in {task.root_dir for task in tasks}:
+                watcher = get_project_watcher(root_dir)
+                if watcher is not None:
+                    watcher.start()
+            self._checkpointer = await create_checkpointer(stack)
+            if self.use_mcp_tools:
+                try:
+                    self._plugin_tools = await load_mcp_tools()
+                except Exception as e:
+                    print(f"Error loading MCP tools: {e}", file=sys.stderr)
+
+            # A shell is kept for each running task until the task ends
+            set_max_shell_sessions(self.concurrency)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def run_limited(task: BatchTask) -> dict:
+                async with semaphore:
+                    result = await self._run_task(task)
+                self._write_result(result)
+                return result
+
+            return await asyncio.gather(*(run_limited(task) for task in tasks))
+
+    async def _get_agent(self, root_dir: Path):
+        """
+        Get the agent of a project root, compiling it on first use.
+
+        It is compiled again for the next tasks once the repository map is
+        brought up to date.
+        """
+        version = get_repo_map_version()
+        entry = self._agents.get(root_dir)
+        if entry is not None and (entry[0] == version or not entry[1].done()):
+            future = entry[1]
+        else:
+            # Concurrent tasks of the same root wait for a single build
+            future = asyncio.ensure_future(
+                asyncio.to_thread(
+                    create_coding_agent,
+                    plugin_tools=self._plugin_tools,
+                    checkpointer=self._checkpointer,
+                    root_dir=root_dir,
+                )
+            )
+            self._agents[root_dir] = (version, future)
+        return await asyncio.shield(future)
+
+    async def _run_task(self, task: BatchTask) -> dict:
+        """Run a task in its own thread and build its result record."""
+        thread_id = f"batch-{task.id}"
+        config = {
+            "recursion_limit": RECURSION_LIMIT,
+            "configurable": {"thread_id": thread_id},
+        }
+        usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        result = {
+            "id": task.id,
+            "root_dir": str(task.root_dir),
+            "thread_id": thread_id,
+            "status": "ok",
+            "output": "",
+            "error": None,
+            "tool_calls": 0,
+            "usage": usage,
+        }
+
+        start = time.perf_counter()
+        deadline = None
+        try:
+            agent = await self._get_agent(task.root_dir)
+            async with asyncio.timeout(self.timeout) as deadline:
+                async for chunk in agent.astream(
+                    {"messages": [HumanMessage(content=task.prompt)]},
+                    stream_mode="updates",
+                    config=config,
+                ):
+                    for message in self._iter_ai_messages(chunk):
+                        result["tool_calls"] += len(message.tool_calls)
+                        if message.usage_metadata:
+                            for key in usage:
+                                usage[key] += message.usage_metadata.get(key, 0)
+                        if message.text:
+                            result["output"] = message.text
+        except TimeoutError as e:
+            if deadline is not None and deadline.expired():
+                result["status"] = "timeout"
+                result["error"] = f"Task exceeded {self.timeout:g}s"
+            else:
+                # Raised by the agent itself, such as a tool timing out
+                result["status"] = "error"
+                result["error"] = str(e) or "TimeoutError"
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        result["wall_time"] = round(time.perf_counter() - start, 3)
+
+        if isinstance(self._checkpointer, MemorySaver):
+            # The result is recorded, free the in-memory checkpoints
+            await self._checkpointer.adelete_thread(thread_id)
+        await asyncio.to_thread(close_shell_session, task.root_dir, thread_id)
+        return result
+
+    @staticmethod
+    def _iter_ai_messages(chunk: dict):
+        """Yield the AI messages of a graph `updates` chunk."""
+        if not isinstance(chunk, dict):
+            return
+        for node_output in chunk.values():
+            if not isinstance(node_output, dict):
+                continue
+            messages = node_output.get("messages", [])
+            # Nodes may return an Overwrite wrapper instead of a list
+            messages = getattr(messages, "value", messages)
+            if not isinstance(messages, (list, tuple)):
+                messages = [messages]
+            for message in messages:
+                if isinstance(message, AIMessage):
+                    yield message
+
+    def _write_result(self, result: dict) -> None:
+        self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+
+def summarize_results(results: list[dict], wall_time: float) -> str:
+    """Format a one-line summary of batch results."""
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    total_tokens = sum(r["usage"]["total_tokens"] for r in results)
+    task_times = sorted(r["wall_time"] for r in results)
+    median = task_times[len(task_times) // 2] if task_times else 0.0
+    return (
+        f"{succeeded}/{len(results)} tasks succeeded in {wall_time:.1f}s "
+        f"(median task {median:.1f}s, {total_tokens} tokens)"
+    )
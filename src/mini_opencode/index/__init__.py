@@ -0,0 +1,24 @@
+from .backend import IndexedShellBackend
+from .files import list_project_files
+from .project_index import ProjectIndex, get_project_index
+from .repo_map import build_repo_map, get_repo_map, get_repo_map_version
+from .symbol_index import SymbolIndex, get_symbol_index
+from .symbols import Symbol, register_extractor
+from .watcher import ProjectWatcher, get_project_watcher, stop_project_watchers
+
+__all__ = [
+    "IndexedShellBackend",
+    "ProjectIndex",
+    "ProjectWatcher",
+    "Symbol",
+    "SymbolIndex",
+    "build_repo_map",
+    "get_project_index",
+    "get_project_watcher",
+    "get_repo_map",
+    "get_repo_map_version",
+    "get_symbol_index",
+    "list_project_files",
+    "register_extractor",
+    "stop_project_watchers",
+]
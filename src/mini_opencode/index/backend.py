@@ -0,0 +1,138 @@
+from datetime import datetime
+from pathlib import Path
+
+from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.protocol import EditResult, FileInfo, GrepMatch, WriteResult
+
+from .files import compile_glob
+from .project_index import ProjectIndex
+
+
+class IndexedShellBackend(LocalShellBackend):
+    """
+    Local shell backend answering `grep` and `glob` from a project index.
+
+    Searches outside the project root, or made before the index is ready,
+    fall back to scanning the tree. Files written or edited by the agent
+    are indexed again right away.
+    """
+
+    def __init__(self, root_dir: str | Path, index: ProjectIndex, **kwargs):
+        """
+        Initialize the backend.
+
+        Args:
+            root_dir: Working directory for file operations and shell commands.
+            index: The index of the project at `root_dir`.
+            **kwargs: Additional keyword arguments to pass to `LocalShellBackend`.
+        """
+        super().__init__(root_dir=root_dir, **kwargs)
+        self.index = index
+
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        try:
+            base = self._resolve_path(path or ".")
+        except ValueError:
+            return []
+        prefix = self._index_prefix(base)
+        if prefix is None or not base.exists():
+            return super().grep_raw(pattern, path, glob)
+
+        if base.is_file():
+            candidates, large = [prefix], []
+        else:
+            candidates, large = self.index.search_candidates(pattern, prefix)
+        if glob:
+            regex = compile_glob(glob)
+            start = len(prefix) + 1 if prefix and not base.is_file() else 0
+            candidates = [p for p in candidates if regex.match(p[start:])]
+            large = [p for p in large if regex.match(p[start:])]
+
+        needle = pattern.encode()
+        matches: list[GrepMatch] = []
+        for rel in sorted({*candidates, *large}):
+            full = self.index.root_dir / rel
+            try:
+                data = full.read_bytes()
+            except OSError:
+                continue
+            if needle not in data:
+                continue
+            text = data.decode(errors="replace")
+            virtual_path = self._to_virtual_path(full)
+            for line_number, line in enumerate(text.splitlines(), 1):
+                if pattern in line:
+                    matches.append(
+                        {"path": virtual_path, "line": line_number, "text": line}
+                    )
+        return matches
+
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        search_path = self.cwd if path == "/" else self._resolve_path(path)
+        prefix = self._index_prefix(search_path)
+        if prefix is None or not search_path.is_dir():
+            return super().glob_info(pattern, path)
+
+        regex = compile_glob(pattern)
+        start = len(prefix) + 1 if prefix else 0
+        results: list[FileInfo] = []
+        for rel in self.index.list_files(prefix):
+            if not regex.match(rel[start:]):
+                continue
+            full = self.index.root_dir / rel
+            try:
+                st = full.stat()
+            except OSError:
+                continue
+            results.append(
+                {
+                    "path": self._to_virtual_path(full),
+                    "is_dir": False,
+                    "size": int(st.st_size),
+                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                }
+            )
+        results.sort(key=lambda x: x.get("path", ""))
+        return results
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        result = super().write(file_path, content)
+        if not result.error:
+            self._reindex(file_path)
+        return result
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        result = super().edit(file_path, old_string, new_string, replace_all)
+        if not result.error:
+            self._reindex(file_path)
+        return result
+
+    def _index_prefix(self, path: Path) -> str | None:
+        """Get a path relative to the root if the index can answer for it."""
+        if not self.index.ready.is_set():
+            return None
+        return self.index.relative_path(path)
+
+    def _reindex(self, file_path: str) -> None:
+        try:
+            rel = self.index.relative_path(self._resolve_path(file_path))
+        except ValueError:
+            return
+        if rel:
+            self.index.update_paths([rel])
+
+    def _to_virtual_path(self, full: Path) -> str:
+        if not self.virtual_mode:
+            return str(full)
+        return "/" + full.relative_to(self.cwd).as_posix()
@@ -0,0 +1,298 @@
+import os
+import re
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+# Directories never listed, even without a `.gitignore` excluding them
+ALWAYS_IGNORED_DIRS = {".git", ".hg", ".svn"}
+
+
+def list_project_files(root_dir: Path) -> list[str]:
+    """
+    List the files of a project that are not ignored by git.
+
+    Git lists the files itself when the project is a repository, otherwise
+    the tree is walked honoring the `.gitignore` files found in it.
+
+    Args:
+        root_dir: The project root directory.
+
+    Returns:
+        Paths relative to the root, with `/` separators.
+    """
+    try:
+        output = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(root_dir),
+                "ls-files",
+                "-z",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+            ],
+            capture_output=True,
+            timeout=60,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return _walk_files(root_dir)
+    # Deleted files are still listed until the deletion is staged
+    return [
+        path
+        for path in dict.fromkeys(os.fsdecode(p) for p in output.split(b"\0") if p)
+        if os.path.isfile(root_dir / path)
+    ]
+
+
+def list_project_dirs(files: list[str]) -> set[str]:
+    """Get the directories holding a list of project files, including the root."""
+    dirs = {""}
+    for path in files:
+        parent = path.rpartition("/")[0]
+        while parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition("/")[0]
+    return dirs
+
+
+def filter_ignored(root_dir: Path, paths: list[str]) -> list[str]:
+    """
+    Drop the paths ignored by git from a list of paths relative to the root.
+
+    Tracked files are kept even if a `.gitignore` rule matches them.
+    """
+    if not paths:
+        return []
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(root_dir), "check-ignore", "-z", "--stdin"],
+            input=b"".join(os.fsencode(p) + b"\0" for p in paths),
+            capture_output=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        result = None
+    # Exits with 1 when no path is ignored, and 128 outside a repository
+    if result is not None and result.returncode in (0, 1):
+        ignored = {os.fsdecode(p) for p in result.stdout.split(b"\0") if p}
+        return [path for path in paths if path not in ignored]
+
+    ignores: dict[str, GitIgnore | None] = {}
+    return [path for path in paths if not _is_ignored(root_dir, path, ignores)]
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a glob pattern to a regex matching paths with `/` separators.
+
+    `*` and `?` do not cross directories, `**` does, and `{a,b}` matches
+    either alternative.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                body = body.replace("\\", "\\\\")
+                parts.append(f"[{body}]")
+                i = end
+        elif c == "{":
+            end = _find_brace_end(pattern, i)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                alternatives = _split_alternatives(pattern[i + 1 : end])
+                parts.append(
+                    "(?:" + "|".join(glob_to_regex(a) for a in alternatives) + ")"
+                )
+                i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> re.Pattern:
+    """
+    Compile a glob pattern matching a path at any depth, like `Path.rglob`.
+
+    A leading `/` anchors the pattern to the directory searched from.
+    """
+    if pattern.startswith("/"):
+        return re.compile(glob_to_regex(pattern.lstrip("/")) + r"\Z")
+    return re.compile(r"(?:.*/)?" + glob_to_regex(pattern) + r"\Z")
+
+
+class GitIgnore:
+    """Rules of a `.gitignore` file, relative to the directory holding it."""
+
+    def __init__(self, base: str, lines: list[str]):
+        """
+        Parse the rules of a `.gitignore` file.
+
+        Args:
+            base: The directory of the file relative to the root, or "".
+            lines: The lines of the file.
+        """
+        self.base = base
+        self.rules: list[tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # Patterns with a slash are anchored to the directory of the file
+            if "/" in line:
+                regex = glob_to_regex(line.lstrip("/"))
+            else:
+                regex = r"(?:.*/)?" + glob_to_regex(line)
+            self.rules.append((re.compile(regex + r"\Z"), negate, dir_only))
+
+    def match(self, path: str, is_dir: bool) -> bool | None:
+        """
+        Check if a path relative to the root is ignored by the rules.
+
+        Returns:
+            True if ignored, False if re-included, or None if no rule matches.
+        """
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return None
+            path = path[len(self.base) + 1 :]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                result = not negate
+        return result
+
+
+def _walk_files(root_dir: Path) -> list[str]:
+    files = []
+    ignores: list[GitIgnore] = []
+
+    def is_ignored(path: str, is_dir: bool) -> bool:
+        ignored = False
+        for ignore in ignores:
+            result = ignore.match(path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+    def walk(directory: Path, rel: str) -> None:
+        gitignore = directory / ".gitignore"
+        pushed = False
+        if gitignore.is_file():
+            try:
+                lines = gitignore.read_text(errors="replace").splitlines()
+            except OSError:
+                lines = []
+            ignores.append(GitIgnore(rel, lines))
+            pushed = True
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name not in ALWAYS_IGNORED_DIRS and not is_ignored(path, True):
+                    walk(Path(entry.path), path)
+            elif entry.is_file() and not is_ignored(path, False):
+                files.append(path)
+        if pushed:
+            ignores.pop()
+
+    walk(root_dir, "")
+    return files
+
+
+def _is_ignored(
+    root_dir: Path, path: str, ignores: dict[str, GitIgnore | None]
+) -> bool:
+    """Check a path against the `.gitignore` files of the directories above it."""
+    parts = path.split("/")
+    if ALWAYS_IGNORED_DIRS.intersection(parts[:-1]):
+        return True
+    chain = []
+    for depth in range(len(parts)):
+        base = "/".join(parts[:depth])
+        if base not in ignores:
+            gitignore = root_dir / base / ".gitignore"
+            try:
+                lines = gitignore.read_text(errors="replace").splitlines()
+                ignores[base] = GitIgnore(base, lines)
+            except OSError:
+                ignores[base] = None
+        if ignores[base] is not None:
+            chain.append(ignores[base])
+        # An ignored directory hides everything below it
+        target = "/".join(parts[: depth + 1])
+        ignored = False
+        for ignore in chain:
+            result = ignore.match(target, depth < len(parts) - 1)
+            if result is not None:
+                ignored = result
+        if ignored:
+            return True
+    return False
+
+
+def _find_brace_end(pattern: str, start: int) -> int:
+    depth = 0
+    for i in range(start, len(pattern)):
+        if pattern[i] == "{":
+            depth += 1
+        elif pattern[i] == "}":
+            depth -= 1
+            if not depth:
+                return i
+    return -1
+
+
+def _split_alternatives(body: str) -> list[str]:
+    alternatives, depth, start = [], 0, 0
+    for i, c in enumerate(body):
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+        elif c == "," and not depth:
+            alternatives.append(body[start:i])
+            start = i + 1
+    alternatives.append(body[start:])
+    return alternatives
@@ -0,0 +1,417 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple
+
+from mini_opencode.config import get_config_section
+
+from .files import ALWAYS_IGNORED_DIRS, filter_ignored, list_project_files
+from .watcher import get_project_watcher
+
+DEFAULT_INDEX_DIR = Path.home() / ".mini-opencode" / "index"
+# Larger files are not indexed, and are scanned by every search instead
+DEFAULT_MAX_FILE_SIZE_KB = 1024
+# Bytes sniffed for a NUL byte to tell binary files apart
+BINARY_SNIFF_SIZE = 8192
+# Files indexed per transaction
+BATCH_SIZE = 500
+
+# Kinds of indexed files
+TEXT = 1
+LARGE = 0
+BINARY = 2
+
+
+class IndexedFile(NamedTuple):
+    id: int
+    size: int
+    mtime_ns: int
+    kind: int
+
+
+class ProjectIndex:
+    """
+    Persistent trigram index of the text files of a project.
+
+    Each text file is indexed by the set of its lowercased byte trigrams, so
+    a literal search only reads the files holding every trigram of the
+    pattern. The file list honors `.gitignore`.
+
+    Changed files get a new ID rather than having their old postings
+    removed, and the postings are rebuilt once stale IDs outnumber live
+    ones.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        kind INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS postings (
+        trigram BLOB PRIMARY KEY,
+        files BLOB NOT NULL
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        db_path: str | Path | None = None,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE_KB * 1024,
+    ):
+        """
+        Initialize the index, loading the file list of a previous run.
+
+        Args:
+            root_dir: The project root directory.
+            db_path: Path to the SQLite database file. Defaults to a file
+                named after the root in `~/.mini-opencode/index`.
+            max_file_size: Files larger than this many bytes are not indexed.
+        """
+        self.root_dir = Path(root_dir).resolve()
+        self.db_path = Path(db_path) if db_path else default_index_path(self.root_dir)
+        self.max_file_size = max_file_size
+        # The index is only used once refreshed, so it never misses a file
+        # changed while the app was not running
+        self.ready = threading.Event()
+        self._files: dict[str, IndexedFile] = {}
+        self._paths: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            for row in conn.execute("SELECT path, id, size, mtime_ns, kind FROM files"):
+                self._files[row[0]] = IndexedFile(*row[1:])
+                self._paths[row[1]] = row[0]
+
+    def start(self) -> None:
+        """Refresh the index in a background thread, once."""
+        with self._lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="project-index", daemon=True
+            )
+        self._refresh_thread.start()
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the project tree.
+
+        Returns:
+            The number of files indexed again.
+        """
+        paths = list_project_files(self.root_dir)
+        with self._write_lock:
+            if self._stale_count() > len(self._files):
+                self._rebuild_postings()
+            count = self._update(paths, set(self._files) - set(paths))
+        self.ready.set()
+        return count
+
+    def update_paths(self, paths: list[str]) -> int:
+        """
+        Index files again, or drop them if they no longer exist.
+
+        New files ignored by git are not added.
+
+        Args:
+            paths: Paths relative to the root.
+
+        Returns:
+            The number of files indexed again.
+        """
+        existing, new, removed = [], [], set()
+        for path in paths:
+            if not (self.root_dir / path).is_file():
+                removed.add(path)
+            elif path in self._files:
+                existing.append(path)
+            else:
+                new.append(path)
+        existing.extend(filter_ignored(self.root_dir, new))
+        with self._write_lock:
+            return self._update(existing, removed)
+
+    def apply_changes(self, paths: set[str] | None) -> None:
+        """
+        Update the index for the paths reported by a `ProjectWatcher`.
+
+        Args:
+            paths: Changed paths relative to the root, or None if any file
+                may have changed.
+        """
+        if paths is None or any(
+            path.rpartition("/")[2] == ".gitignore" for path in paths
+        ):
+            # The file list itself may have changed
+            self.refresh()
+            return
+        # A changed directory stands for every file below it, whether it is
+        # still there or was indexed before it moved away
+        with self._lock:
+            indexed = list(self._files)
+        expanded = set()
+        for path in paths:
+            full = self.root_dir / path
+            if full.is_dir():
+                expanded.update(_walk_dir(full, path))
+            else:
+                expanded.add(path)
+            if path not in self._files:
+                expanded.update(p for p in indexed if p.startswith(path + "/"))
+        self.update_paths(sorted(expanded))
+
+    def relative_path(self, path: str | Path) -> str | None:
+        """Get a path relative to the root, or None if it is outside the root."""
+        try:
+            rel = Path(path).resolve().relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return None
+        return "" if rel == "." else rel
+
+    def list_files(self, prefix: str = "") -> list[str]:
+        """List the indexed files under a directory relative to the root."""
+        with self._lock:
+            paths = list(self._files)
+        if not prefix:
+            return paths
+        return [path for path in paths if path.startswith(prefix + "/")]
+
+    def search_candidates(
+        self, pattern: str, prefix: str = ""
+    ) -> tuple[list[str], list[str]]:
+        """
+        Get the files that may contain a literal pattern.
+
+        Args:
+            pattern: The literal pattern.
+            prefix: Only files under this directory relative to the root.
+
+        Returns:
+            The text files holding every trigram of the pattern, and the
+            files too large to be indexed, which have to be scanned.
+        """
+        trigrams = get_trigrams(pattern.encode())
+        if trigrams:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT files FROM postings WHERE trigram IN "
+                    f"({','.join('?' * len(trigrams))})",
+                    list(trigrams),
+                ).fetchall()
+            if len(rows) < len(trigrams):
+                ids: set[int] = set()
+            else:
+                # Intersect from the shortest posting list
+                postings = sorted((row[0] for row in rows), key=len)
+                ids = set(_unpack(postings[0]))
+                for blob in postings[1:]:
+                    if not ids:
+                        break
+                    ids.intersection_update(_unpack(blob))
+
+        candidates, large = [], []
+        with self._lock:
+            if trigrams:
+                candidates = [self._paths[i] for i in ids if i in self._paths]
+            for path, indexed in self._files.items():
+                if not trigrams and indexed.kind == TEXT:
+                    candidates.append(path)
+                elif indexed.kind == LARGE:
+                    large.append(path)
+        if prefix:
+            candidates = [p for p in candidates if p.startswith(prefix + "/")]
+            large = [p for p in large if p.startswith(prefix + "/")]
+        return sorted(candidates), sorted(large)
+
+    def _update(self, paths: list[str], removed: set[str]) -> int:
+        changed = []
+        for path in paths:
+            try:
+                stat = os.stat(self.root_dir / path)
+            except OSError:
+                removed.add(path)
+                continue
+            indexed = self._files.get(path)
+            if (
+                indexed is None
+                or indexed.size != stat.st_size
+                or indexed.mtime_ns != stat.st_mtime_ns
+            ):
+                changed.append((path, stat))
+
+        if removed:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "DELETE FROM files WHERE path = ?", [(p,) for p in removed]
+                )
+            with self._lock:
+                for path in removed:
+                    indexed = self._files.pop(path, None)
+                    if indexed is not None:
+                        self._paths.pop(indexed.id, None)
+
+        for start in range(0, len(changed), BATCH_SIZE):
+            self._index_batch(changed[start : start + BATCH_SIZE])
+        return len(changed)
+
+    def _index_batch(self, batch: list[tuple[str, os.stat_result]]) -> None:
+        postings: dict[bytes, array] = {}
+        indexed: dict[str, IndexedFile] = {}
+        with closing(self._connect()) as conn, conn:
+            for path, stat in batch:
+                kind, trigrams = self._read_trigrams(path, stat.st_size)
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                cursor = conn.execute(
+                    "INSERT INTO files (path, size, mtime_ns, kind) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime_ns, kind),
+                )
+                file_id = cursor.lastrowid
+                indexed[path] = IndexedFile(
+                    file_id, stat.st_size, stat.st_mtime_ns, kind
+                )
+                for trigram in trigrams:
+                    postings.setdefault(trigram, array("I")).append(file_id)
+            self._merge_postings(conn, postings)
+        with self._lock:
+            for path, entry in indexed.items():
+                previous = self._files.get(path)
+                if previous is not None:
+                    self._paths.pop(previous.id, None)
+                self._files[path] = entry
+                self._paths[entry.id] = path
+
+    def _read_trigrams(self, path: str, size: int) -> tuple[int, set[bytes]]:
+        try:
+            with open(self.root_dir / path, "rb") as f:
+                if b"\0" in f.read(BINARY_SNIFF_SIZE):
+                    return BINARY, set()
+                if size > self.max_file_size:
+                    return LARGE, set()
+                f.seek(0)
+                data = f.read()
+        except OSError:
+            return LARGE, set()
+        return TEXT, get_trigrams(data)
+
+    def _merge_postings(
+        self, conn: sqlite3.Connection, postings: dict[bytes, array]
+    ) -> None:
+        trigrams = list(postings)
+        existing = {}
+        # Stay below the limit of SQLite on query parameters
+        for start in range(0, len(trigrams), 900):
+            chunk = trigrams[start : start + 900]
+            existing.update(
+                conn.execute(
+                    "SELECT trigram, files FROM postings WHERE trigram IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO postings (trigram, files) VALUES (?, ?)",
+            [
+                (trigram, existing.get(trigram, b"") + ids.tobytes())
+                for trigram, ids in postings.items()
+            ],
+        )
+
+    def _stale_count(self) -> int:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'files'"
+            ).fetchone()
+        return (row[0] if row else 0) - len(self._files)
+
+    def _rebuild_postings(self) -> None:
+        """Drop the postings and index every file again under fresh IDs."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM files")
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = 'files'")
+        with self._lock:
+            self._files.clear()
+            self._paths.clear()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+
+def get_trigrams(data: bytes) -> set[bytes]:
+    """Get the lowercased byte trigrams of a text."""
+    data = data.lower()
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def default_index_path(root_dir: Path) -> Path:
+    """Get the default path of the index of a project."""
+    digest = hashlib.sha1(str(root_dir).encode()).hexdigest()[:16]
+    return DEFAULT_INDEX_DIR / f"{root_dir.name}-{digest}.sqlite3"
+
+
+_indexes: dict[Path, ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(root_dir: str | Path) -> ProjectIndex | None:
+    """
+    Get the shared index of a project, starting its refresh.
+
+    It is configured by the `project_index` section, and is None if the
+    index is disabled. It is kept up to date by the watcher of the project
+    once the watcher is started.
+    """
+    settings = get_config_section(["project_index"]) or {}
+    if not settings.get("enabled", True):
+        return None
+    root_dir = Path(root_dir).resolve()
+    with _indexes_lock:
+        index = _indexes.get(root_dir)
+        if index is None:
+            path = settings.get("path")
+            index = _indexes[root_dir] = ProjectIndex(
+                root_dir,
+                db_path=(
+                    Path(path).expanduser() / default_index_path(root_dir).name
+                    if path
+                    else None
+                ),
+                max_file_size=int(
+                    settings.get("max_file_size_kb", DEFAULT_MAX_FILE_SIZE_KB)
+                )
+                * 1024,
+            )
+            watcher = get_project_watcher(root_dir)
+            if watcher is not None:
+                watcher.subscribe(index.apply_changes)
+    index.start()
+    return index
+
+
+def _walk_dir(directory: Path, rel: str) -> list[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if d not in ALWAYS_IGNORED_DIRS]
+        base = Path(dirpath).relative_to(directory).as_posix()
+        prefix = rel if base == "." else f"{rel}/{base}"
+        files.extend(f"{prefix}/{name}" for name in filenames)
+    return files
+
+
+def _unpack(blob: bytes) -> array:
+    ids = array("I")
+    ids.frombytes(blob)
+    return ids
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from pathlib import Path
+
+from mini_opencode.config import get_config_section
+
+from .files import list_project_dirs, list_project_files
+from .project_index import DEFAULT_INDEX_DIR, default_index_path
+from .symbol_index import get_symbol_index
+
+DEFAULT_MAX_TOKENS = 1024
+# Rough number of characters per token, to stay within the budget
+CHARS_PER_TOKEN = 4
+# Directories this deep are listed before any file
+OVERVIEW_DEPTH = 2
+# Most used top-level definitions shown per file
+MAX_SYMBOLS_PER_FILE = 8
+# Files that describe a project, ranked above files without definitions
+KEY_FILES = {
+    "readme.md",
+    "agents.md",
+    "pyproject.toml",
+    "setup.py",
+    "package.json",
+    "cargo.toml",
+    "go.mod",
+    "makefile",
+    "dockerfile",
+}
+# Bumped when the rendering changes, to invalidate cached maps
+FORMAT_VERSION = 1
+
+
+def build_repo_map(root_dir: str | Path, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+    """
+    Build a map of the directories and most used files of a project.
+
+    Each file is shown with its top-level definitions, within a token
+    budget. Files are ranked by the number of other files using their
+    definitions, but the map is sorted by path, so it only changes when the
+    files it shows do. The symbol index is not waited for, a map built
+    while it is still parsing shows the definitions found so far.
+
+    Args:
+        root_dir: The project root directory.
+        max_tokens: The budget of the map in tokens.
+
+    Returns:
+        The map, one indented line per directory or file.
+    """
+    root_dir = Path(root_dir).resolve()
+    files = list_project_files(root_dir)
+    symbols: dict[str, list[tuple[str, int]]] = {}
+    index = get_symbol_index(root_dir)
+    if index is not None:
+        # Private definitions are left out of the map
+        symbols = {
+            path: public
+            for path, file_symbols in index.top_level_symbols().items()
+            if (public := [s for s in file_symbols if not s[0].startswith("_")])
+        }
+
+    # Number of files below each directory
+    counts: dict[str, int] = {}
+    for path in files:
+        parent = path.rpartition("/")[0]
+        while parent:
+            counts[parent] = counts.get(parent, 0) + 1
+            parent = parent.rpartition("/")[0]
+
+    lines: dict[str, str] = {}
+    budget = max_tokens * CHARS_PER_TOKEN
+
+    def add(path: str, line: str) -> bool:
+        nonlocal budget
+        # A file is shown under each of its directories
+        missing = {}
+        parent = path.rpartition("/")[0]
+        while parent and parent not in lines:
+            missing[parent] = _directory_line(parent, counts[parent])
+            parent = parent.rpartition("/")[0]
+        cost = sum(len(text) + 1 for text in missing.values()) + len(line) + 1
+        if cost > budget:
+            return False
+        budget -= cost
+        lines.update(missing)
+        lines[path] = line
+        return True
+
+    for directory in sorted(list_project_dirs(files) - {""}):
+        if directory.count("/") < OVERVIEW_DEPTH:
+            add(directory, _directory_line(directory, counts[directory]))
+
+    ranked = sorted(files, key=lambda p: (-_score(p, symbols.get(p, [])), p))
+    for path in ranked:
+        file_symbols = symbols.get(path, [])
+        if not file_symbols and path.rpartition("/")[2].lower() not in KEY_FILES:
+            continue
+        add(path, _file_line(path, file_symbols))
+
+    return "\n".join(lines[path] for path in sorted(lines, key=_sort_key))
+
+
+def _score(path: str, symbols: list[tuple[str, int]]) -> float:
+    score = sum(math.log1p(uses) for _, uses in symbols)
+    if path.rpartition("/")[2].lower() in KEY_FILES:
+        # Shallow project files first
+        score += 10 - path.count("/")
+    return score
+
+
+def _directory_line(path: str, count: int) -> str:
+    name = path.rpartition("/")[2]
+    indent = "  " * path.count("/")
+    return f"{indent}{name}/ ({count} file{'' if count == 1 else 's'})"
+
+
+def _file_line(path: str, symbols: list[tuple[str, int]]) -> str:
+    name = path.rpartition("/")[2]
+    indent = "  " * path.count("/")
+    if not symbols:
+        return f"{indent}{name}"
+    # Most used definitions, shown in the order of the file
+    order = {symbol: i for i, (symbol, _) in enumerate(symbols)}
+    shown = sorted(symbols, key=lambda s: (-s[1], order[s[0]]))[:MAX_SYMBOLS_PER_FILE]
+    names = [symbol for symbol, _ in sorted(shown, key=lambda s: order[s[0]])]
+    more = len(symbols) - len(names)
+    suffix = f", +{more} more" if more > 0 else ""
+    return f"{indent}{name}: {', '.join(names)}{suffix}"
+
+
+def _sort_key(path: str) -> tuple[str, ...]:
+    return tuple(path.split("/"))
+
+
+_maps: dict[Path, str] = {}
+_maps_lock = threading.Lock()
+# Bumped when a map is replaced by an up-to-date one
+_maps_version = 0
+
+
+def get_repo_map(root_dir: str | Path) -> str | None:
+    """
+    Get the map of a project for the system prompt.
+
+    The map is built once per process, so every agent built for the
+    project gets the same prompt and provider prompt caches keep hitting.
+    It is also cached on disk by the sizes and modification times of the
+    project files, and the symbol index only parses the files changed
+    since the previous run.
+
+    Building an agent never waits for the symbol index: the map cached on
+    disk is used as it is, or the map is built from the symbols indexed so
+    far. It is then checked in the background once the symbol index is
+    ready, and replaced if it changed, which `get_repo_map_version` tells,
+    so that the next session gets the up-to-date map.
+
+    It is configured by the `project_index.repo_map` section, and is None if
+    the map is disabled.
+    """
+    settings = get_config_section(["project_index", "repo_map"])
+    if settings is False:
+        return None
+    if not isinstance(settings, dict):
+        settings = {}
+    if not settings.get("enabled", True):
+        return None
+    root_dir = Path(root_dir).resolve()
+    max_tokens = int(settings.get("max_tokens", DEFAULT_MAX_TOKENS))
+    with _maps_lock:
+        repo_map = _maps.get(root_dir)
+        if repo_map is None:
+            cache_path = _cache_path(root_dir)
+            cached = _read_cache(cache_path, max_tokens)
+            repo_map = _maps[root_dir] = (
+                cached["map"] if cached else build_repo_map(root_dir, max_tokens)
+            )
+            threading.Thread(
+                target=_update,
+                args=(root_dir, max_tokens, cache_path, repo_map),
+                name="repo-map",
+                daemon=True,
+            ).start()
+    return repo_map
+
+
+def get_repo_map_version() -> int:
+    """
+    Get the number of maps replaced by up-to-date ones so far.
+
+    Agents built before it changed may have an outdated map in their prompt.
+    """
+    return _maps_version
+
+
+def _update(root_dir: Path, max_tokens: int, cache_path: Path, repo_map: str) -> None:
+    """Check a map once the symbols are indexed, and replace it if it changed."""
+    global _maps_version
+
+    try:
+        index = get_symbol_index(root_dir)
+        if index is not None:
+            index.ready.wait()
+        fingerprint = _fingerprint(root_dir, max_tokens)
+        cached = _read_cache(cache_path, max_tokens)
+        if cached and cached.get("fingerprint") == fingerprint:
+            new_map = cached["map"]
+        else:
+            new_map = build_repo_map(root_dir, max_tokens)
+            _write_cache(cache_path, max_tokens, fingerprint, new_map)
+    except Exception:
+        # The map in use is kept
+        return
+    with _maps_lock:
+        if new_map != repo_map and _maps.get(root_dir) == repo_map:
+            _maps[root_dir] = new_map
+            _maps_version += 1
+
+
+def _cache_path(root_dir: Path) -> Path:
+    path = get_config_section(["project_index", "path"])
+    return (
+        Path(path).expanduser() if path else DEFAULT_INDEX_DIR
+    ) / default_index_path(root_dir).with_suffix(".repo_map.json").name
+
+
+def _read_cache(cache_path: Path, max_tokens: int) -> dict | None:
+    """Read the cached map, if it was built with the same budget and format."""
+    try:
+        cached = json.loads(cache_path.read_text())
+        if cached["format"] == FORMAT_VERSION and cached["max_tokens"] == max_tokens:
+            return cached if isinstance(cached["map"], str) else None
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_cache(
+    cache_path: Path, max_tokens: int, fingerprint: str, repo_map: str
+) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(
+            json.dumps(
+                {
+                    "format": FORMAT_VERSION,
+                    "max_tokens": max_tokens,
+                    "fingerprint": fingerprint,
+                    "map": repo_map,
+                }
+            )
+        )
+    except OSError:
+        pass
+
+
+def _fingerprint(root_dir: Path, max_tokens: int) -> str:
+    digest = hashlib.sha1(f"{FORMAT_VERSION}:{max_tokens}".encode())
+    for path in sorted(list_project_files(root_dir)):
+        try:
+            stat = os.stat(root_dir / path)
+        except OSError:
+            continue
+        digest.update(f"\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
@@ -0,0 +1,400 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import NamedTuple
+
+from mini_opencode.config import get_config_section
+
+from .files import filter_ignored, list_project_files
+from .project_index import DEFAULT_INDEX_DIR, default_index_path
+from .symbols import Symbol, get_extractor
+from .watcher import get_project_watcher
+
+# Larger files are not parsed
+DEFAULT_MAX_FILE_SIZE_KB = 512
+# Files parsed per transaction
+BATCH_SIZE = 200
+
+
+class SymbolLocation(NamedTuple):
+    """A definition, with the file it is in."""
+
+    path: str
+    symbol: Symbol
+
+
+class ReferenceLocation(NamedTuple):
+    """A use of a name, with the file it is in."""
+
+    path: str
+    line: int
+
+
+class SymbolIndex:
+    """
+    Persistent index of the definitions and references of a project.
+
+    Files are parsed by the extractor registered for their suffix, and only
+    files whose size or modification time changed are parsed again.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS symbols (
+        file_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        end_line INTEGER NOT NULL,
+        container TEXT NOT NULL,
+        signature TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS symbols_by_name ON symbols (name);
+    CREATE INDEX IF NOT EXISTS symbols_by_file ON symbols (file_id);
+    CREATE TABLE IF NOT EXISTS refs (
+        file_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        line INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS refs_by_name ON refs (name);
+    CREATE INDEX IF NOT EXISTS refs_by_file ON refs (file_id);
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        db_path: str | Path | None = None,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE_KB * 1024,
+    ):
+        """
+        Initialize the index, creating the database if needed.
+
+        Args:
+            root_dir: The project root directory.
+            db_path: Path to the SQLite database file. Defaults to a file
+                named after the root in `~/.mini-opencode/index`.
+            max_file_size: Files larger than this many bytes are not parsed.
+        """
+        self.root_dir = Path(root_dir).resolve()
+        self.db_path = (
+            Path(db_path)
+            if db_path
+            else default_index_path(self.root_dir).with_suffix(".symbols.sqlite3")
+        )
+        self.max_file_size = max_file_size
+        self.ready = threading.Event()
+        self._write_lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def start(self) -> None:
+        """Refresh the index in a background thread, once."""
+        with self._lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="symbol-index", daemon=True
+            )
+        self._refresh_thread.start()
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the project tree.
+
+        Returns:
+            The number of files parsed again.
+        """
+        paths = [p for p in list_project_files(self.root_dir) if get_extractor(p)]
+        with self._write_lock:
+            count = self._update(paths, full=True)
+        self.ready.set()
+        return count
+
+    def update_paths(self, paths: list[str]) -> int:
+        """
+        Parse files again, or drop them if they no longer exist.
+
+        New files ignored by git are not added.
+
+        Args:
+            paths: Paths relative to the root.
+
+        Returns:
+            The number of files parsed again.
+        """
+        with self._write_lock:
+            return self._update([p for p in paths if get_extractor(p)], full=False)
+
+    def apply_changes(self, paths: set[str] | None) -> None:
+        """
+        Update the index for the paths reported by a `ProjectWatcher`.
+
+        Args:
+            paths: Changed paths relative to the root, or None if any file
+                may have changed.
+        """
+        if paths is None or any(
+            path.rpartition("/")[2] == ".gitignore" for path in paths
+        ):
+            self.refresh()
+            return
+        expanded = set(paths)
+        with closing(self._connect()) as conn:
+            for path in paths:
+                full = self.root_dir / path
+                if full.is_dir():
+                    for dirpath, _, filenames in os.walk(full):
+                        base = Path(dirpath).relative_to(self.root_dir).as_posix()
+                        expanded.update(f"{base}/{name}" for name in filenames)
+                # A directory removed or moved away
+                expanded.update(
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT path FROM files WHERE substr(path, 1, ?) = ?",
+                        (len(path) + 1, path + "/"),
+                    )
+                )
+        self.update_paths(sorted(expanded))
+
+    def find_definitions(self, name: str, limit: int = 50) -> list[SymbolLocation]:
+        """
+        Find the definitions of a name.
+
+        Args:
+            name: A name, optionally qualified by its enclosing classes or
+                functions, such as `Class.method`.
+            limit: The maximum number of definitions.
+
+        Returns:
+            The definitions, classes and functions first.
+        """
+        container, _, base = name.rpartition(".")
+        query = """
+            SELECT files.path, symbols.name, kind, line, end_line, container, signature
+            FROM symbols JOIN files ON files.id = symbols.file_id
+            WHERE symbols.name = ?
+        """
+        params: list = [base]
+        if container:
+            query += " AND (container = ? OR container LIKE ? ESCAPE '\\')"
+            params += [container, "%." + _escape_like(container)]
+        query += """
+            ORDER BY kind = 'variable', files.path, line
+            LIMIT ?
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, [*params, limit]).fetchall()
+        return [SymbolLocation(row[0], Symbol(*row[1:])) for row in rows]
+
+    def find_references(self, name: str, limit: int = 200) -> list[ReferenceLocation]:
+        """
+        Find the uses of a name. A qualified name matches on its last part.
+
+        Args:
+            name: The name.
+            limit: The maximum number of references.
+
+        Returns:
+            The references, by path and line.
+        """
+        base = name.rpartition(".")[2]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT files.path, line
+                FROM refs JOIN files ON files.id = refs.file_id
+                WHERE refs.name = ?
+                ORDER BY files.path, line
+                LIMIT ?
+                """,
+                (base, limit),
+            ).fetchall()
+        return [ReferenceLocation(*row) for row in rows]
+
+    def outline(self, path: str) -> list[Symbol]:
+        """
+        Get the definitions of a file, parsing it first if it changed.
+
+        Args:
+            path: Path relative to the root.
+
+        Returns:
+            The definitions by line.
+
+        Raises:
+            ValueError: If the language of the file is not supported.
+        """
+        if get_extractor(path) is None:
+            raise ValueError(f"No symbol extractor for the language of `{path}`.")
+        self.update_paths([path])
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT symbols.name, kind, line, end_line, container, signature
+                FROM symbols JOIN files ON files.id = symbols.file_id
+                WHERE files.path = ?
+                ORDER BY line
+                """,
+                (path,),
+            ).fetchall()
+        return [Symbol(*row) for row in rows]
+
+    def top_level_symbols(self) -> dict[str, list[tuple[str, int]]]:
+        """
+        Get the top-level classes and functions of every file.
+
+        Returns:
+            By path, the names of the definitions with the number of other
+            files using them.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT files.path, symbols.name, (
+                    SELECT COUNT(DISTINCT refs.file_id) FROM refs
+                    WHERE refs.name = symbols.name AND refs.file_id != symbols.file_id
+                )
+                FROM symbols JOIN files ON files.id = symbols.file_id
+                WHERE symbols.container = '' AND symbols.kind != 'variable'
+                ORDER BY files.path, symbols.line
+                """
+            ).fetchall()
+        symbols: dict[str, list[tuple[str, int]]] = {}
+        for path, name, uses in rows:
+            symbols.setdefault(path, []).append((name, uses))
+        return symbols
+
+    def relative_path(self, path: str | Path) -> str | None:
+        """Get a path relative to the root, or None if it is outside the root."""
+        full = Path(path)
+        if not full.is_absolute():
+            full = self.root_dir / full
+        try:
+            return full.resolve().relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return None
+
+    def _update(self, paths: list[str], full: bool) -> int:
+        with closing(self._connect()) as conn:
+            indexed = {
+                row[0]: (row[1], row[2], row[3])
+                for row in conn.execute("SELECT path, id, size, mtime_ns FROM files")
+            }
+        changed, removed = [], set()
+        for path in paths:
+            try:
+                stat = os.stat(self.root_dir / path)
+            except OSError:
+                removed.add(path)
+                continue
+            entry = indexed.get(path)
+            if entry is None or entry[1:] != (stat.st_size, stat.st_mtime_ns):
+                changed.append((path, stat))
+        if full:
+            removed.update(set(indexed) - set(paths))
+        else:
+            # New files ignored by git are not added
+            new = {path for path, _ in changed if path not in indexed}
+            kept = set(filter_ignored(self.root_dir, sorted(new)))
+            changed = [c for c in changed if c[0] not in new or c[0] in kept]
+
+        with closing(self._connect()) as conn, conn:
+            for path in removed:
+                if path in indexed:
+                    self._delete_file(conn, indexed[path][0])
+        for start in range(0, len(changed), BATCH_SIZE):
+            with closing(self._connect()) as conn, conn:
+                for path, stat in changed[start : start + BATCH_SIZE]:
+                    if path in indexed:
+                        self._delete_file(conn, indexed[path][0])
+                    self._index_file(conn, path, stat)
+        return len(changed)
+
+    def _index_file(
+        self, conn: sqlite3.Connection, path: str, stat: os.stat_result
+    ) -> None:
+        definitions, references = [], []
+        if stat.st_size <= self.max_file_size:
+            try:
+                source = (self.root_dir / path).read_text(errors="replace")
+                definitions, references = get_extractor(path)(source)
+            except (OSError, SyntaxError, ValueError, RecursionError):
+                # Unreadable or invalid source is indexed as empty until fixed
+                pass
+        file_id = conn.execute(
+            "INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(file_id, *symbol) for symbol in definitions],
+        )
+        conn.executemany(
+            "INSERT INTO refs VALUES (?, ?, ?)",
+            [(file_id, *reference) for reference in references],
+        )
+
+    def _delete_file(self, conn: sqlite3.Connection, file_id: int) -> None:
+        conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+        conn.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_indexes: dict[Path, SymbolIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(root_dir: str | Path) -> SymbolIndex | None:
+    """
+    Get the shared symbol index of a project, starting its refresh.
+
+    It is configured by the `project_index.symbols` section, and is None if
+    the symbol index is disabled. It is kept up to date by the watcher of
+    the project once the watcher is started.
+    """
+    settings = get_config_section(["project_index", "symbols"])
+    if settings is False:
+        return None
+    if not isinstance(settings, dict):
+        settings = {}
+    if not settings.get("enabled", True):
+        return None
+    root_dir = Path(root_dir).resolve()
+    with _indexes_lock:
+        index = _indexes.get(root_dir)
+        if index is None:
+            path = get_config_section(["project_index", "path"])
+            index_dir = Path(path).expanduser() if path else DEFAULT_INDEX_DIR
+            index = _indexes[root_dir] = SymbolIndex(
+                root_dir,
+                db_path=index_dir
+                / default_index_path(root_dir).with_suffix(".symbols.sqlite3").name,
+                max_file_size=int(
+                    settings.get("max_file_size_kb", DEFAULT_MAX_FILE_SIZE_KB)
+                )
+                * 1024,
+            )
+            watcher = get_project_watcher(root_dir)
+            if watcher is not None:
+                watcher.subscribe(index.apply_changes)
+    index.start()
+    return index
@@ -0,0 +1,227 @@
+import ast
+import re
+from collections.abc import Callable
+from typing import NamedTuple
+
+# Longest signature kept for a symbol
+MAX_SIGNATURE_CHARS = 160
+
+
+class Symbol(NamedTuple):
+    """A definition found in a source file."""
+
+    name: str
+    # Such as `class`, `function`, `method` or `variable`
+    kind: str
+    line: int
+    end_line: int
+    # Dotted name of the enclosing classes and functions, or ""
+    container: str
+    signature: str
+
+
+class Reference(NamedTuple):
+    """A use of a name in a source file."""
+
+    name: str
+    line: int
+
+
+class ExtractedSymbols(NamedTuple):
+    definitions: list[Symbol]
+    references: list[Reference]
+
+
+# Takes the source of a file, and returns its definitions and references
+SymbolExtractor = Callable[[str], ExtractedSymbols]
+
+_extractors: dict[str, SymbolExtractor] = {}
+
+
+def register_extractor(suffixes: list[str], extractor: SymbolExtractor) -> None:
+    """
+    Register the symbol extractor of a language.
+
+    Args:
+        suffixes: File suffixes of the language, such as `.py`.
+        extractor: Takes the source of a file, and returns its definitions
+            and references. It may raise `SyntaxError` on invalid source.
+    """
+    for suffix in suffixes:
+        _extractors[suffix.lower()] = extractor
+
+
+def get_extractor(path: str) -> SymbolExtractor | None:
+    """Get the symbol extractor of a file, or None if its language is unsupported."""
+    _, dot, suffix = path.rpartition(".")
+    return _extractors.get(f".{suffix.lower()}") if dot else None
+
+
+def extract_python_symbols(source: str) -> ExtractedSymbols:
+    """Extract the definitions and references of a Python module with `ast`."""
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    definitions: list[Symbol] = []
+
+    def visit(body: list[ast.stmt], container: str, in_class: bool) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                bases = ", ".join(ast.unparse(base) for base in node.bases)
+                definitions.append(
+                    _symbol(
+                        node,
+                        node.name,
+                        "class",
+                        container,
+                        f"class {node.name}({bases})"
+                        if bases
+                        else f"class {node.name}",
+                    )
+                )
+                visit(node.body, _join(container, node.name), True)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefix = (
+                    "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+                )
+                returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+                definitions.append(
+                    _symbol(
+                        node,
+                        node.name,
+                        "method" if in_class else "function",
+                        container,
+                        f"{prefix} {node.name}({ast.unparse(node.args)}){returns}",
+                    )
+                )
+                visit(node.body, _join(container, node.name), False)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and (
+                in_class or not container
+            ):
+                targets = (
+                    node.targets if isinstance(node, ast.Assign) else [node.target]
+                )
+                for target in targets:
+                    for name in _target_names(target):
+                        definitions.append(
+                            _symbol(
+                                node,
+                                name,
+                                "variable",
+                                container,
+                                # As written, as unparsing turns hex into decimal
+                                lines[node.lineno - 1].strip(),
+                            )
+                        )
+            elif isinstance(node, (ast.If, ast.Try, ast.With)) and not in_class:
+                # Definitions guarded by a condition, such as TYPE_CHECKING
+                for field in ("body", "orelse", "finalbody"):
+                    visit(getattr(node, field, []), container, False)
+                for handler in getattr(node, "handlers", []):
+                    visit(handler.body, container, False)
+
+    visit(tree.body, "", False)
+
+    references = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store):
+            references.add(Reference(node.id, node.lineno))
+        elif isinstance(node, ast.Attribute):
+            references.add(Reference(node.attr, node.lineno))
+        elif isinstance(node, ast.alias):
+            references.add(Reference(node.name.rpartition(".")[2], node.lineno))
+    return ExtractedSymbols(definitions, sorted(references, key=lambda r: r.line))
+
+
+def make_regex_extractor(
+    patterns: dict[str, str], identifier: str = r"[A-Za-z_$][\w$]*"
+) -> SymbolExtractor:
+    """
+    Make a line-based symbol extractor for languages without a parser.
+
+    Args:
+        patterns: Regex matching a definition on one line, with a `name`
+            group, by symbol kind.
+        identifier: Regex of an identifier, for references.
+
+    Returns:
+        The extractor. Definitions have no container, and every identifier
+        outside a definition name counts as a reference.
+    """
+    compiled = {kind: re.compile(pattern) for kind, pattern in patterns.items()}
+    identifier_regex = re.compile(identifier)
+
+    def extract(source: str) -> ExtractedSymbols:
+        definitions, references = [], []
+        for line_number, line in enumerate(source.splitlines(), 1):
+            defined = set()
+            for kind, regex in compiled.items():
+                match = regex.match(line)
+                if match:
+                    name = match.group("name")
+                    defined.add(name)
+                    definitions.append(
+                        Symbol(
+                            name,
+                            kind,
+                            line_number,
+                            line_number,
+                            "",
+                            line.strip()[:MAX_SIGNATURE_CHARS],
+                        )
+                    )
+                    break
+            for name in dict.fromkeys(identifier_regex.findall(line)):
+                if name not in defined:
+                    references.append(Reference(name, line_number))
+        return ExtractedSymbols(definitions, references)
+
+    return extract
+
+
+def _symbol(
+    node: ast.stmt, name: str, kind: str, container: str, signature: str
+) -> Symbol:
+    return Symbol(
+        name,
+        kind,
+        node.lineno,
+        node.end_lineno or node.lineno,
+        container,
+        signature[:MAX_SIGNATURE_CHARS],
+    )
+
+
+def _join(container: str, name: str) -> str:
+    return f"{container}.{name}" if container else name
+
+
+def _target_names(target: ast.expr) -> list[str]:
+    if isinstance(target, ast.Name):
+        return [target.id]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [name for element in target.elts for name in _target_names(element)]
+    return []
+
+
+register_extractor([".py", ".pyi"], extract_python_symbols)
+register_extractor(
+    [".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"],
+    make_regex_extractor(
+        {
+            "class": r"\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[A-Za-z_$][\w$]*)",
+            "function": r"\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[A-Za-z_$][\w$]*)",
+            "variable": r"(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)",
+            "interface": r"\s*(?:export\s+)?(?:interface|type|enum)\s+(?P<name>[A-Za-z_$][\w$]*)",
+        }
+    ),
+)
+register_extractor(
+    [".go"],
+    make_regex_extractor(
+        {
+            "function": r"func\s+(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_]\w*)",
+            "type": r"type\s+(?P<name>[A-Za-z_]\w*)",
+        },
+        identifier=r"[A-Za-z_]\w*",
+    ),
+)
@@ -0,0 +1,339 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from mini_opencode.config import get_config_section
+
+from .files import (
+    ALWAYS_IGNORED_DIRS,
+    filter_ignored,
+    list_project_dirs,
+    list_project_files,
+)
+
+# Seconds without a new event before changes are reported
+DEFAULT_DEBOUNCE = 0.2
+# Seconds changes are held back at most while events keep coming
+MAX_DELAY = 2.0
+# Seconds between scans of the tree when inotify is unavailable
+DEFAULT_POLL_INTERVAL = 2.0
+
+# inotify flags, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# Changed paths relative to the root, or None if any file may have changed
+ChangeCallback = Callable[[set[str] | None], None]
+
+
+class ProjectWatcher:
+    """
+    Watches a project tree and reports changed files in debounced batches.
+
+    On Linux the tree is watched with inotify, elsewhere, or when inotify
+    runs out of watches, the file list is polled instead. Subscribers are
+    called from the watcher thread with the paths changed since the last
+    batch, and update their state for those paths only.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        """
+        Initialize the watcher. It is not running until `start` is called.
+
+        Args:
+            root_dir: The project root directory.
+            debounce: Seconds without a new event before changes are reported.
+            poll_interval: Seconds between scans when polling.
+            use_inotify: Whether to use inotify when it is available.
+        """
+        self.root_dir = Path(root_dir).resolve()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode: str | None = None
+        self.batches = 0
+        self._subscribers: list[ChangeCallback] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        """Call `callback` with each batch of changed paths."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        """Stop calling `callback`."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def start(self) -> None:
+        """Start watching in a background thread, once."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="project-watcher", daemon=True
+            )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        inotify = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                inotify = _Inotify(self.root_dir)
+            except OSError:
+                # Out of watches, or inotify is not supported
+                inotify = None
+        if inotify is not None:
+            self.mode = "inotify"
+            try:
+                self._run_inotify(inotify)
+            finally:
+                inotify.close()
+        else:
+            self.mode = "polling"
+            self._run_polling()
+
+    def _run_inotify(self, inotify: "_Inotify") -> None:
+        pending: set[str] = set()
+        overflowed = False
+        first = last = 0.0
+        while not self._stop.is_set():
+            if pending or overflowed:
+                now = time.monotonic()
+                deadline = min(last + self.debounce, first + MAX_DELAY)
+                timeout = max(0.0, deadline - now)
+            else:
+                # Wake up now and then to notice `stop`
+                timeout = 0.5
+            readable, _, _ = select.select([inotify.fd], [], [], timeout)
+            if readable:
+                paths = inotify.read_changes()
+                now = time.monotonic()
+                if not pending and not overflowed:
+                    first = now
+                last = now
+                if paths is None:
+                    overflowed = True
+                else:
+                    pending.update(paths)
+                continue
+            if pending or overflowed:
+                self._notify(None if overflowed else pending)
+                pending, overflowed = set(), False
+
+    def _run_polling(self) -> None:
+        snapshot = _snapshot(self.root_dir)
+        while not self._stop.wait(self.poll_interval):
+            current = _snapshot(self.root_dir)
+            changed = {
+                path
+                for path in snapshot.keys() | current.keys()
+                if snapshot.get(path) != current.get(path)
+            }
+            snapshot = current
+            if changed:
+                self._notify(changed)
+
+    def _notify(self, paths: set[str] | None) -> None:
+        self.batches += 1
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(paths)
+            except Exception:
+                # A failing subscriber must not stop the others, nor the watcher
+                pass
+
+
+class _Inotify:
+    """Recursive inotify watch of the directories of a project."""
+
+    def __init__(self, root_dir: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.root_dir = root_dir
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, str] = {}
+        try:
+            for rel in sorted(list_project_dirs(list_project_files(root_dir))):
+                self.add_watch(rel)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, rel: str) -> None:
+        """Watch a directory relative to the root."""
+        path = os.fsencode(self.root_dir / rel)
+        wd = self._add_watch(self.fd, path, WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), rel)
+        self._dirs[wd] = rel
+
+    def read_changes(self) -> set[str] | None:
+        """
+        Read the pending events.
+
+        Returns:
+            The changed paths relative to the root, or None if events were
+            lost and any file may have changed.
+        """
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths: set[str] = set()
+        new_dirs = []
+        lost = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                lost = True
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            base = self._dirs.get(wd)
+            if base is None:
+                continue
+            if not name:
+                # The directory itself was deleted or moved away
+                if base:
+                    paths.add(base)
+                continue
+            rel = f"{base}/{name}" if base else name
+            paths.add(rel)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                new_dirs.append(rel)
+
+        for rel in filter_ignored(self.root_dir, new_dirs):
+            # Files created before the watch was added are reported by the
+            # subscribers walking the new directory
+            self._watch_tree(rel)
+        return None if lost else paths
+
+    def close(self) -> None:
+        """Stop all watches."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _watch_tree(self, rel: str) -> None:
+        for dirpath, dirnames, _ in os.walk(self.root_dir / rel):
+            dirnames[:] = [d for d in dirnames if d not in ALWAYS_IGNORED_DIRS]
+            try:
+                self.add_watch(Path(dirpath).relative_to(self.root_dir).as_posix())
+            except OSError:
+                # Out of watches, the directory is only picked up by refreshes
+                return
+
+
+def _snapshot(root_dir: Path) -> dict[str, tuple[int, int]]:
+    snapshot = {}
+    for path in list_project_files(root_dir):
+        try:
+            stat = os.stat(root_dir / path)
+        except OSError:
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+_watchers: dict[Path, ProjectWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_project_watcher(root_dir: str | Path) -> ProjectWatcher | None:
+    """
+    Get the shared watcher of a project, without starting it.
+
+    It is configured by the `project_index.watch` section, and is None if
+    watching is disabled.
+    """
+    settings = get_config_section(["project_index", "watch"])
+    if settings is False:
+        return None
+    if not isinstance(settings, dict):
+        settings = {}
+    if not settings.get("enabled", True):
+        return None
+    root_dir = Path(root_dir).resolve()
+    with _watchers_lock:
+        watcher = _watchers.get(root_dir)
+        if watcher is None:
+            watcher = _watchers[root_dir] = ProjectWatcher(
+                root_dir,
+                debounce=float(settings.get("debounce_ms", DEFAULT_DEBOUNCE * 1000))
+                / 1000,
+                poll_interval=float(
+                    settings.get("poll_interval", DEFAULT_POLL_INTERVAL)
+                ),
+                use_inotify=settings.get("backend", "auto") != "polling",
+            )
+    return watcher
+
+
+def stop_project_watchers() -> None:
+    """Stop every watcher."""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
@@ -2,30 +2,110 @@
 Main entry point for the mini-OpenCode application.
 """
 
+import argparse
+import asyncio
 import sys
+import time
 from pathlib import Path
 
-from .cli import ConsoleApp
 from .project import project
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog="mini-opencode")
+    parser.add_argument(
+        "root_dir",
+        nargs="?",
+        type=Path,
+        default=Path.cwd(),
+        help="project root directory (default: current directory)",
+    )
+    batch = parser.add_argument_group("headless batch mode")
+    batch.add_argument(
+        "--batch",
+        type=Path,
+        metavar="TASKS",
+        help="run the prompts of a JSONL file without the TUI",
+    )
+    batch.add_argument(
+        "--output",
+        type=Path,
+        help="JSONL file to write results to (default: stdout)",
+    )
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="number of sessions run at once (default: 4)",
+    )
+    batch.add_argument(
+        "--timeout",
+        type=float,
+        help="maximum seconds per task (default: no limit)",
+    )
+    batch.add_argument(
+        "--no-mcp",
+        action="store_true",
+        help="do not load MCP tools",
+    )
+    return parser.parse_args(argv)
+
+
 def main() -> None:
     """
     Main execution function for mini-OpenCode.
 
-    Parses command line arguments to set the project root directory.
+    Parses command line arguments to set the project root directory, then
+    starts the TUI or, with `--batch`, runs the tasks headlessly.
     """
-    if len(sys.argv) > 1:
-        new_root = Path(sys.argv[1])
-    else:
-        new_root = Path.cwd()
+    args = parse_args()
 
     try:
-        project.root_dir = new_root
-        print(f"Project root set to: {project.root_dir}")
+        project.root_dir = args.root_dir
+        print(f"Project root set to: {project.root_dir}", file=sys.stderr)
     except (FileNotFoundError, NotADirectoryError) as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if args.batch is not None:
+        sys.exit(run_batch(args))
+
+    # The TUI is only imported when it is used
+    from .cli import ConsoleApp
+
     app = ConsoleApp()
     app.run()
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Run the batch tasks of the command line arguments.
+
+    Returns:
+        The exit code, non-zero if any task failed.
+    """
+    from .headless import BatchRunner, load_batch_tasks, summarize_results
+
+    try:
+        tasks = load_batch_tasks(args.batch, project.root_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        runner = BatchRunner(
+            output,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            use_mcp_tools=not args.no_mcp,
+        )
+        start = time.perf_counter()
+        results = asyncio.run(runner.run(tasks))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(summarize_results(results, time.perf_counter() - start), file=sys.stderr)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
@@ -0,0 +1,29 @@
+from .backend import (
+    EXECUTE_OUTPUT_EVENT,
+    IndexedStreamingShellBackend,
+    StreamingShellBackend,
+    create_shell_backend_factory,
+)
+from .process import run_command
+from .session import (
+    ShellSession,
+    close_shell_session,
+    close_shell_sessions,
+    get_shell_session,
+    get_shell_settings,
+    set_max_shell_sessions,
+)
+
+__all__ = [
+    "EXECUTE_OUTPUT_EVENT",
+    "IndexedStreamingShellBackend",
+    "ShellSession",
+    "StreamingShellBackend",
+    "close_shell_session",
+    "close_shell_sessions",
+    "create_shell_backend_factory",
+    "get_shell_session",
+    "get_shell_settings",
+    "run_command",
+    "set_max_shell_sessions",
+]
@@ -0,0 +1,144 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.protocol import ExecuteResponse
+from langchain.tools import ToolRuntime
+
+from mini_opencode.index import IndexedShellBackend, ProjectIndex
+
+from .process import run_command
+from .session import (
+    OutputCallback,
+    ShellSession,
+    get_max_output_bytes,
+    get_shell_session,
+    get_shell_settings,
+    get_timeout,
+)
+
+# Session of the commands run outside of a thread, such as by a debug run
+DEFAULT_SESSION_ID = "default"
+# Type of the custom stream events carrying the output of a running command
+EXECUTE_OUTPUT_EVENT = "execute_output"
+
+
+class StreamingShellBackend(LocalShellBackend):
+    """
+    Local shell backend streaming the output of commands as it is produced.
+
+    Commands run in the persistent shell of a session when one is given,
+    and in a new process each otherwise. The agent still gets the output
+    only when the command ends, within `max_output_bytes`.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        session: ShellSession | None = None,
+        on_output: OutputCallback | None = None,
+        **kwargs,
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            root_dir: Working directory for file operations and shell commands.
+            session: The persistent shell running the commands, if any.
+            on_output: Called with the output of commands as it is produced.
+            **kwargs: Additional keyword arguments to pass to `LocalShellBackend`.
+        """
+        super().__init__(root_dir=root_dir, **kwargs)
+        self.session = session
+        self.on_output = on_output
+
+    def execute(self, command: str) -> ExecuteResponse:
+        if not command or not isinstance(command, str):
+            return super().execute(command)
+        if self.session is not None:
+            return self.session.run(command, self.on_output)
+        return run_command(
+            command,
+            cwd=self.cwd,
+            env=self._env,
+            timeout=self._timeout,
+            max_output_bytes=self._max_output_bytes,
+            on_output=self.on_output,
+        )
+
+
+class IndexedStreamingShellBackend(StreamingShellBackend, IndexedShellBackend):
+    """
+    Streaming shell backend answering `grep` and `glob` from a project index.
+    """
+
+
+def create_shell_backend_factory(
+    root_dir: str | Path, index: ProjectIndex | None = None
+) -> Callable[[ToolRuntime], LocalShellBackend]:
+    """
+    Create the backend factory of the agent.
+
+    The backend is resolved by deepagents for every tool call, with the
+    runtime of the call. Its `execute` streams the output of the command as
+    `EXECUTE_OUTPUT_EVENT` custom stream events, and with `shell.persistent`
+    set, runs it in the shell of the thread, so each session keeps its
+    working directory and variables between commands and sessions never
+    share a shell.
+
+    Args:
+        root_dir: The project root directory.
+        index: The project index answering `grep` and `glob`, if enabled.
+
+    Returns:
+        The factory, to pass as the backend of the agent.
+    """
+    settings = get_shell_settings()
+    persistent = bool(settings.get("persistent", False))
+    options = {
+        "timeout": get_timeout(settings),
+        "max_output_bytes": get_max_output_bytes(settings),
+    }
+    if index is not None:
+        options["index"] = index
+
+    def factory(runtime: ToolRuntime) -> LocalShellBackend:
+        session = None
+        if persistent:
+            config = getattr(runtime, "config", None) or {}
+            session_id = config.get("configurable", {}).get("thread_id")
+            session = get_shell_session(root_dir, str(session_id or DEFAULT_SESSION_ID))
+        backend_class = (
+            IndexedStreamingShellBackend if index is not None else StreamingShellBackend
+        )
+        return backend_class(
+            root_dir=root_dir,
+            session=session,
+            on_output=_output_writer(runtime),
+            **options,
+        )
+
+    return factory
+
+
+def _output_writer(runtime: ToolRuntime) -> OutputCallback | None:
+    """Make a callback sending command output to the stream of the run."""
+    writer = getattr(runtime, "stream_writer", None)
+    tool_call_id = getattr(runtime, "tool_call_id", None)
+    if writer is None or tool_call_id is None:
+        return None
+
+    def on_output(text: str) -> None:
+        try:
+            writer(
+                {
+                    "type": EXECUTE_OUTPUT_EVENT,
+                    "tool_call_id": tool_call_id,
+                    "text": text,
+                }
+            )
+        except Exception:
+            # The output is only shown to the user, the command keeps running
+            pass
+
+    return on_output
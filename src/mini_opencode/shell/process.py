@@ -0,0 +1,154 @@
+import codecs
+import os
+import signal
+import subprocess
+import threading
+from pathlib import Path
+from typing import IO
+
+from deepagents.backends.protocol import ExecuteResponse
+
+from .session import READ_SIZE, OutputCallback
+
+# Seconds to wait for the output of a killed command to end
+DRAIN_TIMEOUT = 1.0
+
+
+class _Capture:
+    """The start of the output of a stream, within a length."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts: list[str] = []
+        self.size = 0
+        self.total = 0
+
+    def add(self, text: str) -> None:
+        self.total += len(text)
+        if self.size < self.limit:
+            text = text[: self.limit - self.size]
+            self.parts.append(text)
+            self.size += len(text)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def run_command(
+    command: str,
+    cwd: str | Path,
+    env: dict[str, str],
+    timeout: float,
+    max_output_bytes: int,
+    on_output: OutputCallback | None = None,
+) -> ExecuteResponse:
+    """
+    Run a command in a new shell process, streaming its output.
+
+    The result is formatted like `LocalShellBackend` formats it, with the
+    lines of stderr after stdout, each prefixed with `[stderr]`. Only the
+    start of each stream is kept in memory.
+
+    Args:
+        command: The command to run.
+        cwd: The working directory of the command.
+        env: The environment variables of the command.
+        timeout: Seconds after which the command and its children are killed.
+        max_output_bytes: Length of the output given back.
+        on_output: Called from reader threads with stdout and stderr as they
+            are produced, beyond `max_output_bytes` too.
+
+    Returns:
+        The output and exit code of the command, 124 if it timed out.
+    """
+    try:
+        process = subprocess.Popen(  # noqa: S602
+            command,
+            shell=True,
+            cwd=str(cwd),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Its own process group, so a timeout kills the children too
+            start_new_session=os.name == "posix",
+        )
+    except Exception as e:
+        return ExecuteResponse(
+            output=f"Error executing command ({type(e).__name__}): {e}",
+            exit_code=1,
+            truncated=False,
+        )
+
+    stdout, stderr = _Capture(max_output_bytes), _Capture(max_output_bytes)
+    readers = [
+        threading.Thread(target=_read, args=(pipe, capture, on_output), daemon=True)
+        for pipe, capture in ((process.stdout, stdout), (process.stderr, stderr))
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill(process)
+        for reader in readers:
+            reader.join(DRAIN_TIMEOUT)
+        return ExecuteResponse(
+            output=f"Error: Command timed out after {timeout:.1f} seconds.",
+            exit_code=124,
+            truncated=False,
+        )
+    for reader in readers:
+        # Children left in the background may keep the pipes open
+        reader.join(DRAIN_TIMEOUT)
+
+    output_parts = [stdout.text] if stdout.text else []
+    if stderr.text:
+        output_parts.extend(
+            f"[stderr] {line}" for line in stderr.text.strip().split("\n")
+        )
+    output = "\n".join(output_parts)
+
+    truncated = False
+    if (
+        len(output) > max_output_bytes
+        or stdout.total > stdout.size
+        or stderr.total > stderr.size
+    ):
+        output = output[:max_output_bytes]
+        output += f"\n\n... Output truncated at {max_output_bytes} bytes."
+        truncated = True
+
+    if returncode != 0:
+        output = f"{output.rstrip()}\n\nExit code: {returncode}"
+    return ExecuteResponse(output=output, exit_code=returncode, truncated=truncated)
+
+
+def _read(pipe: IO[bytes], capture: _Capture, on_output: OutputCallback | None):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        while data := pipe.read1(READ_SIZE):
+            text = decoder.decode(data)
+            capture.add(text)
+            if text and on_output is not None:
+                on_output(text)
+        text = decoder.decode(b"", final=True)
+        capture.add(text)
+    except (OSError, ValueError):
+        # The pipe was closed after a timeout
+        pass
+    finally:
+        pipe.close()
+
+
+def _kill(process: subprocess.Popen) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass
+    process.wait()
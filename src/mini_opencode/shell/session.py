@@ -0,0 +1,397 @@
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from deepagents.backends.protocol import ExecuteResponse
+
+from mini_opencode.config import get_config_section
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_MAX_OUTPUT_BYTES = 100_000
+# Seconds to wait for the shell to start, or to come back after an interrupt
+STARTUP_TIMEOUT = 10.0
+INTERRUPT_GRACE = 3.0
+# Sessions kept alive by default, the least recently used idle one is
+# closed first
+MAX_SESSIONS = 8
+# Variables keeping programs from paging, coloring or waiting on the terminal
+SESSION_ENV = {"TERM": "dumb", "PAGER": "cat", "GIT_PAGER": "cat"}
+# Rows and columns of the terminal, wide so that tables are not wrapped
+DIMENSIONS = (50, 200)
+READ_SIZE = 64 * 1024
+# Start of the sentinel line printed after each command
+MARKER = "__MOC_END_"
+# Exit code of bash for a syntax error
+SYNTAX_ERROR_CODE = 2
+
+# Called from the running command's thread with each piece of its output
+OutputCallback = Callable[[str], None]
+
+
+class ShellSession:
+    """
+    A persistent bash process running the commands of one agent session.
+
+    Commands run in the same shell one after the other, so `cd`, exported
+    variables and activated virtual environments carry over to the next
+    command, and the shell does not start again for each of them.
+
+    The end of a command is found by a sentinel line printed after it with
+    its exit code. A command running longer than the timeout is
+    interrupted, and the shell is restarted if it does not come back.
+    Commands read their input from /dev/null, and their output and errors
+    are merged, as the shell runs in a terminal.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        env: dict[str, str] | None = None,
+    ):
+        """
+        Initialize the session. The shell is started by the first command.
+
+        Args:
+            root_dir: Working directory the shell starts in.
+            timeout: Maximum seconds a command may run.
+            max_output_bytes: Output of a command beyond this is dropped.
+            env: Environment variables of the shell, added to `SESSION_ENV`.
+        """
+        self.root_dir = Path(root_dir).resolve()
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.env = {**SESSION_ENV, **(env or {})}
+        self.restarts = 0
+        self._child = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the shell is running."""
+        return self._child is not None and self._child.isalive()
+
+    @property
+    def busy(self) -> bool:
+        """Whether a command is running."""
+        return self._lock.locked()
+
+    def run(
+        self, command: str, on_output: OutputCallback | None = None
+    ) -> ExecuteResponse:
+        """
+        Run a command in the shell, starting it first if needed.
+
+        Commands of the same session wait for each other.
+
+        Args:
+            command: The command to run.
+            on_output: Called with the output of the command as it is
+                produced, beyond `max_output_bytes` too.
+
+        Returns:
+            The output of the command, formatted like `LocalShellBackend`
+            formats it, with exit code 124 if the command timed out.
+        """
+        with self._lock:
+            try:
+                if not self.alive:
+                    self._start()
+                return self._run(command, on_output)
+            except Exception as e:
+                self._kill()
+                return ExecuteResponse(
+                    output=f"Error executing command ({type(e).__name__}): {e}",
+                    exit_code=1,
+                    truncated=False,
+                )
+
+    def close(self) -> None:
+        """Stop the shell."""
+        with self._lock:
+            self._kill()
+
+    def close_if_idle(self) -> bool:
+        """Stop the shell unless a command is running, without waiting."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._kill()
+        finally:
+            self._lock.release()
+        return True
+
+    def _start(self) -> None:
+        import pexpect
+
+        self._kill()
+        self._child = pexpect.spawn(
+            "bash",
+            ["--norc", "--noprofile", "--noediting"],
+            cwd=str(self.root_dir),
+            env=self.env,
+            echo=False,
+            encoding="utf-8",
+            codec_errors="replace",
+            dimensions=DIMENSIONS,
+        )
+        # No prompts, history or `!` expansion in the output
+        self._child.sendline(
+            "PS1=''; PS2=''; PROMPT_COMMAND=''; set +o history +H; stty -onlcr"
+        )
+        marker = self._send_marker()
+        _, code, _, _ = self._read_until(marker, STARTUP_TIMEOUT)
+        if code is None:
+            raise RuntimeError("The shell did not start.")
+
+    def _run(self, command: str, on_output: OutputCallback | None) -> ExecuteResponse:
+        # An unterminated quote or brace would leave the shell waiting for
+        # the rest of the command until the timeout
+        error = _check_syntax(command)
+        if error is not None:
+            output = f"{error}\n\nExit code: {SYNTAX_ERROR_CODE}"
+            if on_output is not None:
+                on_output(error + "\n")
+            return ExecuteResponse(
+                output=output, exit_code=SYNTAX_ERROR_CODE, truncated=False
+            )
+
+        # The group runs in the shell itself, so `cd` and `export` persist
+        self._child.sendline(f"{{\n{command}\n}} < /dev/null")
+        marker = self._send_marker()
+        output, code, total, exited = self._read_until(marker, self.timeout, on_output)
+
+        if code is None and not exited:
+            recovered = self._interrupt()
+            note = f"Error: Command timed out after {self.timeout:.1f} seconds."
+            if not recovered:
+                self._kill()
+                self.restarts += 1
+                note += (
+                    " The shell was restarted, its working directory and"
+                    " variables were reset."
+                )
+            output = f"{output.rstrip()}\n\n{note}" if output.strip() else note
+            return ExecuteResponse(output=output, exit_code=124, truncated=False)
+
+        if exited:
+            # The command exited the shell, it starts again with the next one
+            code = self._child.exitstatus if self._child.exitstatus is not None else 1
+            self._kill()
+
+        # The sentinel starts on a line of its own
+        output = output.removesuffix("\n")
+        truncated = total > self.max_output_bytes
+        if truncated:
+            output += f"\n\n... Output truncated at {self.max_output_bytes} bytes."
+        if code != 0:
+            output = f"{output.rstrip()}\n\nExit code: {code}"
+        return ExecuteResponse(output=output, exit_code=code, truncated=truncated)
+
+    def _send_marker(self) -> re.Pattern:
+        token = uuid.uuid4().hex
+        # Split by the format, so the line is never matched in the input
+        self._child.sendline(f"printf '\\n{MARKER}%s_%s__\\n' {token} \"$?\"")
+        return re.compile(rf"\n{MARKER}{token}_(\d+)__\n")
+
+    def _read_until(
+        self,
+        marker: re.Pattern,
+        timeout: float,
+        on_output: OutputCallback | None = None,
+    ) -> tuple[str, int | None, int, bool]:
+        """
+        Read the output of the shell up to a sentinel.
+
+        Returns:
+            The output kept, within `max_output_bytes`, the exit code in the
+            sentinel or None if it did not come in time, the length of the
+            whole output, and whether the shell exited.
+        """
+        import pexpect
+
+        kept: list[str] = []
+        kept_size = total = 0
+        # Text after the last newline, held back while it may be a sentinel
+        pending = ""
+        start = f"\n{MARKER}"
+        max_tail = len(start) + 64
+        deadline = time.monotonic() + timeout
+
+        def keep(text: str) -> None:
+            nonlocal kept_size, total
+            if text and on_output is not None:
+                on_output(text)
+            total += len(text)
+            if kept_size < self.max_output_bytes:
+                text = text[: self.max_output_bytes - kept_size]
+                kept.append(text)
+                kept_size += len(text)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                keep(pending)
+                return "".join(kept), None, total, False
+            try:
+                pending += self._child.read_nonblocking(READ_SIZE, timeout=remaining)
+            except pexpect.TIMEOUT:
+                continue
+            except pexpect.EOF:
+                keep(pending)
+                self._child.close()
+                return "".join(kept), None, total, True
+            match = marker.search(pending)
+            if match:
+                keep(pending[: match.start()])
+                return "".join(kept), int(match.group(1)), total, False
+            cut = pending.rfind("\n")
+            tail = pending[cut:]
+            maybe_marker = start.startswith(tail) or tail.startswith(start)
+            if cut == -1 or not maybe_marker or len(tail) > max_tail:
+                cut = len(pending)
+            keep(pending[:cut])
+            pending = pending[cut:]
+
+    def _interrupt(self) -> bool:
+        """Interrupt the running command, and tell if the shell came back."""
+        try:
+            self._child.sendintr()
+            # The interrupt discards pending input, so ask for a new sentinel
+            marker = self._send_marker()
+            _, code, _, _ = self._read_until(marker, INTERRUPT_GRACE)
+        except OSError:
+            return False
+        return code is not None
+
+    def _kill(self) -> None:
+        if self._child is not None:
+            try:
+                self._child.close(force=True)
+            except Exception:
+                pass
+            self._child = None
+
+
+def _check_syntax(command: str) -> str | None:
+    """Parse a command without running it, and get bash's syntax error if any."""
+    try:
+        result = subprocess.run(
+            # Patterns of `extglob` are allowed, as a session may enable it
+            ["bash", "-n", "-O", "extglob", "-c", command],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=STARTUP_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        # The shell reports the error itself then
+        return None
+    if result.returncode == 0:
+        return None
+    return result.stderr.strip() or "Syntax error."
+
+
+_sessions: OrderedDict[tuple[Path, str], ShellSession] = OrderedDict()
+_sessions_lock = threading.Lock()
+_max_sessions = MAX_SESSIONS
+
+
+def get_shell_settings() -> dict:
+    """
+    Get the settings of the `execute` tool, from the `shell` section.
+
+    Commands run in a new process each unless `persistent` is set.
+    """
+    settings = get_config_section(["shell"])
+    if not isinstance(settings, dict):
+        settings = {}
+    if sys.platform == "win32":
+        # pexpect cannot spawn a terminal on Windows
+        settings = {**settings, "persistent": False}
+    return settings
+
+
+def get_timeout(settings: dict) -> float:
+    """Get the maximum seconds a command may run."""
+    return float(settings.get("timeout", DEFAULT_TIMEOUT))
+
+
+def get_max_output_bytes(settings: dict) -> int:
+    """Get the length of the output of a command given to the agent."""
+    return int(settings.get("max_output_kb", DEFAULT_MAX_OUTPUT_BYTES / 1000) * 1000)
+
+
+def get_shell_session(root_dir: str | Path, session_id: str) -> ShellSession:
+    """
+    Get the shell of an agent session, creating it on first use.
+
+    When more sessions than the limit set by `set_max_shell_sessions` are
+    open, the ones not used for a while are closed. A session running a
+    command is never closed, the limit is exceeded instead.
+    """
+    settings = get_shell_settings()
+    root_dir = Path(root_dir).resolve()
+    key = (root_dir, session_id)
+    evicted = []
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = ShellSession(
+                root_dir,
+                timeout=get_timeout(settings),
+                max_output_bytes=get_max_output_bytes(settings),
+            )
+        _sessions.move_to_end(key)
+        excess = len(_sessions) - _max_sessions
+        for old_key, old in list(_sessions.items()):
+            if excess <= 0 or old is session:
+                break
+            if not old.busy:
+                evicted.append((old_key, _sessions.pop(old_key)))
+                excess -= 1
+    for old_key, old in evicted:
+        if not old.close_if_idle():
+            # A command started in the meantime, the session is kept
+            with _sessions_lock:
+                _sessions.setdefault(old_key, old)
+                _sessions.move_to_end(old_key, last=False)
+    return session
+
+
+def set_max_shell_sessions(count: int) -> None:
+    """
+    Set the number of sessions kept alive, at least `MAX_SESSIONS`.
+
+    Callers running more sessions at once, such as batch runs, raise it
+    so that a session is not closed between the commands of its task.
+    """
+    global _max_sessions
+
+    with _sessions_lock:
+        _max_sessions = max(MAX_SESSIONS, count)
+
+
+def close_shell_session(root_dir: str | Path, session_id: str) -> None:
+    """Stop the shell of an agent session, if it was started."""
+    with _sessions_lock:
+        session = _sessions.pop((Path(root_dir).resolve(), session_id), None)
+    if session is not None:
+        session.close()
+
+
+def close_shell_sessions() -> None:
+    """Stop every shell."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -1,11 +1,42 @@
-from .date import get_current_date_tool
-from .mcp import load_mcp_tools
-from .web import bocha_websearch_tool, web_fetch_tool, web_search_tool
+import importlib
+
+from .registry import TOOL_REGISTRY, load_enabled_tools, load_tool
+
+# Attributes imported on first access, so that importing this package does
+# not import every tool
+_LAZY_ATTRIBUTES = {
+    "get_current_date_tool": ".date",
+    "load_mcp_tools": ".mcp",
+    "web_fetch_tool": ".web",
+    "web_fetch_batch_tool": ".web",
+    "web_search_tool": ".web",
+    "bocha_websearch_tool": ".web",
+    "meta_web_search_tool": ".web",
+    "find_definition_tool": ".code",
+    "find_references_tool": ".code",
+    "file_outline_tool": ".code",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
+
 
 __all__ = [
+    "TOOL_REGISTRY",
     "get_current_date_tool",
+    "load_enabled_tools",
     "load_mcp_tools",
+    "load_tool",
     "web_fetch_tool",
+    "web_fetch_batch_tool",
     "web_search_tool",
     "bocha_websearch_tool",
+    "meta_web_search_tool",
+    "find_definition_tool",
+    "find_references_tool",
+    "file_outline_tool",
 ]
@@ -0,0 +1,11 @@
+from .file_outline import file_outline_tool
+from .find_definition import find_definition_tool
+from .find_references import find_references_tool
+from .index import bind_root_dir
+
+__all__ = [
+    "bind_root_dir",
+    "file_outline_tool",
+    "find_definition_tool",
+    "find_references_tool",
+]
@@ -0,0 +1,35 @@
+from langchain_core.tools import StructuredTool
+
+from .index import get_index, resolve_path
+
+
+def file_outline(file_path: str) -> str:
+    """
+    Get the outline of a source file: its classes, functions, methods and variables with their signatures and line ranges.
+
+    Use it to find what to read in a large file instead of reading the whole file.
+
+    Args:
+        file_path: The path of the file.
+
+    Returns:
+        The definitions of the file, indented by nesting.
+    """
+    index = get_index()
+    symbols = index.outline(resolve_path(index, file_path))
+    if not symbols:
+        return f"No definitions found in `{file_path}`."
+    lines = []
+    for symbol in symbols:
+        indent = "  " * (symbol.container.count(".") + 1 if symbol.container else 0)
+        lines.append(
+            f"{indent}{symbol.line}-{symbol.end_line} {symbol.kind} {symbol.signature}"
+        )
+    return "\n".join(lines)
+
+
+file_outline_tool = StructuredTool.from_function(
+    func=file_outline,
+    name="file_outline",
+    parse_docstring=True,
+)
@@ -0,0 +1,39 @@
+from langchain_core.tools import StructuredTool
+
+from .index import display_path, get_index
+
+
+def find_definition(name: str) -> str:
+    """
+    Find where a class, function, method or variable is defined in the project.
+
+    Prefer it over `grep` to locate a definition. Read the returned line range with `read_file`.
+
+    Args:
+        name: The name of the symbol, optionally qualified by its class, such as `Class.method`.
+
+    Returns:
+        The file, line range and signature of each definition.
+    """
+    index = get_index()
+    locations = index.find_definitions(name)
+    if not locations:
+        return f"No definition of `{name}` found."
+    lines = []
+    for location in locations:
+        symbol = location.symbol
+        qualified = (
+            f"{symbol.container}.{symbol.name}" if symbol.container else symbol.name
+        )
+        lines.append(
+            f"{display_path(index, location.path)}:{symbol.line}-{symbol.end_line} "
+            f"{symbol.kind} {qualified}\n    {symbol.signature}"
+        )
+    return "\n".join(lines)
+
+
+find_definition_tool = StructuredTool.from_function(
+    func=find_definition,
+    name="find_definition",
+    parse_docstring=True,
+)
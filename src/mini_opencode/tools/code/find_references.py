@@ -0,0 +1,49 @@
+from itertools import groupby
+
+from langchain_core.tools import StructuredTool
+
+from .index import display_path, get_index, read_lines
+
+# Longest line of code shown for a reference
+MAX_LINE_CHARS = 200
+
+
+def find_references(name: str, max_results: int = 100) -> str:
+    """
+    Find where a name is used in the project, in code rather than in comments or strings where the language allows it.
+
+    Args:
+        name: The name to find. A qualified name such as `Class.method` matches on its last part.
+        max_results: The maximum number of references to return. Defaults to 100.
+
+    Returns:
+        Each reference as `path:line: code`.
+    """
+    index = get_index()
+    references = index.find_references(name, limit=max_results + 1)
+    if not references:
+        return f"No reference to `{name}` found."
+    lines = []
+    for path, group in groupby(references[:max_results], key=lambda r: r.path):
+        source = read_lines(index, path)
+        for reference in group:
+            code = (
+                source[reference.line - 1].strip()
+                if reference.line <= len(source)
+                else ""
+            )
+            lines.append(
+                f"{display_path(index, path)}:{reference.line}: {code[:MAX_LINE_CHARS]}"
+            )
+    if len(references) > max_results:
+        lines.append(
+            f"[More than {max_results} references, raise `max_results` to see more.]"
+        )
+    return "\n".join(lines)
+
+
+find_references_tool = StructuredTool.from_function(
+    func=find_references,
+    name="find_references",
+    parse_docstring=True,
+)
@@ -0,0 +1,77 @@
+from contextvars import ContextVar
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+
+from mini_opencode import project
+from mini_opencode.index import SymbolIndex, get_symbol_index
+
+# Seconds a tool waits for the first indexing of the project
+READY_TIMEOUT = 60
+
+# Project root of the tool being called, set by tools from `bind_root_dir`
+_root_dir: ContextVar[Path | None] = ContextVar("code_tool_root_dir", default=None)
+
+
+def bind_root_dir(tool: StructuredTool, root_dir: str | Path) -> StructuredTool:
+    """
+    Get a copy of a code navigation tool answering for a given project.
+
+    The registered tools answer for the current project, while an agent may
+    be built for another root, such as by each task of a batch run.
+    """
+    func = tool.func
+    root_dir = Path(root_dir).resolve()
+
+    def call(*args, **kwargs):
+        token = _root_dir.set(root_dir)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _root_dir.reset(token)
+
+    return tool.model_copy(update={"func": call})
+
+
+def get_index() -> SymbolIndex:
+    """
+    Get the symbol index of the current project, once it is built.
+
+    Raises:
+        ValueError: If the symbol index is disabled.
+    """
+    index = get_symbol_index(_root_dir.get() or project.root_dir)
+    if index is None:
+        raise ValueError(
+            "The symbol index is disabled by `project_index.symbols` in `config.yaml`."
+        )
+    index.ready.wait(READY_TIMEOUT)
+    return index
+
+
+def display_path(index: SymbolIndex, path: str) -> str:
+    """Get the absolute path of a file of the index, as the file tools take it."""
+    return str(index.root_dir / path)
+
+
+def read_lines(index: SymbolIndex, path: str) -> list[str]:
+    """Read the lines of a file of the index, or none if it cannot be read."""
+    try:
+        return (index.root_dir / path).read_text(errors="replace").splitlines()
+    except OSError:
+        return []
+
+
+def resolve_path(index: SymbolIndex, file_path: str) -> str:
+    """
+    Get the path of a file relative to the project root.
+
+    Raises:
+        ValueError: If the file is outside the project or does not exist.
+    """
+    rel = index.relative_path(file_path)
+    if rel is None:
+        raise ValueError(f"`{file_path}` is outside the project root.")
+    if not (index.root_dir / rel).is_file():
+        raise ValueError(f"`{file_path}` is not a file.")
+    return rel
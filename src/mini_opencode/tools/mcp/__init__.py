@@ -1,3 +1,20 @@
-from .load_mcp_tools import load_mcp_tools
+from .load_mcp_tools import (
+    McpServerTools,
+    get_mcp_server_configs,
+    iter_mcp_server_tools,
+    load_mcp_server_tools,
+    load_mcp_tools,
+)
+from .schema_cache import McpSchemaCache
+from .session_pool import McpSessionPool, PooledSession
 
-__all__ = ["load_mcp_tools"]
+__all__ = [
+    "McpSchemaCache",
+    "McpServerTools",
+    "McpSessionPool",
+    "PooledSession",
+    "get_mcp_server_configs",
+    "iter_mcp_server_tools",
+    "load_mcp_server_tools",
+    "load_mcp_tools",
+]
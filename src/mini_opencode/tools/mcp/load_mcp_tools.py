@@ -1,12 +1,269 @@
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import asyncio
+import dataclasses
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from langchain.tools import BaseTool
 
 from mini_opencode.config import get_config_section
+from mini_opencode.tools.rate_limit import acall_with_retry
+
+from .schema_cache import McpSchemaCache
+from .session_pool import McpSessionPool
+
+# Seconds to wait for a server to list its tools
+DEFAULT_LOAD_TIMEOUT = 10.0
+
+
+@dataclass
+class McpServerTools:
+    """Tools loaded from one MCP server, or the reason loading failed."""
+
+    name: str
+    tools: list[BaseTool] = field(default_factory=list)
+    error: str | None = None
+    elapsed: float = 0.0
+    # Whether the tools were built from cached schemas
+    cached: bool = False
+
+
+def get_mcp_server_configs() -> dict[str, dict]:
+    """
+    Get the MCP server configs from the `tools.mcp_servers` section.
+
+    Each server may set a `load_timeout` in seconds, which defaults to
+    `tools.mcp_load_timeout` and then to `DEFAULT_LOAD_TIMEOUT`.
+
+    Returns:
+        The connection config of each server, including its `load_timeout`.
+    """
+    servers = get_config_section(["tools", "mcp_servers"]) or {}
+    default_timeout = get_config_section(["tools", "mcp_load_timeout"])
+    if default_timeout is None:
+        default_timeout = DEFAULT_LOAD_TIMEOUT
+    return {
+        name: {"load_timeout": float(default_timeout), **config}
+        for name, config in servers.items()
+    }
+
+
+async def load_mcp_server_tools(
+    name: str,
+    config: dict,
+    cache: McpSchemaCache | None = None,
+    pool: McpSessionPool | None = None,
+) -> McpServerTools:
+    """
+    Load the tools of one MCP server, giving up after its `load_timeout`.
+
+    Args:
+        name: The name of the server.
+        config: The server config, as returned by `get_mcp_server_configs`.
+        cache: Cache to store the listed tool schemas in.
+        pool: Pool whose session the tools call, instead of connecting on
+            each call.
+
+    Returns:
+        The loaded tools, or the error if the server could not be loaded.
+    """
+    connection, timeout = _split_config(config)
+    schemas, error, elapsed = await _list_tool_schemas(name, connection, timeout)
+    if schemas is None:
+        return McpServerTools(name=name, error=error, elapsed=elapsed)
+    if cache is not None:
+        cache.put(name, connection, schemas)
+    return McpServerTools(
+        name=name,
+        tools=_build_tools(name, connection, schemas, pool),
+        elapsed=elapsed,
+    )
+
+
+async def iter_mcp_server_tools(
+    servers: dict[str, dict] | None = None,
+    cache: McpSchemaCache | None = None,
+    pool: McpSessionPool | None = None,
+) -> AsyncIterator[McpServerTools]:
+    """
+    Connect to MCP servers concurrently, yielding each server as it finishes.
+
+    With a cache, servers with cached schemas are yielded first, with tools
+    built from the cache. They are then revalidated in the background and
+    yielded again only if their schemas changed or they failed to load.
+
+    Args:
+        servers: The server configs, defaulting to `get_mcp_server_configs()`.
+        cache: Cache of tool schemas to read from and update.
+        pool: Pool whose sessions the tools call.
+    """
+    if servers is None:
+        servers = get_mcp_server_configs()
+
+    tasks = []
+    for name, config in servers.items():
+        connection, _ = _split_config(config)
+        schemas = cache.get(name, connection) if cache is not None else None
+        if schemas is None:
+            tasks.append(load_mcp_server_tools(name, config, cache, pool))
+            continue
+        cached = McpServerTools(
+            name=name,
+            tools=_build_tools(name, connection, schemas, pool),
+            cached=True,
+        )
+        yield cached
+        tasks.append(_revalidate(cached, config, cache, pool))
+
+    for next_result in asyncio.as_completed(tasks):
+        result = await next_result
+        if result is not None:
+            yield result
+
+
+async def load_mcp_tools() -> list[BaseTool]:
+    """Load MCP tools from the config, skipping servers that fail to load."""
+    tools = []
+    async for server in iter_mcp_server_tools():
+        tools.extend(server.tools)
+    return tools
+
+
+async def _revalidate(
+    cached: McpServerTools,
+    config: dict,
+    cache: McpSchemaCache,
+    pool: McpSessionPool | None = None,
+) -> McpServerTools | None:
+    """List the tools of a cached server and replace stale schemas.
+
+    Returns:
+        The server with its new tools if the schemas changed, the cached
+        server with the error if it failed to load, or None if the cache is
+        up to date.
+    """
+    connection, timeout = _split_config(config)
+    schemas, error, elapsed = await _list_tool_schemas(cached.name, connection, timeout)
+    if schemas is None:
+        # Keep the cached tools, the server may be reachable again later
+        return dataclasses.replace(cached, error=error, elapsed=elapsed)
+    if not cache.put(cached.name, connection, schemas):
+        return None
+    return McpServerTools(
+        name=cached.name,
+        tools=_build_tools(cached.name, connection, schemas, pool),
+        elapsed=elapsed,
+    )
+
+
+async def _list_tool_schemas(
+    name: str, connection: dict, timeout: float
+) -> tuple[list[dict] | None, str | None, float]:
+    """List the tools of a server as JSON schemas.
+
+    Returns:
+        The schemas, or None and the error, and the elapsed seconds.
+    """
+    # Only import the MCP SDK when MCP servers are configured
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    async def list_schemas() -> list[dict]:
+        client = MultiServerMCPClient({name: connection})
+        async with client.session(name) as session:
+            schemas = []
+            cursor = None
+            while True:
+                page = await session.list_tools(cursor=cursor)
+                schemas.extend(
+                    tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+                    for tool in page.tools
+                )
+                cursor = page.nextCursor
+                if not cursor:
+                    return schemas
+
+    start = time.perf_counter()
+    schemas, error = None, None
+    try:
+        async with asyncio.timeout(timeout):
+            schemas = await acall_with_retry(f"mcp:{name}", list_schemas)
+    except TimeoutError:
+        schemas, error = None, f"timed out after {timeout:g}s"
+    except Exception as e:
+        schemas, error = None, _describe_error(e)
+    return schemas, error, time.perf_counter() - start
+
+
+def _build_tools(
+    name: str,
+    connection: dict,
+    schemas: list[dict],
+    pool: McpSessionPool | None = None,
+) -> list[BaseTool]:
+    """Build LangChain tools from tool schemas.
+
+    With a pool, the tools share the pooled session of their server,
+    otherwise they connect on each call. Either way, calls are rate limited
+    as the `mcp:<server>` provider.
+    """
+    from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+    from mcp.types import Tool
+
+    session = pool.session(name, connection) if pool is not None else None
+    # The pooled session limits its calls itself
+    interceptors = None if session is not None else [_rate_limit_interceptor(name)]
+    return [
+        convert_mcp_tool_to_langchain_tool(
+            session,
+            Tool.model_validate(schema),
+            connection=None if session is not None else connection,
+            tool_interceptors=interceptors,
+            server_name=name,
+        )
+        for schema in schemas
+    ]
+
+
+def _rate_limit_interceptor(name: str):
+    """Make a tool call interceptor calling the server within its rate limit.
+
+    Like with a pooled session, only failures to connect are retried, as a
+    tool call may not be safe to repeat.
+    """
+    import httpx
+
+    async def call(request, handler):
+        try:
+            return await handler(request)
+        except Exception as e:
+            error = _unwrap_error(e)
+            if isinstance(error, (httpx.ConnectError, ConnectionError)):
+                raise ConnectionError(
+                    f"MCP server `{name}` is not reachable: {_describe_error(e)}"
+                ) from e
+            raise
+
+    async def intercept(request, handler):
+        return await acall_with_retry(f"mcp:{name}", lambda: call(request, handler))
+
+    return intercept
+
+
+def _describe_error(error: BaseException) -> str:
+    """Describe an error, unwrapping the exception groups of MCP transports."""
+    error = _unwrap_error(error)
+    return str(error) or type(error).__name__
+
+
+def _unwrap_error(error: BaseException) -> BaseException:
+    """Get the first error in the exception groups of MCP transports."""
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return error
 
 
-async def load_mcp_tools():
-    """Load MCP tools from the config."""
-    servers = get_config_section(["tools", "mcp_servers"])
-    if not servers:
-        return []
-    client = MultiServerMCPClient(servers)
-    return await client.get_tools()
+def _split_config(config: dict) -> tuple[dict, float]:
+    """Split a server config into its connection and its load timeout."""
+    connection = dict(config)
+    timeout = float(connection.pop("load_timeout", DEFAULT_LOAD_TIMEOUT))
+    return connection, timeout
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path.home() / ".mini-opencode" / "mcp_cache"
+
+
+class McpSchemaCache:
+    """
+    On-disk cache of the tool schemas listed by MCP servers.
+
+    Entries are keyed by a hash of the server name and connection config, so
+    changing a server's config never reuses schemas listed with the old one.
+    Only tool schemas are stored, never the config itself.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory of the cache files. Defaults to
+                `~/.mini-opencode/mcp_cache`.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def get(self, name: str, connection: dict) -> list[dict] | None:
+        """
+        Get the cached tool schemas of a server.
+
+        Returns:
+            The schemas, or None if the server is not cached.
+        """
+        try:
+            with open(self._path(name, connection), "r", encoding="utf-8") as f:
+                tools = json.load(f)["tools"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tools
+
+    def put(self, name: str, connection: dict, tools: list[dict]) -> bool:
+        """
+        Store the tool schemas of a server.
+
+        Returns:
+            True if the schemas differ from the cached ones.
+        """
+        path = self._path(name, connection)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.load(f)["tools"] == tools:
+                    return False
+            self.updates += 1
+        except (OSError, ValueError, KeyError):
+            pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"server": name, "tools": tools}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return True
+
+    def clear(self) -> int:
+        """
+        Remove all cached schemas.
+
+        Returns:
+            The number of removed servers.
+        """
+        count = 0
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+            count += 1
+        return count
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "updates": self.updates}
+
+    def _path(self, name: str, connection: dict) -> Path:
+        payload = json.dumps(
+            {"name": name, "connection": connection}, sort_keys=True, default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.json"
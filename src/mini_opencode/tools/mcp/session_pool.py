@@ -0,0 +1,214 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any
+
+from mini_opencode.config import get_config_section
+from mini_opencode.tools.rate_limit import acall_with_retry
+
+# Seconds between pings of an idle session
+DEFAULT_KEEPALIVE_INTERVAL = 30.0
+# Seconds to wait for a session to connect before a call fails
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Bounds of the delay before reconnecting, doubled after each failure
+INITIAL_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+# Number of recent call latencies kept for percentiles
+LATENCY_WINDOW = 256
+
+
+class PooledSession:
+    """
+    A long-lived session to one MCP server.
+
+    The session is opened on the first call and kept open by a background
+    task that pings it while idle and reconnects with exponential backoff
+    when it breaks. Calls are multiplexed over the session concurrently.
+
+    It can be passed as the `session` of `convert_mcp_tool_to_langchain_tool`,
+    which only uses `call_tool`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connection: dict,
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+    ):
+        self.name = name
+        self.connection = connection
+        self.keepalive_interval = keepalive_interval
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+
+        self._session = None
+        self._ready = asyncio.Event()
+        self._reconnect = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_error: str | None = None
+
+        self.calls = 0
+        self.errors = 0
+        self.reconnects = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        **kwargs,
+    ):
+        """Call a tool of the server over the pooled session.
+
+        Calls are rate limited as the `mcp:<server>` provider. Only failures
+        to connect are retried, as a tool call may not be safe to repeat.
+        """
+        session = await acall_with_retry(f"mcp:{self.name}", self._get_session)
+        start = time.perf_counter()
+        try:
+            return await session.call_tool(name, arguments, **kwargs)
+        except Exception:
+            self.errors += 1
+            # The session may be broken, replace it before the next call
+            if self._session is session:
+                self._reconnect.set()
+            raise
+        finally:
+            self.calls += 1
+            self._latencies.append(time.perf_counter() - start)
+
+    async def close(self) -> None:
+        """Close the session and stop keeping it alive."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Call counters and latency percentiles in milliseconds."""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            "connected": self._session is not None,
+            "calls": self.calls,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+    async def _get_session(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._keep_alive())
+        try:
+            async with asyncio.timeout(self.connect_timeout):
+                await self._ready.wait()
+        except TimeoutError:
+            reason = f": {self._last_error}" if self._last_error else ""
+            raise ConnectionError(
+                f"MCP server `{self.name}` is not connected{reason}"
+            ) from None
+        return self._session
+
+    async def _keep_alive(self) -> None:
+        """Hold the session open, pinging it and reconnecting when it breaks.
+
+        The session is entered and exited in this task, as the transports
+        require their context to be closed by the task that opened it.
+        """
+        from langchain_mcp_adapters.sessions import create_session
+
+        backoff = INITIAL_BACKOFF
+        while True:
+            try:
+                async with create_session(self.connection) as session:
+                    await session.initialize()
+                    self._session = session
+                    self._last_error = None
+                    self._ready.set()
+                    backoff = INITIAL_BACKOFF
+                    while True:
+                        try:
+                            async with asyncio.timeout(self.keepalive_interval):
+                                await self._reconnect.wait()
+                            break
+                        except TimeoutError:
+                            async with asyncio.timeout(self.connect_timeout):
+                                await session.send_ping()
+            except Exception as e:
+                # Cancellation is a `BaseException`, so closing the pool ends the task
+                while isinstance(e, ExceptionGroup) and e.exceptions:
+                    e = e.exceptions[0]
+                self._last_error = str(e) or type(e).__name__
+            finally:
+                self._session = None
+                self._ready.clear()
+                self._reconnect.clear()
+
+            self.reconnects += 1
+            # Jitter keeps servers from being hit by every client at once
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+class McpSessionPool:
+    """Long-lived sessions to MCP servers, one per server."""
+
+    def __init__(self):
+        settings = get_config_section(["tools", "mcp_session_pool"]) or {}
+        self.keepalive_interval = float(
+            settings.get("keepalive_interval", DEFAULT_KEEPALIVE_INTERVAL)
+        )
+        self.max_backoff = float(settings.get("max_backoff", DEFAULT_MAX_BACKOFF))
+        self._sessions: dict[str, PooledSession] = {}
+
+    def session(self, name: str, connection: dict) -> PooledSession:
+        """
+        Get the session of a server, creating it if needed.
+
+        A session whose connection config changed is replaced; the old one
+        is closed in the background.
+        """
+        session = self._sessions.get(name)
+        if session is not None and session.connection == connection:
+            return session
+        if session is not None:
+            asyncio.ensure_future(session.close())
+        session = PooledSession(
+            name,
+            connection,
+            keepalive_interval=self.keepalive_interval,
+            max_backoff=self.max_backoff,
+        )
+        self._sessions[name] = session
+        return session
+
+    async def remove(self, name: str) -> None:
+        """Close and forget the session of a server."""
+        session = self._sessions.pop(name, None)
+        if session is not None:
+            await session.close()
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Call counters and latencies by server."""
+        return {name: session.stats for name, session in self._sessions.items()}
+
+    async def close(self) -> None:
+        """Close all sessions."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions))
@@ -0,0 +1,281 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from mini_opencode.config import get_config_section, get_config_version
+
+T = TypeVar("T")
+
+# Requests per second, and requests that may be sent at once after idling
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 10
+DEFAULT_MAX_RETRIES = 3
+# Bounds of the delay before a retry, doubled after each failure
+INITIAL_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+# HTTP statuses that mean the request may succeed if sent again later
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# Number of recent waits kept for percentiles
+WAIT_WINDOW = 256
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the request rate to one provider.
+
+    Tokens are reserved rather than waited for, so callers queue in the
+    order they arrive, and the bucket can be shared by threads and
+    coroutines alike.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self._waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+        # Waits for a free slot under the concurrency limit of the provider
+        self._slot_waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if the bucket is empty.
+
+        Returns:
+            Seconds to wait before the request may be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                self._tokens -= 1
+                delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            else:
+                delay = 0.0
+            self.calls += 1
+            self._waits.append(delay)
+        return delay
+
+    def record_slot_wait(self, delay: float) -> None:
+        """Record the seconds a call waited for a free concurrency slot."""
+        with self._lock:
+            self._slot_waits.append(delay)
+
+    def penalize(self, delay: float) -> None:
+        """Hold back every request for `delay` seconds, e.g. after a 429."""
+        with self._lock:
+            self.throttled += 1
+            if self.rate > 0:
+                self._tokens = min(self._tokens, -delay * self.rate)
+                self._updated = time.monotonic()
+
+    def backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Get the delay before a retry, honoring the `Retry-After` of the server."""
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        delay = min(INITIAL_BACKOFF * 2**attempt, self.max_backoff)
+        # Jitter keeps throttled callers from retrying all at once
+        return delay * random.uniform(0.5, 1.0)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """
+        Call counters, and waits in milliseconds.
+
+        The queue wait is the wait for the rate limit, the slot wait is the
+        wait for a free slot under the concurrency limit.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            slot_waits = sorted(self._slot_waits)
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "p50_wait_ms": _percentile(waits, 0.5),
+            "p95_wait_ms": _percentile(waits, 0.95),
+            "max_wait_ms": waits[-1] * 1000 if waits else 0.0,
+            "p50_slot_wait_ms": _percentile(slot_waits, 0.5),
+            "p95_slot_wait_ms": _percentile(slot_waits, 0.95),
+            "max_slot_wait_ms": slot_waits[-1] * 1000 if slot_waits else 0.0,
+        }
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_version = -1
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Get the rate limiter of a provider.
+
+    It is configured by `tools.rate_limits.<provider>`, falling back to
+    `tools.rate_limits.default`. MCP servers are named `mcp:<server>`.
+    """
+    global _limiters_version
+
+    version = get_config_version()
+    with _limiters_lock:
+        if version != _limiters_version:
+            # Keep the counters across reloads, only the settings change
+            for limiter in _limiters.values():
+                _configure(limiter)
+            _limiters_version = version
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(provider)
+            _configure(limiter)
+    return limiter
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    """Get the counters and waits of every provider called so far."""
+    with _limiters_lock:
+        return {name: limiter.stats for name, limiter in _limiters.items()}
+
+
+def call_with_retry(provider: str, fn: Callable[[], T]) -> T:
+    """
+    Call a provider once its rate limit allows it, retrying transient failures.
+
+    Requests failing with a timeout, a connection error or a status in
+    `RETRY_STATUSES` are retried with jittered exponential backoff, or after
+    the delay of the `Retry-After` header if the server sent one.
+
+    Args:
+        provider: The name of the provider.
+        fn: Sends the request, and raises on failure.
+
+    Returns:
+        The result of `fn`.
+    """
+    limiter = get_rate_limiter(provider)
+    attempt = 0
+    while True:
+        delay = limiter.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            return fn()
+        except Exception as e:
+            delay = _retry_delay(limiter, e, attempt)
+            if delay is None:
+                raise
+        limiter.retries += 1
+        attempt += 1
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def acall_with_retry(provider: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Like `call_with_retry`, for async calls."""
+    limiter = get_rate_limiter(provider)
+    attempt = 0
+    while True:
+        delay = limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _retry_delay(limiter, e, attempt)
+            if delay is None:
+                raise
+        limiter.retries += 1
+        attempt += 1
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check if a request that failed with an error may succeed if sent again."""
+    # Only import httpx when a request has failed
+    import httpx
+
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUSES
+    # Timeouts are transport errors, connection errors include unreachable
+    # MCP servers
+    return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+def raise_for_retryable_status(response) -> None:
+    """
+    Raise for a response whose status is in `RETRY_STATUSES`, so the call is retried.
+
+    Other failed responses are left for the caller to report.
+    """
+    if response.status_code in RETRY_STATUSES:
+        response.raise_for_status()
+
+
+def get_retry_after(error: BaseException) -> float | None:
+    """Get the seconds to wait from the `Retry-After` header of a failed response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def _retry_delay(limiter: RateLimiter, error: Exception, attempt: int) -> float | None:
+    """Get the delay before retrying a failed call, or None to give up."""
+    if attempt >= limiter.max_retries or not is_retryable(error):
+        return None
+    delay = limiter.backoff(attempt, get_retry_after(error))
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        # Slow down every caller of the provider, not just this one. The
+        # retry then waits for its token like any other call.
+        limiter.penalize(delay)
+        return 0.0
+    return delay
+
+
+def _percentile(waits: list[float], p: float) -> float:
+    """Get a percentile of sorted waits in seconds, in milliseconds."""
+    if not waits:
+        return 0.0
+    return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000
+
+
+def _configure(limiter: RateLimiter) -> None:
+    settings = get_config_section(["tools", "rate_limits"]) or {}
+    config = {**(settings.get("default") or {}), **(settings.get(limiter.name) or {})}
+    limiter.rate = float(config.get("rate", DEFAULT_RATE))
+    limiter.burst = max(1, int(config.get("burst", DEFAULT_BURST)))
+    limiter.max_retries = int(config.get("max_retries", DEFAULT_MAX_RETRIES))
+    limiter.max_backoff = float(config.get("max_backoff", DEFAULT_MAX_BACKOFF))
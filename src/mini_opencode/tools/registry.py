@@ -0,0 +1,84 @@
+import importlib
+
+from langchain.tools import BaseTool
+
+# Tool name -> (module, attribute). A tool's module is only imported when the
+# tool is enabled, and SDKs are only imported when the tool is first called.
+TOOL_REGISTRY: dict[str, tuple[str, str]] = {
+    "get_current_date": (
+        "mini_opencode.tools.date.get_current_date",
+        "get_current_date_tool",
+    ),
+    "web_fetch": ("mini_opencode.tools.web.web_fetch", "web_fetch_tool"),
+    "web_fetch_batch": (
+        "mini_opencode.tools.web.web_fetch_batch",
+        "web_fetch_batch_tool",
+    ),
+    "web_search": ("mini_opencode.tools.web.web_search", "web_search_tool"),
+    "bocha_web_search": (
+        "mini_opencode.tools.web.bocha_web_search",
+        "bocha_websearch_tool",
+    ),
+    "meta_web_search": (
+        "mini_opencode.tools.web.meta_search",
+        "meta_web_search_tool",
+    ),
+    "find_definition": (
+        "mini_opencode.tools.code.find_definition",
+        "find_definition_tool",
+    ),
+    "find_references": (
+        "mini_opencode.tools.code.find_references",
+        "find_references_tool",
+    ),
+    "file_outline": ("mini_opencode.tools.code.file_outline", "file_outline_tool"),
+}
+
+# Tools enabled when `tools.enabled` is not configured
+DEFAULT_TOOLS = [
+    "get_current_date",
+    "web_fetch",
+    "web_fetch_batch",
+    "web_search",
+    "bocha_web_search",
+    "find_definition",
+    "find_references",
+    "file_outline",
+]
+
+# Tools enabled even if `tools.enabled` does not list them
+REQUIRED_TOOLS = ["get_current_date"]
+
+
+def load_tool(name: str) -> BaseTool:
+    """
+    Load a registered tool, importing its module.
+
+    Args:
+        name: The name of the tool.
+
+    Returns:
+        The tool.
+
+    Raises:
+        KeyError: If the tool is not registered.
+    """
+    module_name, attribute = TOOL_REGISTRY[name]
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def load_enabled_tools(enabled: list[str] | None = None) -> list[BaseTool]:
+    """
+    Load the enabled tools. Unknown tool names are ignored.
+
+    Args:
+        enabled: Names of the enabled tools, or None for the default tools.
+
+    Returns:
+        The enabled tools, followed by required tools that are not enabled.
+    """
+    if enabled is None:
+        names = DEFAULT_TOOLS
+    else:
+        names = [*enabled, *(n for n in REQUIRED_TOOLS if n not in enabled)]
+    return [load_tool(name) for name in names if name in TOOL_REGISTRY]
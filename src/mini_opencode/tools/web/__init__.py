@@ -1,5 +1,13 @@
 from .bocha_web_search import bocha_websearch_tool
+from .meta_search import meta_web_search_tool
 from .web_fetch import web_fetch_tool
+from .web_fetch_batch import web_fetch_batch_tool
 from .web_search import web_search_tool
 
-__all__ = ["web_fetch_tool", "web_search_tool", "bocha_websearch_tool"]
+__all__ = [
+    "web_fetch_tool",
+    "web_fetch_batch_tool",
+    "web_search_tool",
+    "bocha_websearch_tool",
+    "meta_web_search_tool",
+]
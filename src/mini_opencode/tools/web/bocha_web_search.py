@@ -1,11 +1,30 @@
-import requests
-from langchain.tools import tool
+import httpx
+from langchain_core.tools import StructuredTool
 
-from mini_opencode.config import get_config_section
+from mini_opencode.tools.rate_limit import (
+    acall_with_retry,
+    call_with_retry,
+    raise_for_retryable_status,
+)
 
+from .cache import acached_call, cached_call
+from .clients import (
+    get_async_http_client,
+    get_http_client,
+    get_request_timeout,
+    get_tool_settings,
+    provider_limit,
+    provider_limit_sync,
+)
 
-@tool("bocha_web_search")
-def bocha_websearch_tool(query: str, count: int = 10) -> str:
+BOCHA_SEARCH_URL = "https://api.bochaai.com/v1/web-search"
+
+
+class BochaSearchError(Exception):
+    """The Bocha Web Search API request failed."""
+
+
+def bocha_websearch(query: str, count: int = 10) -> tuple[str, dict]:
     """
     Perform a web search using the Bocha Web Search API.
 
@@ -18,9 +37,93 @@ def bocha_websearch_tool(query: str, count: int = 10) -> str:
     Returns:
         Detailed search results including webpage title, URL, summary, site name, site icon, and last crawled date.
     """
+    try:
+        return cached_call(
+            "bocha_web_search",
+            {"query": query, "count": count},
+            lambda: _search(query, count),
+        )
+    except BochaSearchError as e:
+        # Failed requests are reported to the model, but never cached
+        return str(e), {"cached": False}
+
+
+async def abocha_websearch(query: str, count: int = 10) -> tuple[str, dict]:
+    """Search the web with Bocha without blocking the event loop."""
+    try:
+        return await acached_call(
+            "bocha_web_search",
+            {"query": query, "count": count},
+            lambda: _asearch(query, count),
+        )
+    except BochaSearchError as e:
+        return str(e), {"cached": False}
+
+
+bocha_websearch_tool = StructuredTool.from_function(
+    func=bocha_websearch,
+    coroutine=abocha_websearch,
+    name="bocha_web_search",
+    response_format="content_and_artifact",
+)
+
+
+def search_results(query: str, count: int = 10) -> list[dict]:
+    """Search with Bocha, returning results with a `title`, `url` and `content`."""
+    return _to_results(_search_webpages(query, count))
+
+
+async def asearch_results(query: str, count: int = 10) -> list[dict]:
+    """Like `search_results`, without blocking the event loop."""
+    return _to_results(await _asearch_webpages(query, count))
+
+
+def _search(query: str, count: int) -> str:
+    return _format_webpages(_search_webpages(query, count))
+
+
+async def _asearch(query: str, count: int) -> str:
+    return _format_webpages(await _asearch_webpages(query, count))
 
-    url = "https://api.bochaai.com/v1/web-search"
-    settings = get_config_section(["tools", "configs", "bocha_web_search"])
+
+def _search_webpages(query: str, count: int) -> list[dict]:
+    request = _build_request(query, count)
+
+    def send() -> httpx.Response:
+        with provider_limit_sync("bocha_web_search"):
+            response = get_http_client().post(**request)
+        raise_for_retryable_status(response)
+        return response
+
+    return _parse_webpages(call_with_retry("bocha_web_search", send))
+
+
+async def _asearch_webpages(query: str, count: int) -> list[dict]:
+    request = _build_request(query, count)
+
+    async def send() -> httpx.Response:
+        async with provider_limit("bocha_web_search"):
+            response = await get_async_http_client().post(**request)
+        raise_for_retryable_status(response)
+        return response
+
+    return _parse_webpages(await acall_with_retry("bocha_web_search", send))
+
+
+def _to_results(webpages: list[dict]) -> list[dict]:
+    return [
+        {
+            "title": page.get("name") or "",
+            "url": page["url"],
+            "content": page.get("summary") or page.get("snippet") or "",
+        }
+        for page in webpages
+        if page.get("url")
+    ]
+
+
+def _build_request(query: str, count: int) -> dict:
+    settings = get_tool_settings("bocha_web_search")
     api_key = settings.get("api_key")
     if not api_key:
         raise ValueError(
@@ -37,34 +140,55 @@ def bocha_websearch_tool(query: str, count: int = 10) -> str:
         "count": count,
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    return {
+        "url": settings.get("base_url", BOCHA_SEARCH_URL),
+        "headers": headers,
+        "json": data,
+        "timeout": get_request_timeout(settings),
+    }
+
 
-    if response.status_code == 200:
+def _parse_webpages(response: httpx.Response) -> list[dict]:
+    if response.status_code != 200:
+        raise BochaSearchError(
+            f"Search API request failed, status code: {response.status_code}, error: {response.text}"
+        )
+    try:
         json_response = response.json()
-        try:
-            if json_response["code"] != 200 or not json_response["data"]:
-                return f"Search API request failed, reason: {json_response.get('msg', 'Unknown error')}"
-
-            webpages = json_response["data"]["webPages"]["value"]
-            if not webpages:
-                return "No relevant results found."
-
-            formatted_results = ""
-            for idx, page in enumerate(webpages, start=1):
-                formatted_results += (
-                    f"Reference: {idx}\n"
-                    f"Title: {page['name']}\n"
-                    f"URL: {page['url']}\n"
-                    f"Summary: {page['summary']}\n"
-                    f"Site Name: {page['siteName']}\n"
-                    f"Site Icon: {page['siteIcon']}\n"
-                    f"Last Crawled: {page['dateLastCrawled']}\n\n"
-                )
-            return formatted_results.strip()
-        except Exception as e:
-            return f"Search API request failed, reason: result parsing error - {str(e)}"
-    else:
-        return f"Search API request failed, status code: {response.status_code}, error: {response.text}"
+        if json_response["code"] != 200 or not json_response["data"]:
+            raise BochaSearchError(
+                f"Search API request failed, reason: {json_response.get('msg', 'Unknown error')}"
+            )
+        return json_response["data"]["webPages"]["value"] or []
+    except BochaSearchError:
+        raise
+    except Exception as e:
+        raise BochaSearchError(
+            f"Search API request failed, reason: result parsing error - {str(e)}"
+        ) from e
+
+
+def _format_webpages(webpages: list[dict]) -> str:
+    if not webpages:
+        return "No relevant results found."
+
+    try:
+        formatted_results = ""
+        for idx, page in enumerate(webpages, start=1):
+            formatted_results += (
+                f"Reference: {idx}\n"
+                f"Title: {page['name']}\n"
+                f"URL: {page['url']}\n"
+                f"Summary: {page['summary']}\n"
+                f"Site Name: {page['siteName']}\n"
+                f"Site Icon: {page['siteIcon']}\n"
+                f"Last Crawled: {page['dateLastCrawled']}\n\n"
+            )
+        return formatted_results.strip()
+    except Exception as e:
+        raise BochaSearchError(
+            f"Search API request failed, reason: result parsing error - {str(e)}"
+        ) from e
 
 
 if __name__ == "__main__":
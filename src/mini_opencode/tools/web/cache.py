@@ -0,0 +1,347 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+from mini_opencode.config import get_config_section
+
+DEFAULT_CACHE_PATH = Path.home() / ".mini-opencode" / "web_cache.sqlite3"
+# Seconds a cached response is fresh, by tool
+DEFAULT_TTLS = {
+    "web_search": 3600,
+    "bocha_web_search": 3600,
+    "web_fetch": 86400,
+}
+DEFAULT_MAX_SIZE_MB = 64
+
+
+class WebCache:
+    """
+    On-disk cache of web tool responses.
+
+    Responses are keyed by the tool name and its normalized arguments, expire
+    after the TTL of their tool, and the least recently used ones are evicted
+    once the cache outgrows its size limit. Identical calls running at the
+    same time share a single request.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        tool TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed);
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path | None = None,
+        ttls: dict[str, float] | None = None,
+        max_size: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+    ):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            db_path: Path to the SQLite database file. Defaults to
+                `~/.mini-opencode/web_cache.sqlite3`.
+            ttls: Seconds a response is fresh, by tool. Tools without a TTL
+                are not cached.
+            max_size: Maximum total size of the cached responses in bytes.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_CACHE_PATH
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: dict[str, Future] = {}
+        self._async_inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def get(self, tool: str, arguments: dict[str, Any]) -> str | None:
+        """
+        Get the fresh cached response of a call.
+
+        Returns:
+            The response, or None if it is not cached or has expired.
+        """
+        ttl = self.ttls.get(tool)
+        if not ttl:
+            return None
+        key = make_key(tool, arguments)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return value
+
+    def put(self, tool: str, arguments: dict[str, Any], value: str) -> None:
+        """Store the response of a call, evicting old responses if needed."""
+        if not self.ttls.get(tool):
+            return
+        key = make_key(tool, arguments)
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, tool, value, size, created, accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, tool, value, size, now, now),
+            )
+            # Keep the most recently used responses that fit in the limit
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS total
+                        FROM responses
+                    ) WHERE total > ?
+                )
+                """,
+                (self.max_size,),
+            )
+
+    def call(
+        self, tool: str, arguments: dict[str, Any], fn: Callable[[], str]
+    ) -> tuple[str, bool]:
+        """
+        Get the response of a call from the cache, or make the call.
+
+        Only calls that return are cached, calls that raise are retried the
+        next time. A call made while an identical one is in flight waits for
+        its response instead.
+
+        Args:
+            tool: The name of the tool.
+            arguments: The arguments of the call.
+            fn: Makes the call.
+
+        Returns:
+            The response, and whether it was not fetched by this call.
+        """
+        value = self.get(tool, arguments)
+        if value is not None:
+            self.hits += 1
+            return value, True
+
+        key = make_key(tool, arguments)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.coalesced += 1
+            return future.result(), True
+
+        self.misses += 1
+        try:
+            value = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        try:
+            self.put(tool, arguments, value)
+        except sqlite3.Error:
+            # A cache that cannot be written must not fail the call
+            pass
+        return value, False
+
+    async def acall(
+        self,
+        tool: str,
+        arguments: dict[str, Any],
+        fn: Callable[[], Awaitable[str]],
+    ) -> tuple[str, bool]:
+        """Like `call`, for async calls. The database is read and written in a
+        worker thread, so the event loop is never blocked by file IO.
+        """
+        value = await asyncio.to_thread(self.get, tool, arguments)
+        if value is not None:
+            self.hits += 1
+            return value, True
+
+        loop = asyncio.get_running_loop()
+        key = (id(loop), make_key(tool, arguments))
+        future = self._async_inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shielded, so that a cancelled follower does not cancel the leader
+            return await asyncio.shield(future), True
+
+        future = self._async_inflight[key] = loop.create_future()
+        self.misses += 1
+        try:
+            value = await fn()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, the leader raises it itself
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._async_inflight[key]
+        try:
+            await asyncio.to_thread(self.put, tool, arguments, value)
+        except sqlite3.Error:
+            pass
+        return value, False
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+
+def normalize_arguments(arguments: dict[str, Any]) -> dict[str, Any]:
+    """Normalize call arguments, so that equivalent calls share a cache key.
+
+    Whitespace in strings is collapsed, and URLs lose their fragment and get
+    a lowercase scheme and host.
+    """
+    normalized = {}
+    for name, value in arguments.items():
+        if isinstance(value, str):
+            value = " ".join(value.split())
+            if name == "url":
+                value = _normalize_url(value)
+        normalized[name] = value
+    return normalized
+
+
+def make_key(tool: str, arguments: dict[str, Any]) -> str:
+    """Make the cache key of a call."""
+    return json.dumps(
+        [tool, normalize_arguments(arguments)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, "")
+    )
+
+
+_web_cache: WebCache | None = None
+_web_cache_lock = threading.Lock()
+
+
+def get_web_cache() -> WebCache | None:
+    """
+    Get the shared web cache configured by the `tools.web_cache` section.
+
+    Returns:
+        The cache, or None if `tools.web_cache.enabled` is false.
+    """
+    global _web_cache
+
+    settings = get_config_section(["tools", "web_cache"]) or {}
+    if settings.get("enabled") is False:
+        return None
+    if _web_cache is not None:
+        return _web_cache
+    with _web_cache_lock:
+        if _web_cache is None:
+            _web_cache = WebCache(
+                db_path=Path(settings["path"]).expanduser()
+                if settings.get("path")
+                else None,
+                ttls=settings.get("ttl"),
+                max_size=int(
+                    float(settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB))
+                    * 1024
+                    * 1024
+                ),
+            )
+    return _web_cache
+
+
+def cached_call(
+    tool: str, arguments: dict[str, Any], fn: Callable[[], str]
+) -> tuple[str, dict[str, Any]]:
+    """
+    Make a web tool call through the shared web cache.
+
+    Returns:
+        The response and the tool artifact, which tells the UI whether the
+        response came from the cache.
+    """
+    try:
+        cache = get_web_cache()
+    except (OSError, sqlite3.Error):
+        cache = None
+    if cache is None:
+        return fn(), {"cached": False}
+    try:
+        value, cached = cache.call(tool, arguments, fn)
+    except sqlite3.Error:
+        return fn(), {"cached": False}
+    return value, {"cached": cached}
+
+
+async def acached_call(
+    tool: str, arguments: dict[str, Any], fn: Callable[[], Awaitable[str]]
+) -> tuple[str, dict[str, Any]]:
+    """Like `cached_call`, for async web tool calls."""
+    try:
+        cache = get_web_cache()
+    except (OSError, sqlite3.Error):
+        cache = None
+    if cache is None:
+        return await fn(), {"cached": False}
+    try:
+        value, cached = await cache.acall(tool, arguments, fn)
+    except sqlite3.Error:
+        return await fn(), {"cached": False}
+    return value, {"cached": cached}
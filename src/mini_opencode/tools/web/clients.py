@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+import httpx
+from httpx._client import UseClientDefault
+
+from mini_opencode.config import get_config_section, get_config_version
+from mini_opencode.tools.rate_limit import get_rate_limiter
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+# Seconds an idle connection is kept open for reuse
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+# Maximum number of calls made to a provider at the same time
+DEFAULT_MAX_CONCURRENCY = 8
+# Characters of an error response shown to the model
+MAX_ERROR_BODY_CHARS = 1000
+
+_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_http_client_version = -1
+_tool_settings: dict[str, dict[str, Any]] = {}
+_tool_settings_version = -1
+# Async clients are bound to the event loop they were created in
+_async_http_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, tuple[int, httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+_async_limits: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, tuple[int, asyncio.Semaphore]]
+] = weakref.WeakKeyDictionary()
+_sync_limits: dict[str, tuple[int, threading.BoundedSemaphore]] = {}
+
+
+def get_tool_settings(tool: str) -> dict[str, Any]:
+    """
+    Get the `tools.configs.<tool>` section, read once per configuration load.
+
+    Returns:
+        The settings, or an empty dict if the section is not configured.
+    """
+    global _tool_settings, _tool_settings_version
+
+    version = get_config_version()
+    if version != _tool_settings_version:
+        _tool_settings = {}
+        _tool_settings_version = version
+    settings = _tool_settings.get(tool)
+    if settings is None:
+        settings = get_config_section(["tools", "configs", tool]) or {}
+        _tool_settings[tool] = settings
+    return settings
+
+
+def get_timeout(settings: dict[str, Any]) -> httpx.Timeout:
+    """Get the timeout of the shared clients from the `tools.http` settings."""
+    return httpx.Timeout(
+        float(settings.get("timeout", DEFAULT_TIMEOUT)),
+        connect=float(settings.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+    )
+
+
+def get_request_timeout(
+    settings: dict[str, Any],
+) -> httpx.Timeout | UseClientDefault:
+    """
+    Get the request timeout of a tool from its settings.
+
+    Returns:
+        The timeout set by the tool section, with the values it leaves out
+        taken from `tools.http`, or `httpx.USE_CLIENT_DEFAULT` to keep the
+        timeout of the shared client when the section sets none.
+    """
+    if "timeout" not in settings and "connect_timeout" not in settings:
+        return httpx.USE_CLIENT_DEFAULT
+    http_settings = get_config_section(["tools", "http"]) or {}
+    return get_timeout({**http_settings, **settings})
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the HTTP client shared by the web tools.
+
+    The client is created on first use and keeps connections alive between
+    calls, so that repeated calls to a provider skip DNS, TCP and TLS setup.
+    It is configured by the `tools.http` section and recreated when the
+    configuration is reloaded.
+    """
+    global _http_client, _http_client_version
+
+    version = get_config_version()
+    if _http_client is not None and _http_client_version == version:
+        return _http_client
+    with _lock:
+        if _http_client is None or _http_client_version != version:
+            settings = get_config_section(["tools", "http"]) or {}
+            client = httpx.Client(
+                limits=_get_limits(settings),
+                timeout=get_timeout(settings),
+                headers={"User-Agent": "mini-opencode"},
+            )
+            # The old client is left to the garbage collector, as calls in
+            # flight may still be using it
+            _http_client = client
+            _http_client_version = version
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the async HTTP client shared by the web tools on the running loop.
+
+    Like `get_http_client`, but for the async tools, so that concurrent calls
+    share the event loop instead of a thread each.
+    """
+    loop = asyncio.get_running_loop()
+    version = get_config_version()
+    entry = _async_http_clients.get(loop)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    settings = get_config_section(["tools", "http"]) or {}
+    client = httpx.AsyncClient(
+        limits=_get_limits(settings),
+        timeout=get_timeout(settings),
+        headers={"User-Agent": "mini-opencode"},
+    )
+    # Like in `get_http_client`, the old client is not closed
+    _async_http_clients[loop] = (version, client)
+    return client
+
+
+@asynccontextmanager
+async def provider_limit(tool: str):
+    """
+    Limit the number of concurrent async calls to the provider of a tool.
+
+    The limit is set by `tools.configs.<tool>.max_concurrency`. The wait for
+    a free slot is recorded as the slot wait of the `<tool>` provider.
+    """
+    version = get_config_version()
+    limits = _async_limits.setdefault(asyncio.get_running_loop(), {})
+    entry = limits.get(tool)
+    if entry is None or entry[0] != version:
+        entry = limits[tool] = (version, asyncio.Semaphore(_get_concurrency(tool)))
+    start = time.monotonic()
+    async with entry[1]:
+        get_rate_limiter(tool).record_slot_wait(time.monotonic() - start)
+        yield
+
+
+@contextmanager
+def provider_limit_sync(tool: str):
+    """Like `provider_limit`, for calls made from worker threads."""
+    version = get_config_version()
+    with _lock:
+        entry = _sync_limits.get(tool)
+        if entry is None or entry[0] != version:
+            entry = _sync_limits[tool] = (
+                version,
+                threading.BoundedSemaphore(_get_concurrency(tool)),
+            )
+    start = time.monotonic()
+    with entry[1]:
+        get_rate_limiter(tool).record_slot_wait(time.monotonic() - start)
+        yield
+
+
+def read_capped(response: httpx.Response, limit: int) -> bytes:
+    """
+    Read a streamed response body, giving up once it outgrows a limit.
+
+    Raises:
+        ValueError: If the body is larger than `limit` bytes.
+    """
+    body = bytearray()
+    for chunk in response.iter_bytes():
+        body += chunk
+        _check_size(response, len(body), limit)
+    return bytes(body)
+
+
+async def aread_capped(response: httpx.Response, limit: int) -> bytes:
+    """Like `read_capped`, for responses of the async client."""
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        _check_size(response, len(body), limit)
+    return bytes(body)
+
+
+def describe_http_error(error: httpx.HTTPError) -> str:
+    """Describe a failed request for the model, with the body of an error response."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return f"Request failed ({type(error).__name__}): {error}"
+    response = error.response
+    try:
+        # Streamed responses are closed unread
+        body = response.text[:MAX_ERROR_BODY_CHARS]
+    except httpx.ResponseNotRead:
+        body = ""
+    message = f"Request failed, status code: {response.status_code}"
+    return f"{message}, error: {body}" if body else message
+
+
+def close_http_clients() -> None:
+    """Close the shared HTTP client and its pooled connections.
+
+    Async clients are closed by `aclose_http_clients`.
+    """
+    global _http_client
+
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+async def aclose_http_clients() -> None:
+    """Close the shared HTTP clients, including the one of the running loop."""
+    close_http_clients()
+    entry = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
+def _check_size(response: httpx.Response, size: int, limit: int) -> None:
+    if size > limit:
+        raise ValueError(
+            f"The response of {response.request.url} is larger than "
+            f"{limit / 1024 / 1024:g} MB."
+        )
+
+
+def _get_concurrency(tool: str) -> int:
+    return max(
+        1, int(get_tool_settings(tool).get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+    )
+
+
+def _get_limits(settings: dict[str, Any]) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(settings.get("max_connections", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(
+            settings.get("max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)
+        ),
+        keepalive_expiry=float(
+            settings.get("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY)
+        ),
+    )
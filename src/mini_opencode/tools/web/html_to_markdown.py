@@ -0,0 +1,243 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Size of the pieces fed to the parser, so a page is never held twice in full
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_CHARS = 200_000
+
+# Elements whose content is never part of the main content
+SKIPPED_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "canvas",
+    "iframe",
+    "form",
+    "button",
+    "select",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+}
+# Elements that hold the main content of a page, when present
+MAIN_TAGS = {"main", "article"}
+BLOCK_TAGS = {
+    "p",
+    "div",
+    "section",
+    "blockquote",
+    "table",
+    "tr",
+    "ul",
+    "ol",
+    "dl",
+    "dt",
+    "dd",
+    "figure",
+    "figcaption",
+    "details",
+    "summary",
+    *MAIN_TAGS,
+}
+HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
+# Elements that never have an end tag
+VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+class MarkdownExtractor(HTMLParser):
+    """
+    Incremental HTML to markdown converter that keeps the main content.
+
+    Feed it the page piece by piece. Navigation, scripts and other page
+    furniture are dropped, and if the page has `<main>` or `<article>`
+    elements only their content is kept. The output stops growing once it
+    reaches `max_chars`, so memory stays bounded whatever the page size.
+    """
+
+    def __init__(self, base_url: str = "", max_chars: int = DEFAULT_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.max_chars = max_chars
+        self.title = ""
+        # Markdown of the whole page and of its main elements only
+        self._all: list[str] = []
+        self._main: list[str] = []
+        self._sizes = [0, 0]
+        # Skipped element being read, and how many of them are open, as
+        # unclosed elements inside it must not end the skip
+        self._skip_tag: str | None = None
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._in_title = False
+        self._pre_depth = 0
+        self._list_stack: list[str] = []
+        self._links: list[str | None] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in VOID_TAGS:
+            self._handle_void(tag, dict(attrs))
+            return
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS:
+            self._skip_tag = tag
+            self._skip_depth = 1
+            return
+        if tag == "title":
+            self._in_title = True
+        elif tag in MAIN_TAGS:
+            self._main_depth += 1
+            self._emit("\n\n")
+        elif tag in HEADING_LEVELS:
+            self._emit("\n\n" + "#" * HEADING_LEVELS[tag] + " ")
+        elif tag == "pre":
+            self._pre_depth += 1
+            self._emit("\n\n```\n")
+        elif tag == "code" and not self._pre_depth:
+            self._emit("`")
+        elif tag in ("ul", "ol"):
+            self._list_stack.append(tag)
+            self._emit("\n")
+        elif tag == "li":
+            indent = "  " * max(0, len(self._list_stack) - 1)
+            marker = "1." if self._list_stack[-1:] == ["ol"] else "-"
+            self._emit(f"\n{indent}{marker} ")
+        elif tag in ("strong", "b"):
+            self._emit("**")
+        elif tag in ("em", "i"):
+            self._emit("*")
+        elif tag == "a":
+            self._links.append(dict(attrs).get("href"))
+            self._emit("[")
+        elif tag in ("td", "th"):
+            self._emit(" | ")
+        elif tag in BLOCK_TAGS:
+            self._emit("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in VOID_TAGS:
+            return
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+            return
+        if tag == "title":
+            self._in_title = False
+        elif tag in MAIN_TAGS:
+            self._emit("\n\n")
+            self._main_depth = max(0, self._main_depth - 1)
+        elif tag in HEADING_LEVELS:
+            self._emit("\n\n")
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+            self._emit("\n```\n\n")
+        elif tag == "code" and not self._pre_depth:
+            self._emit("`")
+        elif tag in ("ul", "ol"):
+            if self._list_stack:
+                self._list_stack.pop()
+            self._emit("\n\n")
+        elif tag in ("strong", "b"):
+            self._emit("**")
+        elif tag in ("em", "i"):
+            self._emit("*")
+        elif tag == "a":
+            href = self._links.pop() if self._links else None
+            self._emit(f"]({self._resolve(href)})" if href else "]")
+        elif tag in BLOCK_TAGS:
+            self._emit("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_tag is not None:
+            return
+        if self._in_title:
+            self.title += data.strip()
+            return
+        if not self._pre_depth:
+            data = re.sub(r"\s+", " ", data)
+        self._emit(data)
+
+    def get_markdown(self) -> str:
+        """Get the markdown of the main content, or of the page if it has none."""
+        self.close()
+        markdown = "".join(self._main if self._sizes[1] else self._all)
+        markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+        markdown = re.sub(r"\n{3,}", "\n\n", markdown).strip()
+        if self.title and not markdown.startswith("# "):
+            markdown = f"# {self.title}\n\n{markdown}"
+        return markdown
+
+    def _handle_void(self, tag: str, attrs: dict[str, str | None]) -> None:
+        if self._skip_tag is not None:
+            return
+        if tag == "br":
+            self._emit("\n")
+        elif tag == "hr":
+            self._emit("\n\n---\n\n")
+        elif tag == "img" and attrs.get("src"):
+            self._emit(f"![{attrs.get('alt') or ''}]({self._resolve(attrs['src'])})")
+
+    def _emit(self, text: str) -> None:
+        targets = [(self._all, 0)]
+        if self._main_depth:
+            targets.append((self._main, 1))
+        for parts, index in targets:
+            room = self.max_chars - self._sizes[index]
+            if room <= 0:
+                continue
+            parts.append(text[:room])
+            self._sizes[index] += min(len(text), room)
+
+    def _resolve(self, href: str) -> str:
+        return urljoin(self.base_url, href) if self.base_url else href
+
+
+def html_to_markdown(
+    html: bytes,
+    encoding: str = "utf-8",
+    base_url: str = "",
+    max_chars: int = DEFAULT_MAX_CHARS,
+) -> str:
+    """
+    Convert an HTML page to markdown, keeping its main content.
+
+    It is a plain function of bytes, so it can run in a worker process.
+
+    Args:
+        html: The page.
+        encoding: The encoding of the page.
+        base_url: URL that relative links are resolved against.
+        max_chars: Maximum number of characters of the markdown.
+
+    Returns:
+        The markdown.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    extractor = MarkdownExtractor(base_url=base_url, max_chars=max_chars)
+    for start in range(0, len(html), CHUNK_SIZE):
+        extractor.feed(decoder.decode(html[start : start + CHUNK_SIZE]))
+    extractor.feed(decoder.decode(b"", final=True))
+    return extractor.get_markdown()
@@ -0,0 +1,163 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+
+import httpx
+
+from mini_opencode.tools.rate_limit import acall_with_retry, call_with_retry
+
+from .clients import (
+    aread_capped,
+    get_async_http_client,
+    get_http_client,
+    get_request_timeout,
+    get_tool_settings,
+    provider_limit,
+    provider_limit_sync,
+    read_capped,
+)
+from .html_to_markdown import DEFAULT_MAX_CHARS, html_to_markdown
+from .web_fetch import get_size_limit
+
+DEFAULT_EXTRACT_WORKERS = 2
+# Content types returned as they are, without extraction
+TEXT_CONTENT_TYPES = (
+    "text/plain",
+    "text/markdown",
+    "text/x-markdown",
+    "application/json",
+)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def fetch_local(url: str) -> str:
+    """
+    Download a page and extract its main content to markdown locally.
+
+    The extraction runs in a worker process, so a large page never holds
+    the GIL of the app.
+    """
+    timeout = get_request_timeout(get_tool_settings("web_fetch"))
+
+    def send() -> tuple[httpx.Response, bytes]:
+        with provider_limit_sync("web_fetch"):
+            with get_http_client().stream(
+                "GET", url, follow_redirects=True, timeout=timeout
+            ) as response:
+                response.raise_for_status()
+                return response, read_capped(response, get_size_limit())
+
+    response, body = call_with_retry(f"web:{_get_host(url)}", send)
+    text = _decode_text(response, body)
+    if text is not None:
+        return text
+    args = _extract_args(response, body)
+    executor = _get_executor()
+    try:
+        return executor.submit(html_to_markdown, *args).result()
+    except BrokenProcessPool:
+        # A worker died, such as killed for its memory, start new ones
+        _drop_executor(executor)
+        return _get_executor().submit(html_to_markdown, *args).result()
+
+
+async def afetch_local(url: str) -> str:
+    """Like `fetch_local`, without blocking the event loop."""
+    timeout = get_request_timeout(get_tool_settings("web_fetch"))
+
+    async def send() -> tuple[httpx.Response, bytes]:
+        async with provider_limit("web_fetch"):
+            async with get_async_http_client().stream(
+                "GET", url, follow_redirects=True, timeout=timeout
+            ) as response:
+                response.raise_for_status()
+                return response, await aread_capped(response, get_size_limit())
+
+    response, body = await acall_with_retry(f"web:{_get_host(url)}", send)
+    text = _decode_text(response, body)
+    if text is not None:
+        return text
+    args = _extract_args(response, body)
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        return await loop.run_in_executor(executor, html_to_markdown, *args)
+    except BrokenProcessPool:
+        # Like in `fetch_local`, retry once in new workers
+        _drop_executor(executor)
+        return await loop.run_in_executor(_get_executor(), html_to_markdown, *args)
+
+
+def shutdown_extractors() -> None:
+    """Stop the worker processes of the extraction."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _decode_text(response: httpx.Response, body: bytes) -> str | None:
+    """Decode a plain text page.
+
+    Returns:
+        The text, or None if the page is HTML and has to be extracted.
+
+    Raises:
+        ValueError: If the page is neither text nor HTML.
+    """
+    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+    if content_type.startswith(TEXT_CONTENT_TYPES):
+        return body.decode(response.encoding or "utf-8", errors="replace")
+    if not content_type or content_type.startswith(HTML_CONTENT_TYPES):
+        return None
+    raise ValueError(
+        f"The page at {response.url} has an unsupported content type: {content_type}."
+    )
+
+
+def _extract_args(response: httpx.Response, body: bytes) -> tuple:
+    settings = get_tool_settings("web_fetch")
+    return (
+        body,
+        response.encoding or "utf-8",
+        str(response.url),
+        int(settings.get("max_chars", DEFAULT_MAX_CHARS)),
+    )
+
+
+def _get_host(url: str) -> str:
+    return urlsplit(url).netloc.lower() or url
+
+
+def _drop_executor(executor: ProcessPoolExecutor) -> None:
+    """Forget a broken executor, unless another call already replaced it."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            settings = get_tool_settings("web_fetch")
+            # Spawned workers, as forking the threads of the app is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=int(
+                    settings.get("extract_workers", DEFAULT_EXTRACT_WORKERS)
+                ),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _executor
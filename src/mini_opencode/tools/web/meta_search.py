@@ -0,0 +1,237 @@
+import asyncio
+import concurrent.futures
+import json
+from collections.abc import Awaitable, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.tools import StructuredTool
+
+from . import bocha_web_search, web_search
+from .clients import get_tool_settings
+
+# Provider tool name -> (sync search, async search), both taking the query
+# and the number of results
+PROVIDERS: dict[
+    str,
+    tuple[
+        Callable[[str, int], list[dict]], Callable[[str, int], Awaitable[list[dict]]]
+    ],
+] = {
+    "web_search": (web_search.search_results, web_search.asearch_results),
+    "bocha_web_search": (
+        bocha_web_search.search_results,
+        bocha_web_search.asearch_results,
+    ),
+}
+
+# Number of providers to wait for before answering
+DEFAULT_QUORUM = 1
+# Seconds to wait for the quorum, and then for slower providers
+DEFAULT_DEADLINE = 10.0
+DEFAULT_GRACE_PERIOD = 1.0
+# Rank constant of reciprocal rank fusion, higher values flatten the ranks
+RRF_K = 60
+# Query parameters that only track the visit and never change the page
+TRACKING_PARAMETERS = {"fbclid", "gclid", "ref", "spm"}
+
+
+def meta_web_search(query: str, max_results: int = 8) -> str:
+    """
+    Search the web with every configured search provider at once and merge their results.
+
+    Results found by several providers are ranked higher and listed once.
+
+    Args:
+        query: The search query to execute.
+        max_results: The maximum number of merged results to return. Defaults to 8.
+
+    Returns:
+        A JSON string with the merged results, each with a title, url, content and the providers that found it.
+    """
+    providers = _get_providers()
+    settings = get_tool_settings("meta_web_search")
+    quorum, deadline, grace = _get_timing(settings, len(providers))
+    answers: dict[str, list[dict] | str] = {}
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(providers) or 1)
+    futures = {
+        executor.submit(PROVIDERS[name][0], query, max_results): name
+        for name in providers
+    }
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=deadline):
+            answers[futures[future]] = _get_answer(future)
+            if _count_successes(answers) >= quorum:
+                break
+        # Give the other providers a moment to answer with the quorum
+        done, _ = concurrent.futures.wait(
+            [f for f in futures if futures[f] not in answers], timeout=grace
+        )
+        for future in done:
+            answers[futures[future]] = _get_answer(future)
+    except TimeoutError:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return _format_answers(query, providers, answers, max_results)
+
+
+async def ameta_web_search(query: str, max_results: int = 8) -> str:
+    """Search with every configured provider without blocking the event loop."""
+    providers = _get_providers()
+    settings = get_tool_settings("meta_web_search")
+    quorum, deadline, grace = _get_timing(settings, len(providers))
+    answers: dict[str, list[dict] | str] = {}
+    tasks = {
+        asyncio.ensure_future(PROVIDERS[name][1](query, max_results)): name
+        for name in providers
+    }
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending and _count_successes(answers) < quorum:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, stop_at - loop.time()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                answers[tasks[task]] = _get_answer(task)
+        if pending and _count_successes(answers) >= quorum:
+            # Give the other providers a moment to answer with the quorum
+            done, pending = await asyncio.wait(pending, timeout=grace)
+            for task in done:
+                answers[tasks[task]] = _get_answer(task)
+    finally:
+        for task in pending:
+            task.cancel()
+    return _format_answers(query, providers, answers, max_results)
+
+
+meta_web_search_tool = StructuredTool.from_function(
+    func=meta_web_search,
+    coroutine=ameta_web_search,
+    name="meta_web_search",
+    parse_docstring=True,
+)
+
+
+def merge_results(
+    results_by_provider: dict[str, list[dict]], max_results: int
+) -> list[dict]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+
+    Results are deduplicated by canonical URL. A result keeps the first
+    non-empty title and the longest content found by any provider.
+
+    Args:
+        results_by_provider: Results of each provider, best first.
+        max_results: The maximum number of merged results.
+
+    Returns:
+        The merged results, best first.
+    """
+    merged: dict[str, dict] = {}
+    scores: dict[str, float] = {}
+    for provider, results in results_by_provider.items():
+        seen = set()
+        for rank, result in enumerate(results, start=1):
+            key = canonicalize_url(result["url"])
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = merged.setdefault(
+                key,
+                {"title": "", "url": result["url"], "content": "", "providers": []},
+            )
+            entry["title"] = entry["title"] or result.get("title") or ""
+            if len(result.get("content") or "") > len(entry["content"]):
+                entry["content"] = result["content"]
+            entry["providers"].append(provider)
+            scores[key] = scores.get(key, 0.0) + 1 / (RRF_K + rank)
+    ranked = sorted(merged, key=lambda key: scores[key], reverse=True)
+    return [merged[key] for key in ranked[:max_results]]
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize a URL to detect results that point to the same page.
+
+    The scheme, `www.` prefix, fragment, trailing slash and tracking query
+    parameters are ignored.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not name.startswith("utm_") and name not in TRACKING_PARAMETERS
+        )
+    )
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+def _get_providers() -> list[str]:
+    """Get the providers to query: those listed in the settings, or else every
+    provider with an API key."""
+    names = get_tool_settings("meta_web_search").get("providers")
+    if names is None:
+        names = [name for name in PROVIDERS if get_tool_settings(name).get("api_key")]
+    providers = [name for name in names if name in PROVIDERS]
+    if not providers:
+        raise ValueError(
+            "No search provider is configured. Set the `api_key` of `web_search` "
+            "or `bocha_web_search` in the `tools/configs` section."
+        )
+    return providers
+
+
+def _get_timing(settings: dict, provider_count: int) -> tuple[int, float, float]:
+    quorum = int(settings.get("quorum", DEFAULT_QUORUM))
+    return (
+        min(max(1, quorum), provider_count),
+        float(settings.get("deadline", DEFAULT_DEADLINE)),
+        float(settings.get("grace_period", DEFAULT_GRACE_PERIOD)),
+    )
+
+
+def _get_answer(future: concurrent.futures.Future | asyncio.Future) -> list[dict] | str:
+    """Get the results of a provider, or the reason it failed."""
+    try:
+        return future.result()
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+
+def _count_successes(answers: dict[str, list[dict] | str]) -> int:
+    return sum(isinstance(answer, list) for answer in answers.values())
+
+
+def _format_answers(
+    query: str,
+    providers: list[str],
+    answers: dict[str, list[dict] | str],
+    max_results: int,
+) -> str:
+    status = {}
+    for name in providers:
+        answer = answers.get(name)
+        if answer is None:
+            status[name] = "timed out"
+        elif isinstance(answer, str):
+            status[name] = f"failed: {answer}"
+        else:
+            status[name] = f"{len(answer)} results"
+    results = merge_results(
+        {name: answer for name, answer in answers.items() if isinstance(answer, list)},
+        max_results,
+    )
+    return json.dumps(
+        {"query": query, "providers": status, "results": results},
+        ensure_ascii=False,
+        indent=2,
+    )
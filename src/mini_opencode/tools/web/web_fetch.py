@@ -1,21 +1,177 @@
-from firecrawl import FirecrawlApp
-from langchain.tools import tool
+import json
 
-from mini_opencode.config import get_config_section
+import httpx
+from langchain_core.tools import StructuredTool
 
+from mini_opencode.tools.rate_limit import acall_with_retry, call_with_retry
 
-@tool("web_fetch", parse_docstring=True)
-def web_fetch_tool(url: str) -> str:
+from .cache import acached_call, cached_call
+from .clients import (
+    aread_capped,
+    describe_http_error,
+    get_async_http_client,
+    get_http_client,
+    get_request_timeout,
+    get_tool_settings,
+    provider_limit,
+    provider_limit_sync,
+    read_capped,
+)
+
+FIRECRAWL_SCRAPE_URL = "https://api.firecrawl.dev/v2/scrape"
+# Responses larger than this are abandoned while they are being downloaded
+DEFAULT_MAX_RESPONSE_MB = 10
+DEFAULT_BACKEND = "firecrawl"
+
+
+def web_fetch(
+    url: str, offset: int = 0, max_chars: int | None = None
+) -> tuple[str, dict]:
     """
     Fetch a website and return the markdown content.
 
     Args:
         url: The URL of the website to fetch.
+        offset: The character offset to start reading the content from. Use it to read the rest of a truncated page.
+        max_chars: The maximum number of characters to return. Defaults to the whole content.
 
     Returns:
         The markdown content of the website.
     """
-    settings = get_config_section(["tools", "configs", "web_fetch"])
+    try:
+        markdown, artifact = cached_call(
+            "web_fetch", cache_arguments(url), lambda: fetch_markdown(url)
+        )
+    except httpx.HTTPError as e:
+        # Failed requests are reported to the model, but never cached
+        return describe_http_error(e), {"cached": False}
+    return slice_page(url, markdown, offset, max_chars), artifact
+
+
+async def aweb_fetch(
+    url: str, offset: int = 0, max_chars: int | None = None
+) -> tuple[str, dict]:
+    """Fetch a website without blocking the event loop."""
+    try:
+        markdown, artifact = await acached_call(
+            "web_fetch", cache_arguments(url), lambda: afetch_markdown(url)
+        )
+    except httpx.HTTPError as e:
+        return describe_http_error(e), {"cached": False}
+    return slice_page(url, markdown, offset, max_chars), artifact
+
+
+web_fetch_tool = StructuredTool.from_function(
+    func=web_fetch,
+    coroutine=aweb_fetch,
+    name="web_fetch",
+    parse_docstring=True,
+    response_format="content_and_artifact",
+)
+
+
+def slice_page(
+    url: str, markdown: str, offset: int = 0, max_chars: int | None = None
+) -> str:
+    """
+    Get a part of the content of a page.
+
+    If the part ends before the content does, a note tells how to read on
+    with `web_fetch`.
+    """
+    if offset <= 0 and max_chars is None:
+        return markdown
+    offset = max(0, offset)
+    end = len(markdown) if max_chars is None else offset + max(0, max_chars)
+    excerpt = markdown[offset:end]
+    if end >= len(markdown):
+        return excerpt
+    return (
+        f"{excerpt}\n\n[Showing characters {offset}-{end} of {len(markdown)}. "
+        f'Call web_fetch with url="{url}" and offset={end} to read more.]'
+    )
+
+
+def cache_arguments(url: str) -> dict:
+    """Get the arguments a fetch is cached by, including the backend."""
+    return {"url": url, "backend": get_backend()}
+
+
+def get_backend() -> str:
+    """Get the fetch backend selected by `tools.configs.web_fetch.backend`.
+
+    `firecrawl` scrapes pages with the hosted Firecrawl API, `local`
+    downloads them and extracts their main content locally.
+    """
+    backend = get_tool_settings("web_fetch").get("backend", DEFAULT_BACKEND)
+    if backend not in ("firecrawl", "local"):
+        raise ValueError(
+            f"Unknown `backend` {backend!r} in the `tools/configs/web_fetch` section, "
+            "expected `firecrawl` or `local`."
+        )
+    return backend
+
+
+def get_size_limit() -> int:
+    """Get the maximum size of a response in bytes."""
+    settings = get_tool_settings("web_fetch")
+    return int(
+        float(settings.get("max_response_mb", DEFAULT_MAX_RESPONSE_MB)) * 1024 * 1024
+    )
+
+
+def fetch_markdown(url: str) -> str:
+    """
+    Fetch the markdown of a page with the configured backend, without the cache.
+
+    The response is streamed and abandoned as soon as it outgrows
+    `tools.configs.web_fetch.max_response_mb`.
+    """
+    if get_backend() == "local":
+        from .local_fetch import fetch_local
+
+        return fetch_local(url)
+
+    request = _build_request(url)
+
+    def send() -> bytes:
+        with provider_limit_sync("web_fetch"):
+            with get_http_client().stream("POST", **request) as response:
+                if response.is_error:
+                    # The body tells the model why, see `describe_http_error`
+                    response.read()
+                response.raise_for_status()
+                return read_capped(response, get_size_limit())
+
+    return _parse_body(call_with_retry("web_fetch", send))
+
+
+async def afetch_markdown(url: str) -> str:
+    """Like `fetch_markdown`, without blocking the event loop."""
+    if get_backend() == "local":
+        from .local_fetch import afetch_local
+
+        return await afetch_local(url)
+
+    request = _build_request(url)
+
+    async def send() -> bytes:
+        async with provider_limit("web_fetch"):
+            async with get_async_http_client().stream("POST", **request) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                return await aread_capped(response, get_size_limit())
+
+    return _parse_body(await acall_with_retry("web_fetch", send))
+
+
+def _parse_body(body: bytes) -> str:
+    return json.loads(body)["data"].get("markdown") or ""
+
+
+def _build_request(url: str) -> dict:
+    settings = get_tool_settings("web_fetch")
     if not settings:
         raise ValueError(
             "The `tools/configs/web_fetch` section in `config.yaml` is not found."
@@ -28,6 +184,9 @@ def web_fetch_tool(url: str) -> str:
             "The `api_key` is not specified in the `tools/configs/web_fetch` section."
         )
 
-    firecrawl = FirecrawlApp(api_key=api_key)
-    response = firecrawl.scrape(url=url, formats=["markdown"], only_main_content=True)
-    return response.markdown
+    return {
+        "url": settings.get("base_url", FIRECRAWL_SCRAPE_URL),
+        "headers": {"Authorization": f"Bearer {api_key}"},
+        "json": {"url": url, "formats": ["markdown"], "onlyMainContent": True},
+        "timeout": get_request_timeout(settings),
+    }
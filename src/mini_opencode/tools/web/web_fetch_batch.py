@@ -0,0 +1,99 @@
+import asyncio
+import concurrent.futures
+
+from langchain_core.tools import StructuredTool
+
+from .cache import acached_call, cached_call
+from .clients import get_tool_settings
+from .web_fetch import afetch_markdown, cache_arguments, fetch_markdown, slice_page
+
+# Maximum number of pages fetched at a time by one batch
+DEFAULT_BATCH_CONCURRENCY = 4
+# Maximum number of URLs in one batch
+MAX_BATCH_SIZE = 20
+
+
+def web_fetch_batch(urls: list[str], max_chars_per_url: int = 4000) -> str:
+    """
+    Fetch several websites at once and return an excerpt of the markdown content of each.
+
+    Prefer it over several `web_fetch` calls. Truncated pages end with a note telling how to read the rest with `web_fetch`.
+
+    Args:
+        urls: The URLs of the websites to fetch, at most 20.
+        max_chars_per_url: The maximum number of characters returned for each website. Defaults to 4000.
+
+    Returns:
+        The markdown excerpt of each website, or the reason it could not be fetched.
+    """
+    urls = _check_urls(urls)
+    with concurrent.futures.ThreadPoolExecutor(_get_concurrency()) as executor:
+        pages = list(executor.map(_fetch_page, urls))
+    return _format_pages(urls, pages, max_chars_per_url)
+
+
+async def aweb_fetch_batch(urls: list[str], max_chars_per_url: int = 4000) -> str:
+    """Fetch several websites at once without blocking the event loop."""
+    urls = _check_urls(urls)
+    semaphore = asyncio.Semaphore(_get_concurrency())
+
+    async def fetch_page(url: str) -> str | Exception:
+        async with semaphore:
+            try:
+                markdown, _ = await acached_call(
+                    "web_fetch", cache_arguments(url), lambda: afetch_markdown(url)
+                )
+                return markdown
+            except Exception as e:
+                return e
+
+    pages = await asyncio.gather(*(fetch_page(url) for url in urls))
+    return _format_pages(urls, pages, max_chars_per_url)
+
+
+web_fetch_batch_tool = StructuredTool.from_function(
+    func=web_fetch_batch,
+    coroutine=aweb_fetch_batch,
+    name="web_fetch_batch",
+    parse_docstring=True,
+)
+
+
+def _fetch_page(url: str) -> str | Exception:
+    try:
+        markdown, _ = cached_call(
+            "web_fetch", cache_arguments(url), lambda: fetch_markdown(url)
+        )
+        return markdown
+    except Exception as e:
+        return e
+
+
+def _check_urls(urls: list[str]) -> list[str]:
+    # Fetch each URL once, in the given order
+    urls = list(dict.fromkeys(url.strip() for url in urls if url.strip()))
+    if not urls:
+        raise ValueError("No URL to fetch.")
+    if len(urls) > MAX_BATCH_SIZE:
+        raise ValueError(
+            f"At most {MAX_BATCH_SIZE} URLs can be fetched at once, got {len(urls)}."
+        )
+    return urls
+
+
+def _get_concurrency() -> int:
+    settings = get_tool_settings("web_fetch")
+    return max(1, int(settings.get("batch_concurrency", DEFAULT_BATCH_CONCURRENCY)))
+
+
+def _format_pages(
+    urls: list[str], pages: list[str | Exception], max_chars_per_url: int
+) -> str:
+    sections = []
+    for index, (url, page) in enumerate(zip(urls, pages), start=1):
+        if isinstance(page, Exception):
+            body = f"Failed to fetch: {str(page) or type(page).__name__}"
+        else:
+            body = slice_page(url, page, 0, max_chars_per_url)
+        sections.append(f"## [{index}] {url}\n\n{body}")
+    return "\n\n".join(sections)
@@ -1,17 +1,25 @@
 import json
-import warnings
 
-from langchain.tools import tool
+import httpx
+from langchain_core.tools import StructuredTool
 
-from mini_opencode.config import get_config_section
+from mini_opencode.tools.rate_limit import acall_with_retry, call_with_retry
 
-# Suppress warnings from langchain_tavily regarding Pydantic field shadowing
-warnings.filterwarnings("ignore", category=UserWarning, module="langchain_tavily")
-from langchain_tavily import TavilySearch  # noqa: E402
+from .cache import acached_call, cached_call
+from .clients import (
+    describe_http_error,
+    get_async_http_client,
+    get_http_client,
+    get_request_timeout,
+    get_tool_settings,
+    provider_limit,
+    provider_limit_sync,
+)
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
-@tool("web_search", parse_docstring=True)
-def web_search_tool(query: str, max_results: int = 5) -> str:
+
+def web_search(query: str, max_results: int = 5) -> tuple[str, dict]:
     """
     Search the web for the given query using Tavily.
 
@@ -22,7 +30,95 @@ def web_search_tool(query: str, max_results: int = 5) -> str:
     Returns:
         A JSON string containing the search results, including titles, urls, and content.
     """
-    settings = get_config_section(["tools", "configs", "web_search"])
+    try:
+        return cached_call(
+            "web_search",
+            {"query": query, "max_results": max_results},
+            lambda: _search(query, max_results),
+        )
+    except httpx.HTTPError as e:
+        # Failed requests are reported to the model, but never cached
+        return describe_http_error(e), {"cached": False}
+
+
+async def aweb_search(query: str, max_results: int = 5) -> tuple[str, dict]:
+    """Search the web with Tavily without blocking the event loop."""
+    try:
+        return await acached_call(
+            "web_search",
+            {"query": query, "max_results": max_results},
+            lambda: _asearch(query, max_results),
+        )
+    except httpx.HTTPError as e:
+        return describe_http_error(e), {"cached": False}
+
+
+web_search_tool = StructuredTool.from_function(
+    func=web_search,
+    coroutine=aweb_search,
+    name="web_search",
+    parse_docstring=True,
+    response_format="content_and_artifact",
+)
+
+
+def search_results(query: str, max_results: int = 5) -> list[dict]:
+    """Search with Tavily, returning results with a `title`, `url` and `content`."""
+    return _to_results(_search_json(query, max_results))
+
+
+async def asearch_results(query: str, max_results: int = 5) -> list[dict]:
+    """Like `search_results`, without blocking the event loop."""
+    return _to_results(await _asearch_json(query, max_results))
+
+
+def _search(query: str, max_results: int) -> str:
+    return json.dumps(_search_json(query, max_results), ensure_ascii=False, indent=2)
+
+
+async def _asearch(query: str, max_results: int) -> str:
+    results = await _asearch_json(query, max_results)
+    return json.dumps(results, ensure_ascii=False, indent=2)
+
+
+def _search_json(query: str, max_results: int) -> dict:
+    request = _build_request(query, max_results)
+
+    def send() -> dict:
+        with provider_limit_sync("web_search"):
+            response = get_http_client().post(**request)
+        response.raise_for_status()
+        return response.json()
+
+    return call_with_retry("web_search", send)
+
+
+async def _asearch_json(query: str, max_results: int) -> dict:
+    request = _build_request(query, max_results)
+
+    async def send() -> dict:
+        async with provider_limit("web_search"):
+            response = await get_async_http_client().post(**request)
+        response.raise_for_status()
+        return response.json()
+
+    return await acall_with_retry("web_search", send)
+
+
+def _to_results(response: dict) -> list[dict]:
+    return [
+        {
+            "title": result.get("title") or "",
+            "url": result["url"],
+            "content": result.get("content") or "",
+        }
+        for result in response.get("results") or []
+        if result.get("url")
+    ]
+
+
+def _build_request(query: str, max_results: int) -> dict:
+    settings = get_tool_settings("web_search")
     if not settings:
         raise ValueError(
             "The `tools/configs/web_search` section in `config.yaml` is not found. "
@@ -35,14 +131,12 @@ def web_search_tool(query: str, max_results: int = 5) -> str:
             "The `tavily_api_key` is not specified in the `tools/configs/web_search` section."
         )
 
-    tool = TavilySearch(
-        tavily_api_key=api_key,
-        max_results=max_results,
-    )
-
-    # The tool returns a list of results, we convert it to JSON string for consistency
-    results = tool.invoke(query)
-    return json.dumps(results, ensure_ascii=False, indent=2)
+    return {
+        "url": settings.get("base_url", TAVILY_SEARCH_URL),
+        "headers": {"Authorization": f"Bearer {api_key}"},
+        "json": {"query": query, "max_results": max_results},
+        "timeout": get_request_timeout(settings),
+    }
 
 
 if __name__ == "__main__":
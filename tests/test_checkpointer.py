@@ -0,0 +1,79 @@
+import asyncio
+import operator
+from contextlib import AsyncExitStack
+from typing import Annotated, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from mini_opencode.agents import checkpointer
+from mini_opencode.agents.checkpointer import PruningMemorySaver, create_checkpointer
+
+
+class State(TypedDict):
+    items: Annotated[list[int], operator.add]
+
+
+def build_graph(saver):
+    graph = StateGraph(State)
+    graph.add_node("step", lambda state: {"items": [len(state["items"])]})
+    graph.add_edge(START, "step")
+    graph.add_edge("step", END)
+    return graph.compile(checkpointer=saver)
+
+
+def thread(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_memory_saver_keeps_the_last_checkpoints():
+    saver = PruningMemorySaver(keep_last=3)
+    graph = build_graph(saver)
+    for _ in range(5):
+        graph.invoke({"items": []}, thread("a"))
+
+    assert len(list(saver.list(thread("a")))) == 3
+    assert graph.get_state(thread("a")).values["items"] == [0, 1, 2, 3, 4]
+    # Each channel keeps only the versions the remaining checkpoints use
+    versions = [key for key in saver.blobs if key[0] == "a" and key[2] == "items"]
+    assert len(versions) == 3
+
+
+def test_memory_saver_prunes_threads_independently():
+    saver = PruningMemorySaver(keep_last=2)
+    graph = build_graph(saver)
+    graph.invoke({"items": []}, thread("a"))
+    for _ in range(4):
+        graph.invoke({"items": []}, thread("b"))
+
+    assert len(list(saver.list(thread("a")))) == 2
+    assert len(list(saver.list(thread("b")))) == 2
+    assert graph.get_state(thread("a")).values["items"] == [0]
+
+
+def test_memory_saver_delete_thread_drops_its_blobs():
+    saver = PruningMemorySaver(keep_last=2)
+    graph = build_graph(saver)
+    graph.invoke({"items": []}, thread("a"))
+    graph.invoke({"items": []}, thread("b"))
+    saver.delete_thread("a")
+
+    assert not [key for key in saver.blobs if key[0] == "a"]
+    assert [key for key in saver.blobs if key[0] == "b"]
+    assert not list(saver.list(thread("a")))
+
+
+def test_sqlite_checkpointer_keeps_the_last_checkpoints(tmp_path, monkeypatch):
+    settings = {"type": "sqlite", "path": str(tmp_path / "cp.sqlite3"), "keep_last": 2}
+    monkeypatch.setattr(checkpointer, "get_config_section", lambda key: settings)
+
+    async def run() -> tuple[int, list[int]]:
+        async with AsyncExitStack() as stack:
+            saver = await create_checkpointer(stack)
+            graph = build_graph(saver)
+            for _ in range(4):
+                await graph.ainvoke({"items": []}, thread("a"))
+            checkpoints = [c async for c in saver.alist(thread("a"))]
+            state = await graph.aget_state(thread("a"))
+            return len(checkpoints), state.values["items"]
+
+    assert asyncio.run(run()) == (2, [0, 1, 2, 3])
@@ -0,0 +1,103 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from mini_opencode.cli.history import COMPACT_EVERY, HistoryManager
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def contents(messages):
+    return [m.content for m in messages]
+
+
+def test_save_appends_only_new_messages(tmp_path):
+    manager = HistoryManager(tmp_path)
+    messages = [HumanMessage("hello"), AIMessage("hi")]
+    path = manager.save_session(messages, "s1")
+    manager.save_session([*messages, HumanMessage("again")], "s1")
+
+    types = [record["type"] for record in read_records(path)]
+    assert types == ["session", "message", "message", "commit", "message", "commit"]
+    assert contents(HistoryManager(tmp_path).load_session("s1")) == [
+        "hello",
+        "hi",
+        "again",
+    ]
+
+
+def test_rewritten_prefix_compacts_the_journal(tmp_path):
+    manager = HistoryManager(tmp_path)
+    manager.save_session([HumanMessage("a"), AIMessage("b")], "s1")
+    # The last saved message is unchanged, an earlier one is not
+    path = manager.save_session(
+        [HumanMessage("edited"), AIMessage("b"), HumanMessage("c")], "s1"
+    )
+
+    types = [record["type"] for record in read_records(path)]
+    assert types == ["session", "message", "message", "message", "commit"]
+    assert contents(manager.load_session("s1")) == ["edited", "b", "c"]
+
+
+def test_shorter_history_compacts_the_journal(tmp_path):
+    manager = HistoryManager(tmp_path)
+    manager.save_session([HumanMessage("a"), AIMessage("b")], "s1")
+    manager.save_session([HumanMessage("a")], "s1")
+
+    assert contents(HistoryManager(tmp_path).load_session("s1")) == ["a"]
+
+
+def test_uncommitted_tail_is_ignored_and_compacted(tmp_path):
+    manager = HistoryManager(tmp_path)
+    path = manager.save_session([HumanMessage("a")], "s1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "message", "data": {"type": "human", "data": {"con')
+
+    reloaded = HistoryManager(tmp_path)
+    messages = reloaded.load_session("s1")
+    assert contents(messages) == ["a"]
+
+    reloaded.save_session([*messages, AIMessage("b")], "s1")
+    assert [record["type"] for record in read_records(path)] == [
+        "session",
+        "message",
+        "message",
+        "commit",
+    ]
+
+
+def test_journal_is_compacted_after_many_appends(tmp_path):
+    manager = HistoryManager(tmp_path)
+    messages = [HumanMessage("0")]
+    path = manager.save_session(messages, "s1")
+    for i in range(COMPACT_EVERY + 1):
+        messages = [*messages, AIMessage(str(i + 1))]
+        manager.save_session(messages, "s1")
+
+    commits = [r for r in read_records(path) if r["type"] == "commit"]
+    assert len(commits) == 1
+    assert commits[0]["count"] == len(messages)
+
+
+def test_legacy_session_is_replaced_by_a_journal(tmp_path):
+    legacy = tmp_path / "old.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "timestamp": "2024-01-01T00:00:00",
+                "messages": [
+                    {"type": "human", "data": {"content": "legacy", "type": "human"}}
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    manager = HistoryManager(tmp_path)
+    messages = manager.load_session("old")
+    manager.save_session([*messages, AIMessage("new")], "old")
+
+    assert not legacy.exists()
+    assert contents(manager.load_session("old")) == ["legacy", "new"]
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+from mini_opencode.tools.web import meta_search
+from mini_opencode.tools.web.meta_search import canonicalize_url, merge_results
+
+
+def result(url: str, title: str = "", content: str = "") -> dict:
+    return {"title": title, "url": url, "content": content}
+
+
+def test_canonicalize_url_ignores_presentation_details():
+    assert canonicalize_url("https://www.Example.com/docs/#intro") == canonicalize_url(
+        "http://example.com/docs"
+    )
+    assert canonicalize_url(
+        "https://example.com/a?b=2&utm_source=x&a=1&gclid=y"
+    ) == canonicalize_url("https://example.com/a?a=1&b=2")
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url(
+        "https://example.com/a?id=2"
+    )
+
+
+def test_results_found_by_several_providers_rank_first():
+    merged = merge_results(
+        {
+            "web_search": [result("https://a.com"), result("https://b.com")],
+            "bocha_web_search": [result("https://c.com"), result("https://b.com/")],
+        },
+        max_results=10,
+    )
+
+    assert [r["url"] for r in merged] == [
+        "https://b.com",
+        "https://a.com",
+        "https://c.com",
+    ]
+    assert merged[0]["providers"] == ["web_search", "bocha_web_search"]
+
+
+def test_merged_result_keeps_the_best_fields():
+    merged = merge_results(
+        {
+            "web_search": [result("https://a.com", content="short")],
+            "bocha_web_search": [
+                result("https://www.a.com/", title="A", content="much longer")
+            ],
+        },
+        max_results=10,
+    )
+
+    assert merged == [
+        {
+            "title": "A",
+            "url": "https://a.com",
+            "content": "much longer",
+            "providers": ["web_search", "bocha_web_search"],
+        }
+    ]
+
+
+def test_duplicates_within_a_provider_count_once():
+    merged = merge_results(
+        {
+            "web_search": [result("https://a.com"), result("https://a.com/#x")],
+            "bocha_web_search": [result("https://b.com")],
+        },
+        max_results=1,
+    )
+
+    # Each is ranked first by one provider, the tie keeps the first one
+    assert [r["url"] for r in merged] == ["https://a.com"]
+    assert merged[0]["providers"] == ["web_search"]
+
+
+def test_failed_provider_is_reported_with_the_others_results(monkeypatch):
+    def search(query: str, count: int) -> list[dict]:
+        return [result("https://a.com", title=query)]
+
+    async def asearch(query: str, count: int) -> list[dict]:
+        return search(query, count)
+
+    def fail(query: str, count: int) -> list[dict]:
+        raise RuntimeError("quota exceeded")
+
+    async def afail(query: str, count: int) -> list[dict]:
+        fail(query, count)
+
+    monkeypatch.setattr(
+        meta_search,
+        "PROVIDERS",
+        {"web_search": (search, asearch), "bocha_web_search": (fail, afail)},
+    )
+    monkeypatch.setattr(
+        meta_search,
+        "get_tool_settings",
+        lambda tool: {"providers": ["web_search", "bocha_web_search"], "quorum": 2},
+    )
+
+    for answer in (
+        meta_search.meta_web_search("q"),
+        asyncio.run(meta_search.ameta_web_search("q")),
+    ):
+        data = json.loads(answer)
+        assert data["providers"] == {
+            "web_search": "1 results",
+            "bocha_web_search": "failed: quota exceeded",
+        }
+        assert [r["title"] for r in data["results"]] == ["q"]
@@ -0,0 +1,132 @@
+import re
+
+import pytest
+
+from mini_opencode.index.files import (
+    GitIgnore,
+    compile_glob,
+    filter_ignored,
+    glob_to_regex,
+    list_project_files,
+)
+from mini_opencode.index.project_index import ProjectIndex, get_trigrams
+
+
+def write(root, path: str, text: str = "") -> None:
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(text, encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    ("pattern", "matches", "misses"),
+    [
+        ("*.py", ["a.py"], ["a/b.py", "a.pyc"]),
+        ("src/?.py", ["src/a.py"], ["src/ab.py"]),
+        ("**/*.py", ["a.py", "a/b/c.py"], ["a/b.txt"]),
+        ("src/**", ["src/a", "src/a/b.py"], ["lib/a"]),
+        ("*.{js,ts}", ["a.js", "a.ts"], ["a.jsx"]),
+        ("{src,lib/{a,b}}/*", ["src/x", "lib/a/x", "lib/b/x"], ["lib/c/x"]),
+        ("[!a]*.txt", ["b.txt"], ["a.txt"]),
+        ("a[bc].md", ["ab.md", "ac.md"], ["ad.md"]),
+        ("file(1).txt", ["file(1).txt"], ["file1.txt"]),
+    ],
+)
+def test_glob_to_regex(pattern, matches, misses):
+    regex = re.compile(glob_to_regex(pattern) + r"\Z")
+    for path in matches:
+        assert regex.match(path), path
+    for path in misses:
+        assert not regex.match(path), path
+
+
+def test_compile_glob_matches_at_any_depth_unless_anchored():
+    assert compile_glob("*.py").match("a/b/c.py")
+    assert compile_glob("/*.py").match("c.py")
+    assert not compile_glob("/*.py").match("a/c.py")
+
+
+def test_gitignore_rules():
+    ignore = GitIgnore(
+        "sub",
+        ["# comment", "", "*.log", "!keep.log", "build/", "/root.txt", "a/*.tmp"],
+    )
+
+    assert ignore.match("sub/x/debug.log", False) is True
+    assert ignore.match("sub/keep.log", False) is False
+    assert ignore.match("sub/x/build", True) is True
+    assert ignore.match("sub/x/build", False) is None
+    assert ignore.match("sub/root.txt", False) is True
+    assert ignore.match("sub/x/root.txt", False) is None
+    assert ignore.match("sub/a/x.tmp", False) is True
+    assert ignore.match("sub/b/a/x.tmp", False) is None
+    assert ignore.match("other/debug.log", False) is None
+
+
+def test_walk_honors_nested_gitignore_files(tmp_path):
+    write(tmp_path, ".gitignore", "*.log\nbuild/\n")
+    write(tmp_path, "a.py")
+    write(tmp_path, "debug.log")
+    write(tmp_path, "build/out.py")
+    write(tmp_path, "pkg/.gitignore", "!keep.log\nlocal.py\n")
+    write(tmp_path, "pkg/keep.log")
+    write(tmp_path, "pkg/local.py")
+    write(tmp_path, "pkg/mod.py")
+    write(tmp_path, ".git/config")
+
+    assert sorted(list_project_files(tmp_path)) == [
+        ".gitignore",
+        "a.py",
+        "pkg/.gitignore",
+        "pkg/keep.log",
+        "pkg/mod.py",
+    ]
+    assert filter_ignored(
+        tmp_path, ["a.py", "debug.log", "build/new.py", "pkg/local.py", "pkg/new.py"]
+    ) == ["a.py", "pkg/new.py"]
+
+
+def test_trigrams_are_lowercased():
+    assert get_trigrams(b"AbCd") == {b"abc", b"bcd"}
+    assert get_trigrams(b"ab") == set()
+
+
+def test_search_candidates_hold_every_trigram(tmp_path):
+    project = tmp_path / "project"
+    write(project, "a.py", "def handle_request(): pass")
+    write(project, "b.py", "def handle_response(): pass")
+    write(project, "sub/c.py", "HANDLE_REQUEST = 1")
+    write(project, "big.txt", "handle_request " * 100)
+    (project / "data.bin").write_bytes(b"handle_request\0")
+    index = ProjectIndex(
+        project, db_path=tmp_path / "index.sqlite3", max_file_size=1000
+    )
+    index.refresh()
+
+    assert index.search_candidates("handle_request") == (
+        ["a.py", "sub/c.py"],
+        ["big.txt"],
+    )
+    assert index.search_candidates("handle_re")[0] == ["a.py", "b.py", "sub/c.py"]
+    assert index.search_candidates("handle", prefix="sub") == (["sub/c.py"], [])
+    assert index.search_candidates("missing")[0] == []
+    # Patterns without a trigram match every text file
+    assert index.search_candidates("ha")[0] == ["a.py", "b.py", "sub/c.py"]
+
+
+def test_updated_and_deleted_files_leave_the_candidates(tmp_path):
+    project = tmp_path / "project"
+    write(project, "a.py", "alpha")
+    write(project, "b.py", "alpha")
+    index = ProjectIndex(project, db_path=tmp_path / "index.sqlite3")
+    index.refresh()
+
+    write(project, "a.py", "beta")
+    (project / "b.py").unlink()
+    index.update_paths(["a.py", "b.py"])
+
+    assert index.search_candidates("alpha")[0] == []
+    assert index.search_candidates("beta")[0] == ["a.py"]
+    # A new index of the same database starts from the saved file list
+    reloaded = ProjectIndex(project, db_path=tmp_path / "index.sqlite3")
+    assert reloaded.list_files() == ["a.py"]
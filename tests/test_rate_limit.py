@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mini_opencode.tools import rate_limit
+from mini_opencode.tools.rate_limit import (
+    RateLimiter,
+    acall_with_retry,
+    call_with_retry,
+    get_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def status_error(status: int, headers: dict | None = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.com")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("failed", request=request, response=response)
+
+
+def test_reserve_allows_a_burst_then_spaces_requests(clock):
+    limiter = RateLimiter("p", rate=2, burst=3)
+
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Callers queue behind each other, half a second apart
+    assert [limiter.reserve() for _ in range(2)] == [0.5, 1.0]
+
+    clock.now += 10
+    assert limiter.reserve() == 0.0
+    assert limiter.stats["calls"] == 6
+
+
+def test_zero_rate_is_unlimited(clock):
+    limiter = RateLimiter("p", rate=0, burst=1)
+
+    assert [limiter.reserve() for _ in range(5)] == [0.0] * 5
+
+
+def test_penalize_holds_back_every_caller(clock):
+    limiter = RateLimiter("p", rate=10, burst=10)
+    limiter.penalize(2.0)
+
+    assert limiter.reserve() == pytest.approx(2.1)
+    assert limiter.stats["throttled"] == 1
+
+
+def test_retry_after_is_read_in_seconds_or_as_a_date(clock):
+    assert get_retry_after(status_error(429, {"Retry-After": "3"})) == 3.0
+    assert get_retry_after(
+        status_error(429, {"Retry-After": "Thu, 01 Jan 1970 00:17:00 GMT"})
+    ) == pytest.approx(20.0)
+    assert get_retry_after(status_error(429)) is None
+
+
+def test_transient_failures_are_retried(clock, monkeypatch):
+    limiter = RateLimiter("p", rate=0, max_retries=3)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda provider: limiter)
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: b)
+    failures = [httpx.ConnectTimeout("slow"), status_error(503)]
+
+    def send() -> str:
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert call_with_retry("p", send) == "ok"
+    assert clock.sleeps == [0.5, 1.0]
+    assert limiter.retries == 2
+
+
+def test_client_errors_and_exhausted_retries_are_raised(clock, monkeypatch):
+    limiter = RateLimiter("p", rate=0, max_retries=2)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda provider: limiter)
+    calls = []
+
+    def send(status: int):
+        calls.append(status)
+        raise status_error(status)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_retry("p", lambda: send(401))
+    assert calls == [401]
+
+    calls.clear()
+    with pytest.raises(httpx.HTTPStatusError):
+        call_with_retry("p", lambda: send(502))
+    assert calls == [502, 502, 502]
+
+
+def test_429_slows_down_the_provider(clock, monkeypatch):
+    limiter = RateLimiter("p", rate=1, burst=1)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda provider: limiter)
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep)
+    responses = [status_error(429, {"Retry-After": "5"})]
+
+    async def send() -> str:
+        if responses:
+            raise responses.pop(0)
+        return "ok"
+
+    assert asyncio.run(acall_with_retry("p", send)) == "ok"
+    # The retry waits for its token, behind the penalty
+    assert sleeps == [pytest.approx(6.0)]
+    assert limiter.stats["throttled"] == 1
@@ -0,0 +1,60 @@
+import os
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from mini_opencode.cli.history import HistoryManager
+from mini_opencode.cli.session_catalog import SessionCatalog
+
+
+def test_query_filters_by_project_and_sorts_newest_first(tmp_path):
+    catalog = SessionCatalog(tmp_path / "catalog.sqlite3")
+    project = tmp_path / "project"
+    project.mkdir()
+    catalog.upsert("old", "old.jsonl", project, "t1", mtime=1.0, preview="old")
+    catalog.upsert("new", "new.jsonl", project, "t2", mtime=2.0, preview="new")
+    catalog.upsert("other", "other.jsonl", tmp_path, "t3", mtime=3.0, preview="x")
+
+    assert [s["id"] for s in catalog.query(project)] == ["new", "old"]
+    assert [s["id"] for s in catalog.query()] == ["other", "new", "old"]
+    # Roots are compared once resolved
+    assert [s["id"] for s in catalog.query(project / ".." / "project")] == [
+        "new",
+        "old",
+    ]
+
+
+def test_save_updates_the_catalog(tmp_path):
+    manager = HistoryManager(tmp_path)
+    manager.save_session([HumanMessage("first question")], "s1", project_root=tmp_path)
+    manager.save_session(
+        [HumanMessage("first question"), AIMessage("answer")],
+        "s1",
+        project_root=tmp_path,
+    )
+
+    sessions = manager.list_sessions(tmp_path)
+    assert [(s["id"], s["preview"]) for s in sessions] == [("s1", "first question")]
+
+
+def test_new_catalog_indexes_existing_sessions(tmp_path):
+    manager = HistoryManager(tmp_path)
+    manager.save_session([HumanMessage("kept")], "s1", project_root=tmp_path)
+    manager.save_session([AIMessage("no question")], "s2", project_root=tmp_path)
+    (tmp_path / "broken.jsonl").write_text("not json\n", encoding="utf-8")
+    os.remove(tmp_path / "catalog.sqlite3")
+
+    sessions = HistoryManager(tmp_path).list_sessions(tmp_path)
+    assert sorted((s["id"], s["preview"]) for s in sessions) == [
+        ("s1", "kept"),
+        ("s2", "No human message"),
+    ]
+
+
+def test_rebuild_catalog_drops_deleted_sessions(tmp_path):
+    manager = HistoryManager(tmp_path)
+    manager.save_session([HumanMessage("a")], "s1")
+    manager.save_session([HumanMessage("b")], "s2")
+    (tmp_path / "s1.jsonl").unlink()
+
+    assert manager.rebuild_catalog() == 1
+    assert [s["id"] for s in manager.list_sessions()] == ["s2"]
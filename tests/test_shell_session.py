@@ -0,0 +1,88 @@
+import sys
+import time
+
+import pytest
+
+from mini_opencode.shell.session import ShellSession
+
+pytest.importorskip("pexpect")
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="pexpect cannot spawn a terminal on Windows"
+)
+
+
+@pytest.fixture
+def session(tmp_path):
+    session = ShellSession(tmp_path, timeout=2)
+    yield session
+    session.close()
+
+
+def test_state_carries_over_between_commands(session, tmp_path):
+    (tmp_path / "sub").mkdir()
+    assert session.run("cd sub && export GREETING=hello").exit_code == 0
+
+    result = session.run('pwd; echo "$GREETING"')
+    assert result.output == f"{tmp_path / 'sub'}\nhello"
+    assert result.exit_code == 0
+
+
+def test_failed_command_reports_its_exit_code(session):
+    result = session.run("echo oops >&2; false")
+
+    assert result.exit_code == 1
+    assert result.output == "oops\n\nExit code: 1"
+
+
+def test_output_is_streamed_and_truncated(tmp_path):
+    session = ShellSession(tmp_path, max_output_bytes=10)
+    chunks = []
+    try:
+        result = session.run("printf '%s\\n' 0123456789 abcdef", chunks.append)
+    finally:
+        session.close()
+
+    assert "".join(chunks) == "0123456789\nabcdef\n"
+    assert result.truncated
+    assert result.output == "0123456789\n\n... Output truncated at 10 bytes."
+
+
+def test_timeout_interrupts_the_command_and_keeps_the_shell(session):
+    session.run("cd /")
+    start = time.monotonic()
+    result = session.run("echo started; sleep 30")
+
+    assert time.monotonic() - start < 10
+    assert result.exit_code == 124
+    assert result.output == ("started\n\nError: Command timed out after 2.0 seconds.")
+    assert session.run("pwd").output == "/"
+    assert session.restarts == 0
+
+
+def test_shell_is_restarted_when_the_interrupt_is_ignored(session, tmp_path):
+    session.run("cd /")
+    result = session.run("trap '' INT; sleep 30")
+
+    assert result.exit_code == 124
+    assert "The shell was restarted" in result.output
+    assert session.restarts == 1
+    assert session.run("pwd").output == str(tmp_path)
+
+
+def test_syntax_error_fails_without_waiting(session):
+    start = time.monotonic()
+    result = session.run("echo 'unterminated")
+
+    assert time.monotonic() - start < 1.5
+    assert result.exit_code == 2
+    assert "unexpected EOF" in result.output
+    assert session.run("echo ok").output == "ok"
+
+
+def test_exit_starts_a_new_shell_for_the_next_command(session, tmp_path):
+    session.run("cd /")
+    result = session.run("exit 3")
+
+    assert result.exit_code == 3
+    assert not session.alive
+    assert session.run("pwd").output == str(tmp_path)
@@ -0,0 +1,110 @@
+import shutil
+
+import pytest
+
+from mini_opencode.index.symbol_index import SymbolIndex
+from mini_opencode.index.symbols import extract_python_symbols
+
+SOURCE = """\
+LIMIT = 10
+
+
+class Parser:
+    def parse(self, text):
+        return tokenize(text)
+
+
+def tokenize(text):
+    return text.split()
+"""
+
+
+def write(root, path: str, text: str) -> None:
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    write(root, "pkg/parser.py", SOURCE)
+    write(root, "main.py", "from pkg.parser import Parser\n\nParser().parse('a b')\n")
+    return root
+
+
+@pytest.fixture
+def index(tmp_path, project):
+    index = SymbolIndex(project, db_path=tmp_path / "symbols.sqlite3")
+    index.refresh()
+    return index
+
+
+def definition_paths(index, name: str) -> list[str]:
+    return [location.path for location in index.find_definitions(name)]
+
+
+def test_python_definitions_and_references():
+    definitions, references = extract_python_symbols(SOURCE)
+
+    assert [(s.name, s.kind, s.line, s.container) for s in definitions] == [
+        ("LIMIT", "variable", 1, ""),
+        ("Parser", "class", 4, ""),
+        ("parse", "method", 5, "Parser"),
+        ("tokenize", "function", 9, ""),
+    ]
+    assert ("tokenize", 6) in references
+
+
+def test_find_definitions_and_references(index):
+    [location] = index.find_definitions("Parser.parse")
+    assert location.path == "pkg/parser.py"
+    assert location.symbol.signature.startswith("def parse(self, text)")
+    assert definition_paths(index, "Other.parse") == []
+
+    references = index.find_references("Parser")
+    assert [(r.path, r.line) for r in references] == [("main.py", 1), ("main.py", 3)]
+
+
+def test_changed_file_is_parsed_again(index, project):
+    write(project, "pkg/parser.py", "def tokenize_all(text):\n    pass\n")
+    index.apply_changes({"pkg/parser.py"})
+
+    assert definition_paths(index, "tokenize") == []
+    assert definition_paths(index, "tokenize_all") == ["pkg/parser.py"]
+
+
+def test_moved_directory_is_reindexed(index, project):
+    shutil.move(project / "pkg", project / "lib")
+    # The watcher reports the directory, not the files in it
+    index.apply_changes({"pkg", "lib"})
+
+    assert definition_paths(index, "Parser") == ["lib/parser.py"]
+    assert index.outline("lib/parser.py")[0].name == "LIMIT"
+
+
+def test_deleted_directory_is_dropped(index, project):
+    write(project, "pkg/sub/extra.py", "def extra():\n    pass\n")
+    index.apply_changes({"pkg/sub"})
+    assert definition_paths(index, "extra") == ["pkg/sub/extra.py"]
+
+    shutil.rmtree(project / "pkg")
+    index.apply_changes({"pkg"})
+
+    assert definition_paths(index, "Parser") == []
+    assert definition_paths(index, "extra") == []
+    assert {r.path for r in index.find_references("Parser")} == {"main.py"}
+
+
+def test_directory_with_a_similar_name_is_kept(index, project):
+    write(project, "pkg2/other.py", "def other():\n    pass\n")
+    index.refresh()
+    shutil.rmtree(project / "pkg")
+    index.apply_changes({"pkg"})
+
+    assert definition_paths(index, "other") == ["pkg2/other.py"]
+
+
+def test_outline_rejects_unsupported_languages(index):
+    with pytest.raises(ValueError):
+        index.outline("notes.unknown")
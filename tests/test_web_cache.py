@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from mini_opencode.tools.web import cache as cache_module
+from mini_opencode.tools.web import web_search
+from mini_opencode.tools.web.cache import WebCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_response_expires_after_the_ttl_of_its_tool(tmp_path, clock):
+    cache = WebCache(tmp_path / "cache.sqlite3", ttls={"web_search": 60})
+    cache.put("web_search", {"query": "q"}, "result")
+
+    clock[0] += 59
+    assert cache.get("web_search", {"query": "q"}) == "result"
+    clock[0] += 2
+    assert cache.get("web_search", {"query": "q"}) is None
+
+
+def test_tools_without_a_ttl_are_not_cached(tmp_path):
+    cache = WebCache(tmp_path / "cache.sqlite3", ttls={"web_fetch": 0})
+    cache.put("web_fetch", {"url": "https://example.com"}, "page")
+    cache.put("unknown_tool", {}, "value")
+
+    assert cache.get("web_fetch", {"url": "https://example.com"}) is None
+    assert cache.get("unknown_tool", {}) is None
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, clock):
+    cache = WebCache(tmp_path / "cache.sqlite3", max_size=25)
+    for name in ("a", "b"):
+        cache.put("web_search", {"query": name}, name * 10)
+        clock[0] += 1
+    # Reading `a` makes `b` the least recently used response
+    assert cache.get("web_search", {"query": "a"}) == "a" * 10
+    clock[0] += 1
+    cache.put("web_search", {"query": "c"}, "c" * 10)
+
+    assert cache.get("web_search", {"query": "a"}) is not None
+    assert cache.get("web_search", {"query": "b"}) is None
+    assert cache.get("web_search", {"query": "c"}) is not None
+
+
+def test_equivalent_arguments_share_a_key():
+    assert make_key("web_search", {"query": "  a   b "}) == make_key(
+        "web_search", {"query": "a b"}
+    )
+    assert make_key("web_fetch", {"url": "HTTPS://Example.com#top"}) == make_key(
+        "web_fetch", {"url": "https://example.com/"}
+    )
+    assert make_key("web_fetch", {"url": "https://example.com/?a=1"}) != make_key(
+        "web_fetch", {"url": "https://example.com/?a=2"}
+    )
+
+
+def test_identical_calls_in_flight_share_a_request(tmp_path):
+    cache = WebCache(tmp_path / "cache.sqlite3")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(
+        target=lambda: results.append(cache.call("web_search", {"query": "q"}, fetch))
+    )
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(
+        target=lambda: results.append(cache.call("web_search", {"query": "q"}, fetch))
+    )
+    follower.start()
+    # The follower is waiting on the leader's request
+    while cache.coalesced == 0:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False), ("result", True)]
+
+
+def test_identical_async_calls_share_a_request(tmp_path):
+    cache = WebCache(tmp_path / "cache.sqlite3")
+    calls = []
+
+    async def fetch() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.acall("web_search", {"query": "q"}, fetch) for _ in range(3))
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False), ("result", True), ("result", True)]
+    assert cache.stats == {"hits": 0, "misses": 1, "coalesced": 2}
+
+
+def test_failed_calls_are_not_cached(tmp_path):
+    cache = WebCache(tmp_path / "cache.sqlite3")
+
+    def fail() -> str:
+        raise ConnectionError("offline")
+
+    with pytest.raises(ConnectionError):
+        cache.call("web_search", {"query": "q"}, fail)
+    assert cache.call("web_search", {"query": "q"}, lambda: "result") == (
+        "result",
+        False,
+    )
+
+
+def test_http_errors_are_reported_and_not_cached(tmp_path, monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(401, json={"error": "invalid key"})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(web_search, "get_http_client", lambda: client)
+    monkeypatch.setattr(
+        web_search, "get_tool_settings", lambda tool: {"api_key": "key"}
+    )
+    monkeypatch.setattr(
+        cache_module, "_web_cache", WebCache(tmp_path / "cache.sqlite3")
+    )
+
+    for _ in range(2):
+        content, artifact = web_search.web_search("query")
+        assert (
+            content
+            == 'Request failed, status code: 401, error: {"error":"invalid key"}'
+        )
+        assert artifact == {"cached": False}
+    assert len(requests) == 2